@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Index Status Reconciliation
+Compares the sitemap, the built site and Google Search Console exports,
+and regenerates indexed.md and to-index.md from them. URLs from every
+source are normalized the way link-analyzer normalizes link targets, so
+the sources meet as plain sets of paths: built pages missing from the
+sitemap, sitemap pages not yet indexed, and indexed pages no longer built
+each come from one set difference. Pages to index are prioritized by
+their inbound internal links in the link graph.
+"""
+
+import re
+import sys
+import csv
+import html
+import time
+import argparse
+from pathlib import Path
+from itertools import chain
+from datetime import date, datetime
+
+# Add shared modules and link-analyzer to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "link-analyzer" / "scripts"))
+from utils import save_json, timestamp
+from link_graph import LinkGraphAnalyzer
+from graph_output import iter_page_metrics
+from internal_links import scan_tree
+
+# Inbound link counts at which each priority tier starts, highest first;
+# pages below the last threshold form the last tier
+DEFAULT_PRIORITY_THRESHOLDS = [10, 3, 1]
+
+# Submitted-column marker for pages URL Inspection shows as indexed
+FALSE_POSITIVE = 'false positive - indexed'
+
+# Column headers GSC exports use for the page URL (indexed pages, performance)
+URL_COLUMNS = ('url', 'top pages', 'page', 'pages')
+CRAWLED_COLUMN = 'last crawled'
+
+LOC_PATTERN = re.compile(r'<loc>([^<]*)</loc>')
+SITEMAP_INDEX_PATTERN = re.compile(r'<sitemapindex\b')
+GENERATED_PATTERN = re.compile(r'\*Generated: (\d{4}-\d{2}-\d{2})\*')
+
+
+def url_path(url: str) -> str:
+    """Path part of an absolute URL ('https://example.com/a/?q' -> '/a/?q')"""
+    scheme_end = url.find('//')
+    if scheme_end < 0 or scheme_end > 6:
+        return url
+    path_start = url.find('/', scheme_end + 2)
+    return url[path_start:] if path_start >= 0 else '/'
+
+
+def url_origin(url: str) -> str:
+    """Scheme and host of an absolute URL"""
+    return url[:len(url) - len(url_path(url))] if '//' in url else ''
+
+
+def load_sitemap(path: Path) -> list[str]:
+    """Page URLs in a sitemap file, following a sitemap index to sitemaps next to it"""
+    content = path.read_text(encoding='utf-8', errors='ignore')
+    locs = [html.unescape(loc.strip()) if '&' in loc else loc.strip() for loc in LOC_PATTERN.findall(content)]
+    if not SITEMAP_INDEX_PATTERN.search(content):
+        return locs
+
+    urls = []
+    for loc in locs:
+        child = path.parent / url_path(loc).rsplit('/', 1)[-1]
+        if child.exists():
+            urls.extend(load_sitemap(child))
+        else:
+            print(f"Warning: sitemap {loc} not found next to {path}", file=sys.stderr)
+    return urls
+
+
+def load_gsc_export(path: Path) -> dict[str, str]:
+    """URL -> last crawled date ('-' when the export has none) of a GSC CSV export"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader, [])]
+        url_column = next((header.index(name) for name in URL_COLUMNS if name in header), None)
+        if url_column is None:
+            raise ValueError(f"{path}: no URL column (expected one of: {', '.join(URL_COLUMNS)})")
+        crawled_column = header.index(CRAWLED_COLUMN) if CRAWLED_COLUMN in header else None
+
+        if crawled_column is None:
+            return {row[url_column]: '-' for row in reader if len(row) > url_column}
+        width = max(url_column, crawled_column)
+        return {row[url_column]: row[crawled_column] or '-' for row in reader if len(row) > width}
+
+
+def read_tables(path: Path) -> dict[str, list[dict[str, str]]]:
+    """Rows of every markdown table in a file, by the heading above it; columns keyed by lowercased header"""
+    tables: dict[str, list[dict[str, str]]] = {}
+    if not path.exists():
+        return tables
+
+    heading = ''
+    header = None
+    for line in path.read_text(encoding='utf-8').splitlines():
+        if line.startswith('#'):
+            heading = line.lstrip('#').strip()
+            header = None
+        elif line.startswith('|'):
+            cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+            if header is None:
+                header = [cell.lower() for cell in cells]
+                tables.setdefault(heading, [])
+            elif not all(set(cell) <= set('-: ') for cell in cells):
+                tables[heading].append(dict(zip(header, cells)))
+        else:
+            header = None
+    return tables
+
+
+def read_generated(path: Path) -> date | None:
+    """The *Generated* date of a to-index.md"""
+    if not path.exists():
+        return None
+    match = GENERATED_PATTERN.search(path.read_text(encoding='utf-8'))
+    return datetime.strptime(match.group(1), "%Y-%m-%d").date() if match else None
+
+
+def long_date(day: date) -> str:
+    """Date as written in the tracking files ('12 Dec 2025')"""
+    return f"{day.day} {day:%b %Y}"
+
+
+class IndexReconciler:
+    """Reconcile sitemap, build and GSC index status as sets of normalized paths"""
+
+    def __init__(
+        self,
+        dist_path: Path,
+        excluded_paths: list[str] = None,
+        priority_thresholds: list[int] = None,
+        today: date = None
+    ):
+        self.dist_path = dist_path
+        self.analyzer = LinkGraphAnalyzer(dist_path, excluded_paths=excluded_paths)
+        self.priority_thresholds = sorted(priority_thresholds or DEFAULT_PRIORITY_THRESHOLDS, reverse=True)
+        self.today = today or date.today()
+        # Sitemap or GSC URL -> normalized path
+        self.normalized: dict[str, str] = {}
+        self.origin = ''
+
+    def paths_of(self, urls: list[str]) -> list[str]:
+        """Normalized paths of sitemap or GSC URLs
+
+        Each distinct URL is normalized once, however many sources list it.
+        """
+        new = [url for url in urls if url not in self.normalized]
+        # Most URLs are on the site's origin: slice it off rather than parse each URL
+        prefix = self.origin + '/' if self.origin else '//'
+        start = len(prefix) - 1
+        paths = map(
+            self.analyzer.normalize_url,
+            [url[start:] if url.startswith(prefix) else url_path(url) for url in new]
+        )
+        self.normalized.update(zip(new, paths))
+        return list(map(self.normalized.__getitem__, urls))
+
+    def built_pages(self) -> set[str]:
+        """Normalized paths of every HTML page in the build (one scandir walk, no Path per file)"""
+        files, _ = scan_tree(self.dist_path)
+        return {
+            url for url in map(self.analyzer.relative_path_to_url, [path for path in files if path.endswith('.html')])
+            if not self.analyzer.is_excluded(url)
+        }
+
+    def inbound_counts(self, graph_path: Path = None) -> dict[str, int]:
+        """Inbound internal links per page, from a saved link graph or by building one"""
+        if graph_path:
+            return {metrics['url']: metrics['inbound'] for metrics in iter_page_metrics(graph_path)}
+        self.analyzer.build_graph()
+        self.analyzer.calculate_metrics()
+        return dict(zip(self.analyzer.urls, self.analyzer.inbound.tolist()))
+
+    def is_built(self, path: str, built: set[str]) -> bool:
+        """Check a path against the build (non-page files by their existence on disk)"""
+        if path in built:
+            return True
+        if path.endswith('/'):
+            return False
+        return (self.dist_path / path.lstrip('/')).is_file()
+
+    def priority_of(self, inbound: int) -> int:
+        """Priority tier (1 = most linked) for an inbound link count"""
+        for tier, threshold in enumerate(self.priority_thresholds, 1):
+            if inbound >= threshold:
+                return tier
+        return len(self.priority_thresholds) + 1
+
+    def tier_title(self, tier: int) -> str:
+        """Section title of a priority tier"""
+        thresholds = self.priority_thresholds
+        if tier > len(thresholds):
+            return "Orphans (0 inbound links)" if thresholds[-1] == 1 else f"Under {thresholds[-1]} inbound links"
+        low = thresholds[tier - 1]
+        if tier == 1:
+            return f"{low}+ inbound links"
+        high = thresholds[tier - 2] - 1
+        return f"{low} inbound link{'s' if high > 1 else ''}" if low == high else f"{low}-{high} inbound links"
+
+    def reconcile(
+        self,
+        sitemap_urls: list[str],
+        exports: dict[str, str],
+        inbound: dict[str, int],
+        indexed_tables: dict[str, list[dict]],
+        to_index_tables: dict[str, list[dict]],
+        to_index_generated: date = None
+    ) -> dict:
+        """Compare sitemap, build and index status
+
+        The previous tracking tables carry dates forward: lag entries stay
+        until the export lists them, submission dates stay with their pages,
+        and pages marked as false positives move to the lag table, detected
+        when the previous to-index.md was generated.
+        """
+        self.origin = next((url_origin(url) for url in chain(sitemap_urls, exports) if '//' in url), '')
+
+        lag_rows = [
+            row for heading, rows in indexed_tables.items() if heading.lower().startswith('indexed with lag')
+            for row in rows if row.get('url')
+        ]
+        to_index_rows = [row for rows in to_index_tables.values() for row in rows if row.get('url') and 'submitted' in row]
+        # Path -> URL as listed (the sitemap's is written to to-index.md, the export's to indexed.md)
+        sitemap = dict(zip(self.paths_of(sitemap_urls), sitemap_urls))
+        # Path -> (URL, last crawled)
+        exported = dict(zip(self.paths_of(list(exports)), exports.items()))
+        built = self.built_pages()
+
+        # Lag entries from the last run, until they reach the export
+        lag = {
+            path: {'url': row['url'], 'detected': row.get('detected', '-'), 'confirmed': row.get('confirmed', '-')}
+            for path, row in zip(self.paths_of([row['url'] for row in lag_rows]), lag_rows)
+            if path not in exported
+        }
+
+        detected = long_date(to_index_generated or self.today)
+        submitted: dict[str, str] = {}
+        false_positives = []
+        for path, row in zip(self.paths_of([row['url'] for row in to_index_rows]), to_index_rows):
+            if row['submitted'].lower() == FALSE_POSITIVE:
+                false_positives.append(path)
+                if path not in exported and path not in lag:
+                    lag[path] = {'url': row['url'], 'detected': detected, 'confirmed': long_date(self.today)}
+            else:
+                submitted[path] = row['submitted']
+
+        indexed = exported.keys() | lag.keys()
+        to_index = [path for path in sitemap if path not in indexed]
+        to_index.sort()
+        to_index.sort(key=lambda path: -inbound.get(path, 0))
+        tiers: dict[int, list[dict]] = {}
+        for path in to_index:
+            links = inbound.get(path, 0)
+            tiers.setdefault(self.priority_of(links), []).append({
+                'url': sitemap[path],
+                'inbound': links,
+                'submitted': submitted.get(path, '-')
+            })
+
+        not_in_sitemap = sorted(built - sitemap.keys())
+        not_in_sitemap.sort(key=lambda path: -inbound.get(path, 0))
+        removed = sorted(
+            path for path in indexed - built if not self.is_built(path, built) and not self.analyzer.is_excluded(path)
+        )
+
+        return {
+            "metadata": {
+                "reconciled_at": timestamp(),
+                "sitemap_pages": len(sitemap),
+                "built_pages": len(built),
+                "indexed_public": len(exported),
+                "indexed_with_lag": len(lag),
+                "sitemap_indexed": len(sitemap) - len(to_index),
+                "to_index": len(to_index),
+                "false_positives_moved": len(false_positives),
+                "built_not_in_sitemap": len(not_in_sitemap),
+                "indexed_but_removed": len(removed),
+                "sitemap_not_built": len(sitemap.keys() - built),
+                "priority_thresholds": self.priority_thresholds
+            },
+            "indexed_public": [
+                {'url': url, 'last_crawled': crawled} for url, crawled in map(exported.get, sorted(exported))
+            ],
+            "indexed_with_lag": [lag[path] for path in sorted(lag)],
+            "to_index": {
+                str(tier): {'title': self.tier_title(tier), 'pages': pages} for tier, pages in sorted(tiers.items())
+            },
+            "built_not_in_sitemap": [
+                {'url': self.origin + path, 'inbound': inbound.get(path, 0)}
+                for path in not_in_sitemap
+            ],
+            "indexed_but_removed": [
+                {'url': exported[path][0], 'last_crawled': exported[path][1]} if path in exported
+                else {'url': lag[path]['url'], 'last_crawled': '-'}
+                for path in removed
+            ]
+        }
+
+
+def generate_indexed_markdown(results: dict, today: date, source: str) -> str:
+    """indexed.md: public, lag and removed tables"""
+    lines = [
+        "# Indexed Pages",
+        "",
+        "## Indexed Public (GSC Export)",
+        "",
+        f"*Last updated: {today.isoformat()}*",
+        f"*Source: {source}*",
+        "",
+        "| # | URL | Last Crawled |",
+        "|---|-----|--------------|",
+    ]
+    lines.extend(
+        f"| {n} | {page['url']} | {page['last_crawled']} |"
+        for n, page in enumerate(results['indexed_public'], 1)
+    )
+    lines.extend([
+        "",
+        "## Indexed With Lag (URL Inspection Confirmed)",
+        "",
+        "*Pages confirmed indexed via URL Inspection but not yet in GSC export*",
+        "",
+        "| # | URL | Detected | Confirmed |",
+        "|---|-----|----------|-----------|",
+    ])
+    lines.extend(
+        f"| {n} | {page['url']} | {page['detected']} | {page['confirmed']} |"
+        for n, page in enumerate(results['indexed_with_lag'], 1)
+    )
+
+    if results['indexed_but_removed']:
+        lines.extend([
+            "",
+            "## Indexed But Removed",
+            "",
+            "*Indexed pages no longer in the build: redirect them or return 410*",
+            "",
+            "| # | URL | Last Crawled |",
+            "|---|-----|--------------|",
+        ])
+        lines.extend(
+            f"| {n} | {page['url']} | {page['last_crawled']} |"
+            for n, page in enumerate(results['indexed_but_removed'], 1)
+        )
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def generate_to_index_markdown(results: dict, today: date) -> str:
+    """to-index.md: pages to index by priority, then built pages missing from the sitemap"""
+    lines = [
+        "# Pages To Index",
+        "",
+        f"*Generated: {today.isoformat()}*",
+        f"*Total: {results['metadata']['to_index']} pages*",
+    ]
+
+    for tier, section in results['to_index'].items():
+        lines.extend([
+            "",
+            f"## Priority {tier}: {section['title']}",
+            "",
+            "| # | URL | Inbound | Submitted |",
+            "|---|-----|---------|-----------|",
+        ])
+        lines.extend(
+            f"| {n} | {page['url']} | {page['inbound']} | {page['submitted']} |"
+            for n, page in enumerate(section['pages'], 1)
+        )
+
+    if results['built_not_in_sitemap']:
+        lines.extend([
+            "",
+            "## Built But Not In Sitemap",
+            "",
+            "*Add these to the sitemap (or noindex them) before submitting*",
+            "",
+            "| # | URL | Inbound |",
+            "|---|-----|---------|",
+        ])
+        lines.extend(
+            f"| {n} | {page['url']} | {page['inbound']} |"
+            for n, page in enumerate(results['built_not_in_sitemap'], 1)
+        )
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GSC Index Status Reconciliation")
+    parser.add_argument("--dist", "-d", required=True, help="Path to the built site")
+    parser.add_argument("--gsc", "-g", nargs="+", required=True,
+                        help="GSC CSV exports of indexed pages (URL column, optional Last crawled)")
+    parser.add_argument("--sitemap", "-s", help="Sitemap or sitemap index (default: dist/sitemap-index.xml or dist/sitemap.xml)")
+    parser.add_argument("--link-graph", help="Saved link_graph.json from link-analyzer (default: build the graph from dist)")
+    parser.add_argument("--indexed", default="indexed.md", help="indexed.md to update")
+    parser.add_argument("--to-index", default="to-index.md", help="to-index.md to update")
+    parser.add_argument("--output", "-o", help="Also save the reconciliation as JSON")
+    parser.add_argument("--exclude", nargs="+", help="Paths to leave out of the build (e.g. /tag/)")
+    parser.add_argument("--priorities", type=int, nargs="+", default=DEFAULT_PRIORITY_THRESHOLDS,
+                        help="Inbound link counts at which priority tiers start (default: 10 3 1)")
+    parser.add_argument("--today", help="Date to stamp on the files (YYYY-MM-DD, default: today)")
+
+    args = parser.parse_args()
+
+    dist_path = Path(args.dist)
+    if not dist_path.exists():
+        print(f"Error: Directory not found: {dist_path}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.sitemap:
+        sitemap_path = Path(args.sitemap)
+    else:
+        sitemap_path = next(
+            (dist_path / name for name in ("sitemap-index.xml", "sitemap.xml") if (dist_path / name).exists()),
+            dist_path / "sitemap.xml"
+        )
+    for path in [sitemap_path, *map(Path, args.gsc)]:
+        if not path.exists():
+            print(f"Error: File not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    today = datetime.strptime(args.today, "%Y-%m-%d").date() if args.today else date.today()
+    reconciler = IndexReconciler(dist_path, excluded_paths=args.exclude, priority_thresholds=args.priorities, today=today)
+    inbound = reconciler.inbound_counts(Path(args.link_graph) if args.link_graph else None)
+
+    started = time.perf_counter()
+    sitemap_urls = load_sitemap(sitemap_path)
+    exports: dict[str, str] = {}
+    for path in args.gsc:
+        exports.update(load_gsc_export(Path(path)))
+
+    indexed_path = Path(args.indexed)
+    to_index_path = Path(args.to_index)
+    results = reconciler.reconcile(
+        sitemap_urls, exports, inbound,
+        read_tables(indexed_path), read_tables(to_index_path), read_generated(to_index_path)
+    )
+
+    with open(indexed_path, 'w', encoding='utf-8') as f:
+        f.write(generate_indexed_markdown(results, today, ", ".join(Path(path).name for path in args.gsc)))
+    with open(to_index_path, 'w', encoding='utf-8') as f:
+        f.write(generate_to_index_markdown(results, today))
+    elapsed = time.perf_counter() - started
+
+    print(f"Updated {indexed_path} and {to_index_path} in {elapsed:.2f}s")
+    if args.output:
+        output_path = Path(args.output)
+        save_json(results, output_path)
+        print(f"JSON results saved to: {output_path}")
+
+    # Print summary
+    meta = results["metadata"]
+    total_indexed = meta['indexed_public'] + meta['indexed_with_lag']
+    progress = meta['sitemap_indexed'] / meta['sitemap_pages'] if meta['sitemap_pages'] else 0.0
+    print(f"\nINDEXING STATUS SUMMARY")
+    print("=" * 23)
+    print(f"\nIndexed Public (GSC):   {meta['indexed_public']:>7,} pages")
+    print(f"Indexed With Lag:       {meta['indexed_with_lag']:>7,} pages")
+    print(f"Total Indexed:          {total_indexed:>7,} pages")
+    print(f"\nSitemap Total:          {meta['sitemap_pages']:>7,} pages")
+    print(f"To Index:               {meta['to_index']:>7,} pages")
+    print(f"\nProgress:               {progress:>7.1%}")
+    print(f"\nBy Priority:")
+    for tier, section in results['to_index'].items():
+        print(f"- Priority {tier}: {len(section['pages'])} remaining, {section['title'].lower()}")
+    if meta['false_positives_moved']:
+        print(f"\nFalse positives moved to Indexed With Lag: {meta['false_positives_moved']}")
+    print(f"Built but not in sitemap: {meta['built_not_in_sitemap']}")
+    print(f"In sitemap but not built: {meta['sitemap_not_built']}")
+    print(f"Indexed but removed from build: {meta['indexed_but_removed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import date
+from contextlib import redirect_stderr
+
+from reconcile import (
+    IndexReconciler, generate_indexed_markdown, generate_to_index_markdown, load_sitemap, read_generated,
+    read_tables
+)
+
+
+SITE = "https://example.com"
+TODAY = date(2026, 3, 20)
+
+INDEXED_MD = """# Indexed Pages
+
+## Indexed Public (GSC Export)
+
+*Last updated: 2026-03-01*
+
+| # | URL | Last Crawled |
+|---|-----|--------------|
+| 1 | https://example.com/ | 2026-02-27 |
+
+## Indexed With Lag (URL Inspection Confirmed)
+
+| # | URL | Detected | Confirmed |
+|---|:----|----------|-----------|
+| 1 | https://example.com/a/ | 1 Feb 2026 | 3 Feb 2026 |
+| 2 | https://example.com/d/ | 2 Feb 2026 | 4 Feb 2026 |
+"""
+
+TO_INDEX_MD = """# Pages To Index
+
+*Generated: 2026-03-01*
+
+## Priority 1: 10+ inbound links
+
+| # | URL | Inbound | Submitted |
+|---|-----|---------|-----------|
+| 1 | https://example.com/b/ | 12 | 28 Feb 2026 |
+| 2 | https://example.com/c/ | 11 | False Positive - Indexed |
+| 3 | https://example.com/e/ | 10 | - |
+"""
+
+
+def sitemap(urls: list[str]) -> str:
+    entries = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+
+
+class TestReadTables(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "indexed.md"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tables_by_heading(self):
+        """Rows keyed by lowercased header; separator rows (aligned or not) and prose are skipped"""
+        self.path.write_text(INDEXED_MD, encoding='utf-8')
+        tables = read_tables(self.path)
+        self.assertEqual(list(tables), ["Indexed Public (GSC Export)", "Indexed With Lag (URL Inspection Confirmed)"])
+        self.assertEqual(tables["Indexed Public (GSC Export)"],
+                         [{'#': '1', 'url': 'https://example.com/', 'last crawled': '2026-02-27'}])
+        self.assertEqual([row['detected'] for row in tables["Indexed With Lag (URL Inspection Confirmed)"]],
+                         ['1 Feb 2026', '2 Feb 2026'])
+
+    def test_blank_line_ends_table(self):
+        """A table after a blank line under the same heading starts over with its own header"""
+        self.path.write_text("## A\n| x | y |\n|---|---|\n| 1 | 2 |\n\n| z |\n|---|\n| 3 |\n", encoding='utf-8')
+        self.assertEqual(read_tables(self.path), {'A': [{'x': '1', 'y': '2'}, {'z': '3'}]})
+
+    def test_missing_file(self):
+        self.assertEqual(read_tables(self.path), {})
+        self.assertIsNone(read_generated(self.path))
+
+
+class TestLoadSitemap(unittest.TestCase):
+
+    def test_sitemap_index(self):
+        """Child sitemaps are read from next to the index; entities are unescaped; missing ones warn"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "sitemap-0.xml").write_text(sitemap([f"{SITE}/a/", f"{SITE}/b/?x=1&amp;y=2"]), encoding='utf-8')
+            (root / "sitemap-1.xml").write_text(sitemap([f" {SITE}/c/ "]), encoding='utf-8')
+            (root / "sitemap-index.xml").write_text(
+                '<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"<sitemap><loc>{SITE}/sitemap-0.xml</loc></sitemap>"
+                f"<sitemap><loc>{SITE}/sitemap-1.xml</loc></sitemap>"
+                f"<sitemap><loc>{SITE}/sitemap-2.xml</loc></sitemap>"
+                "</sitemapindex>",
+                encoding='utf-8'
+            )
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                urls = load_sitemap(root / "sitemap-index.xml")
+            self.assertEqual(urls, [f"{SITE}/a/", f"{SITE}/b/?x=1&y=2", f"{SITE}/c/"])
+            self.assertIn("sitemap-2.xml", stderr.getvalue())
+            self.assertEqual(load_sitemap(root / "sitemap-1.xml"), [f"{SITE}/c/"])
+
+
+class TestReconcile(unittest.TestCase):
+    """Carrying the previous tracking files forward"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dist = self.root / "dist"
+        for page in ['', 'a/', 'b/', 'c/', 'd/', 'e/', 'f/', 'tag/x/']:
+            (self.dist / page).mkdir(parents=True, exist_ok=True)
+            (self.dist / page / "index.html").write_text("<html></html>", encoding='utf-8')
+        (self.root / "indexed.md").write_text(INDEXED_MD, encoding='utf-8')
+        (self.root / "to-index.md").write_text(TO_INDEX_MD, encoding='utf-8')
+
+        self.sitemap_urls = [f"{SITE}/{page}" for page in ['', 'a/', 'b/', 'c/', 'd/', 'e/', 'gone/']]
+        # /a/ reached the export; /old/ was indexed but is no longer built
+        self.exports = {f"{SITE}/": '2026-03-10', f"{SITE}/a/": '2026-03-12', f"{SITE}/old/": '-'}
+        self.inbound = {'/': 0, '/a/': 20, '/b/': 12, '/c/': 11, '/d/': 4, '/e/': 10, '/f/': 1, '/gone/': 0}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def reconcile(self) -> dict:
+        reconciler = IndexReconciler(self.dist, excluded_paths=['/tag/'], today=TODAY)
+        to_index_path = self.root / "to-index.md"
+        return reconciler.reconcile(
+            self.sitemap_urls, self.exports, self.inbound,
+            read_tables(self.root / "indexed.md"), read_tables(to_index_path), read_generated(to_index_path)
+        )
+
+    def write(self, results: dict) -> None:
+        (self.root / "indexed.md").write_text(generate_indexed_markdown(results, TODAY, "gsc.csv"), encoding='utf-8')
+        (self.root / "to-index.md").write_text(generate_to_index_markdown(results, TODAY), encoding='utf-8')
+
+    def test_lag_table(self):
+        """Lag entries drop once exported; false positives join with their detection date"""
+        results = self.reconcile()
+        self.assertEqual(results['indexed_with_lag'], [
+            {'url': f"{SITE}/c/", 'detected': '1 Mar 2026', 'confirmed': '20 Mar 2026'},
+            {'url': f"{SITE}/d/", 'detected': '2 Feb 2026', 'confirmed': '4 Feb 2026'},
+        ])
+        self.assertEqual(results['metadata']['false_positives_moved'], 1)
+        self.assertEqual([page['url'] for page in results['indexed_public']],
+                         [f"{SITE}/", f"{SITE}/a/", f"{SITE}/old/"])
+
+    def test_to_index(self):
+        """Pages not indexed by either table, tiered by inbound links, keeping their Submitted dates"""
+        results = self.reconcile()
+        self.assertEqual(
+            {tier: [(page['url'], page['submitted']) for page in section['pages']]
+             for tier, section in results['to_index'].items()},
+            {'1': [(f"{SITE}/b/", '28 Feb 2026'), (f"{SITE}/e/", '-')], '4': [(f"{SITE}/gone/", '-')]}
+        )
+        self.assertEqual(results['built_not_in_sitemap'], [{'url': f"{SITE}/f/", 'inbound': 1}])
+        self.assertEqual(results['indexed_but_removed'], [{'url': f"{SITE}/old/", 'last_crawled': '-'}])
+        self.assertEqual(results['metadata']['sitemap_not_built'], 1)
+
+    def test_round_trip(self):
+        """Regenerated files read back to the same reconciliation"""
+        first = self.reconcile()
+        self.write(first)
+        self.assertEqual(read_generated(self.root / "to-index.md"), TODAY)
+
+        second = self.reconcile()
+        for key in ('indexed_public', 'indexed_with_lag', 'to_index', 'built_not_in_sitemap', 'indexed_but_removed'):
+            with self.subTest(key=key):
+                self.assertEqual(second[key], first[key])
+        self.assertEqual(second['metadata']['false_positives_moved'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,26 +16,52 @@ from utils import save_json, ensure_dir, timestamp
 
 # Import analysis modules
 from outbound_links import OutboundLinksAnalyzer
-from internal_links import InternalLinksChecker
+from internal_links import InternalLinksChecker, scan_tree, tree_index
+from asset_audit import DEFAULT_HEAVY_PAGE_KB, AssetAuditor, size_index
+from asset_audit import generate_markdown_report as generate_asset_report
 from link_graph import LinkGraphAnalyzer, generate_markdown_report as generate_graph_report
+from near_duplicates import DEFAULT_THRESHOLD as DEFAULT_DUPLICATE_THRESHOLD
+from extractor import DEFAULT_EXTRACTOR, EXTRACTORS, extract_site
+from extract_cache import ExtractionCache, CACHE_FILENAME
+from graph_output import GRAPH_FORMATS, save_analysis
+from watch import POLL_INTERVAL, SiteWatcher
+from instrumentation import PROFILE_DIRNAME, Instrumentation, step
+from crawler import SiteCrawler
+from http_common import DEFAULT_USER_AGENT
+from domain_scheduler import DomainScheduler
 
 
 def run_full_analysis(
     dist_path: Path,
     config: dict,
     output_dir: Path,
-    skip_http: bool = False
+    skip_http: bool = False,
+    workers: int = None,
+    use_cache: bool = True,
+    extractor: str = DEFAULT_EXTRACTOR,
+    graph_format: str = "json",
+    profile: bool = False,
+    crawler: SiteCrawler = None
 ) -> dict:
-    """Run all analysis components"""
+    """Run all analysis components
+
+    With a crawler, pages come from crawling a running site instead of
+    reading dist_path (pass crawler.root as dist_path).
+
+    Each phase is timed (wall/CPU time, peak RSS growth, throughput and
+    sub-steps) into metadata.timings; with profile=True a cProfile dump per
+    phase is written to output_dir/profiles.
+    """
 
     results = {
         "metadata": {
             "analyzed_at": timestamp(),
-            "dist_path": str(dist_path)
+            "dist_path": crawler.base_url if crawler else str(dist_path)
         },
         "outbound": None,
         "internal": None,
         "link_graph": None,
+        "assets": None,
         "http_check": None
     }
 
@@ -47,20 +73,58 @@ def run_full_analysis(
 
     excluded_paths = config.get("excluded_paths", [])
     thresholds = config.get("thresholds", {})
+    pagerank = config.get("pagerank", {})
 
     ensure_dir(output_dir)
+    instrumentation = Instrumentation(output_dir / PROFILE_DIRNAME if profile else None)
+
+    # 0. Page Extraction (read and parse every page once, shared by all phases)
+    if crawler:
+        print("\n" + "=" * 60)
+        print("PHASE 0: Site Crawl")
+        print("=" * 60)
+
+        with instrumentation.phase("crawl") as phase:
+            pages = crawler.crawl()
+            links_total = sum(len(page.links) for page in pages)
+            phase.files, phase.links = len(pages), links_total
+
+        results["metadata"]["crawl"] = crawler.stats()
+        results["metadata"]["extraction_cache"] = {"enabled": False}
+    else:
+        print("\n" + "=" * 60)
+        print("PHASE 0: Page Extraction")
+        print("=" * 60)
+
+        cache = ExtractionCache(output_dir / CACHE_FILENAME, extractor) if use_cache else None
+        with instrumentation.phase("extraction") as phase:
+            try:
+                pages = extract_site(dist_path, workers, cache, extractor)
+            finally:
+                if cache:
+                    cache.close()
+            links_total = sum(len(page.links) for page in pages)
+            phase.files, phase.links = len(pages), links_total
+
+        results["metadata"]["extraction_cache"] = cache.stats() if cache else {"enabled": False}
+        if cache:
+            stats = results["metadata"]["extraction_cache"]
+            print(f"Cache hits: {stats['hits'] + stats['revalidated']}, parsed: {stats['misses']}, removed: {stats['removed']}")
 
     # 1. Outbound Links Analysis
     print("\n" + "=" * 60)
     print("PHASE 1: Outbound Links Analysis")
     print("=" * 60)
 
-    outbound_analyzer = OutboundLinksAnalyzer(dist_path, internal_domains)
-    outbound_results = outbound_analyzer.analyze()
-    results["outbound"] = outbound_results["metadata"]
+    with instrumentation.phase("outbound") as phase:
+        phase.files, phase.links = len(pages), links_total
+        outbound_analyzer = OutboundLinksAnalyzer(dist_path, internal_domains)
+        outbound_results = outbound_analyzer.analyze(pages)
+        results["outbound"] = outbound_results["metadata"]
 
-    outbound_file = output_dir / "outbound_links.json"
-    save_json(outbound_results, outbound_file)
+        outbound_file = output_dir / "outbound_links.json"
+        with step("serialize"):
+            save_json(outbound_results, outbound_file)
     print(f"Saved to: {outbound_file}")
 
     # 2. Internal Links Check
@@ -68,12 +132,24 @@ def run_full_analysis(
     print("PHASE 2: Internal Links Check")
     print("=" * 60)
 
-    internal_checker = InternalLinksChecker(dist_path, excluded_paths=excluded_paths)
-    internal_results = internal_checker.analyze()
-    results["internal"] = internal_results["metadata"]
-
-    internal_file = output_dir / "internal_links.json"
-    save_json(internal_results, internal_file)
+    with instrumentation.phase("internal") as phase:
+        phase.files, phase.links = len(pages), links_total
+        internal_checker = InternalLinksChecker(
+            dist_path,
+            excluded_paths=excluded_paths,
+            file_index=crawler.file_index if crawler else None
+        )
+        if not crawler:
+            # One walk of dist_path, shared with the asset audit
+            with step('index'):
+                files, directories = scan_tree(dist_path)
+            internal_checker.file_index = tree_index(files, directories)
+        internal_results = internal_checker.analyze(pages)
+        results["internal"] = internal_results["metadata"]
+
+        internal_file = output_dir / "internal_links.json"
+        with step("serialize"):
+            save_json(internal_results, internal_file)
     print(f"Saved to: {internal_file}")
 
     # 3. Link Graph Analysis
@@ -81,39 +157,83 @@ def run_full_analysis(
     print("PHASE 3: Link Graph Analysis")
     print("=" * 60)
 
-    graph_analyzer = LinkGraphAnalyzer(dist_path, excluded_paths=excluded_paths)
-    graph_results = graph_analyzer.analyze(
-        underlinked_threshold=thresholds.get("underlinked_min_inbound", 3),
-        overlinked_threshold=thresholds.get("overlinked_max_outbound", 50),
-        sink_min_inbound=thresholds.get("link_sink_min_inbound", 5),
-        sink_max_outbound=thresholds.get("link_sink_max_outbound", 2)
-    )
-    results["link_graph"] = {
-        "metadata": graph_results["metadata"],
-        "summary": graph_results["summary"]
-    }
-
-    graph_file = output_dir / "link_graph.json"
-    save_json(graph_results, graph_file)
+    with instrumentation.phase("link_graph") as phase:
+        phase.files, phase.links = len(pages), links_total
+        graph_analyzer = LinkGraphAnalyzer(dist_path, excluded_paths=excluded_paths)
+        graph_results = graph_analyzer.analyze(
+            underlinked_threshold=thresholds.get("underlinked_min_inbound", 3),
+            overlinked_threshold=thresholds.get("overlinked_max_outbound", 50),
+            sink_min_inbound=thresholds.get("link_sink_min_inbound", 5),
+            sink_max_outbound=thresholds.get("link_sink_max_outbound", 2),
+            pages=pages,
+            pagerank_damping=pagerank.get("damping", 0.85),
+            pagerank_tolerance=pagerank.get("tolerance", 1e-6),
+            pagerank_max_iterations=pagerank.get("max_iterations", 100),
+            max_depth=thresholds.get("max_click_depth", 3),
+            entry_points=config.get("entry_points", []),
+            include_graph=False,
+            suggested_sources=config.get("recommendations", {}).get("sources_per_page", 5),
+            duplicate_threshold=config.get("near_duplicates", {}).get("threshold", DEFAULT_DUPLICATE_THRESHOLD)
+        )
+        results["link_graph"] = {
+            "metadata": graph_results["metadata"],
+            "summary": graph_results["summary"]
+        }
+
+        graph_file = output_dir / "link_graph.json"
+        report_file = output_dir / "link_graph_report.md"
+        with step("serialize"):
+            save_analysis(graph_analyzer, graph_results, graph_file, graph_format)
+            # Generate markdown report
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(generate_graph_report(graph_results))
     print(f"Saved to: {graph_file}")
-
-    # Generate markdown report
-    report = generate_graph_report(graph_results)
-    report_file = output_dir / "link_graph_report.md"
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
     print(f"Report saved to: {report_file}")
 
-    # 4. HTTP Check (optional, skip by default for speed)
+    # 4. Asset Audit (page weight from the asset references found during extraction)
+    print("\n" + "=" * 60)
+    print("PHASE 4: Asset Audit")
+    print("=" * 60)
+
+    if crawler:
+        print("Skipped. A crawled site has no files on disk to size")
+        results["assets"] = {"status": "skipped"}
+    else:
+        with instrumentation.phase("assets") as phase:
+            phase.files, phase.links = len(pages), links_total
+            asset_auditor = AssetAuditor(
+                dist_path,
+                internal_domains=internal_domains,
+                excluded_paths=excluded_paths,
+                heavy_page_kb=config.get("assets", {}).get("heavy_page_kb", DEFAULT_HEAVY_PAGE_KB),
+                file_sizes=size_index(files)
+            )
+            asset_results = asset_auditor.analyze(pages)
+            results["assets"] = asset_results["metadata"]
+
+            asset_file = output_dir / "asset_audit.json"
+            asset_report_file = output_dir / "asset_report.md"
+            with step("serialize"):
+                save_json(asset_results, asset_file)
+                with open(asset_report_file, 'w', encoding='utf-8') as f:
+                    f.write(generate_asset_report(asset_results))
+        print(f"Saved to: {asset_file}")
+        print(f"Report saved to: {asset_report_file}")
+
+    # 5. HTTP Check (optional, skip by default for speed)
     if not skip_http:
         print("\n" + "=" * 60)
-        print("PHASE 4: HTTP Link Validation")
+        print("PHASE 5: HTTP Link Validation")
         print("=" * 60)
         print("Skipped. Run http_checker.py separately with --input outbound_links.json")
         results["http_check"] = {"status": "skipped"}
     else:
         results["http_check"] = {"status": "skipped"}
 
+    results["metadata"]["timings"] = instrumentation.as_dict()
+    if profile:
+        print(f"Profiles saved to: {output_dir / PROFILE_DIRNAME}")
+
     return results
 
 
@@ -169,8 +289,45 @@ def generate_summary_report(results: dict, output_path: Path) -> None:
             f"- Under-linked pages: {summary['underlinked_pages']}",
             f"- Over-linked pages: {summary['overlinked_pages']}",
             f"- Link sinks: {summary['link_sinks']}",
+            f"- Unreachable from entry points: {summary['unreachable_pages']}",
+            f"- Deeper than {meta['thresholds']['max_depth']} clicks: {summary['deep_pages']}",
+            f"- Single-parent pages: {summary['single_parent_pages']}",
+            f"- Near-duplicate pages: {summary['near_duplicate_pages']} in {summary['near_duplicate_clusters']} groups",
+            "",
+        ])
+
+    # Asset audit summary
+    if results.get("assets") and "status" not in results["assets"]:
+        assets = results["assets"]
+        lines.extend([
+            "### Page Weight",
+            f"- Asset references: {assets['asset_references']} ({assets['unique_assets']} unique files)",
+            f"- **Broken asset references: {assets['broken_references']}**",
+            f"- Median page weight: {assets['median_page_bytes'] // 1024} KB",
+            f"- Heaviest page: {assets['max_page_bytes'] // 1024} KB",
+            f"- Pages over {assets['thresholds']['heavy_page_bytes'] // 1024} KB: {assets['heavy_pages']}",
+            "",
+        ])
+
+    # Timings
+    timings = results["metadata"].get("timings")
+    if timings:
+        lines.extend([
+            "## Timings",
             "",
+            "| Phase | Wall (s) | CPU (s) | Peak RSS +MB | Files/sec | Links/sec |",
+            "|-------|----------|---------|--------------|-----------|-----------|",
         ])
+        for name, phase in timings.items():
+            lines.append(
+                f"| {name} | {phase['wall_s']} | {phase['cpu_s']} | {phase['peak_rss_delta_mb']} | "
+                f"{phase['files_per_sec'] or '-'} | {phase['links_per_sec'] or '-'} |"
+            )
+            for step_name, step_metrics in phase["steps"].items():
+                # Steps summed over worker processes have no single wall time
+                wall = step_metrics.get("wall_s", f"{step_metrics.get('summed_s')} (summed)")
+                lines.append(f"| &nbsp;&nbsp;{step_name} | {wall} | {step_metrics.get('cpu_s', '-')} | | | |")
+        lines.append("")
 
     # Recommendations
     lines.extend([
@@ -184,12 +341,21 @@ def generate_summary_report(results: dict, output_path: Path) -> None:
             lines.append(f"1. **Critical:** Fix {summary['orphan_pages']} orphan pages - these may not be indexed by search engines")
         if summary["underlinked_pages"] > 0:
             lines.append(f"2. Add internal links to {summary['underlinked_pages']} under-linked pages")
+        if summary.get("pages_with_link_suggestions"):
+            lines.append(f"   - Suggested linking pages for {summary['pages_with_link_suggestions']} of them "
+                         f"(orphans included) are in link_graph_report.md")
         if summary["link_sinks"] > 0:
             lines.append(f"3. Add outbound links to {summary['link_sinks']} link sink pages to distribute link equity")
 
     if results.get("internal") and results["internal"]["broken_links"] > 0:
         lines.append(f"4. Fix {results['internal']['broken_links']} broken internal links")
 
+    assets = results.get("assets") or {}
+    if assets.get("broken_references"):
+        lines.append(f"5. Fix {assets['broken_references']} broken image, script and stylesheet references")
+    if assets.get("heavy_pages"):
+        lines.append(f"6. Slim down {assets['heavy_pages']} heavy pages (see asset_report.md)")
+
     lines.extend([
         "",
         "## Next Steps",
@@ -205,13 +371,36 @@ def generate_summary_report(results: dict, output_path: Path) -> None:
 
 def main():
     parser = argparse.ArgumentParser(description="Link Analyzer - Full Analysis")
-    parser.add_argument("--dist", "-d", required=True, help="Path to dist directory")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dist", "-d", help="Path to dist directory")
+    source.add_argument("--crawl", metavar="URL",
+                        help="Crawl a running site from this URL instead of reading a dist directory")
     parser.add_argument("--config", help="Path to config.json")
     parser.add_argument("--output-dir", "-o", default="./link_analysis_results",
                         help="Output directory for results")
     parser.add_argument("--full", action="store_true", help="Run full analysis")
     parser.add_argument("--skip-http", action="store_true", default=True,
                         help="Skip HTTP validation (default, run separately)")
+    parser.add_argument("--workers", "-w", type=int,
+                        help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-parse every page instead of using the extraction cache")
+    parser.add_argument("--extractor", choices=list(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help="Link extraction backend (stream is fastest, soup is the reference)")
+    parser.add_argument("--graph-format", choices=GRAPH_FORMATS,
+                        help="link_graph.json format: one JSON document (default) or a summary "
+                             "plus streamed NDJSON/Parquet edge and page files")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the analysis, watch the dist directory and update orphan, "
+                             "under-linked and broken link summaries on every rebuild")
+    parser.add_argument("--watch-interval", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between scans of the dist directory in watch mode (default: {POLL_INTERVAL})")
+    parser.add_argument("--crawl-workers", type=int, help="Concurrent requests while crawling (default: 8)")
+    parser.add_argument("--max-pages", type=int, help="Most URLs to fetch while crawling")
+    parser.add_argument("--sitemap", help="Sitemap to seed the crawl from (default: /sitemap.xml)")
+    parser.add_argument("--no-sitemap", action="store_true", help="Crawl from the start URL only")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Write cProfile stats for each phase to {PROFILE_DIRNAME}/ in the output directory")
 
     args = parser.parse_args()
 
@@ -227,17 +416,41 @@ def main():
         if default_config.exists():
             config = load_json_config(default_config)
 
-    dist_path = Path(args.dist)
-    if not dist_path.exists():
-        print(f"Error: Directory not found: {dist_path}", file=sys.stderr)
-        sys.exit(1)
+    crawler = None
+    if args.crawl:
+        if args.watch:
+            parser.error("--watch needs a dist directory (--dist)")
+        crawl_config = config.get("crawl", {})
+        http_config = config.get("http", {})
+        rate = crawl_config.get("rate", 0)
+        try:
+            crawler = SiteCrawler(
+                args.crawl,
+                internal_domains=config.get("internal_domains", []),
+                max_workers=args.crawl_workers or crawl_config.get("max_workers", 8),
+                max_pages=args.max_pages or crawl_config.get("max_pages"),
+                timeout=http_config.get("timeout", 10),
+                user_agent=http_config.get("user_agent", DEFAULT_USER_AGENT),
+                extractor=args.extractor,
+                sitemap_url=None if args.no_sitemap else args.sitemap or crawl_config.get("sitemap", "/sitemap.xml"),
+                scheduler=DomainScheduler(rate=rate, burst=crawl_config.get("burst", 10)) if rate > 0 else None
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        dist_path = crawler.root
+    else:
+        dist_path = Path(args.dist)
+        if not dist_path.exists():
+            print(f"Error: Directory not found: {dist_path}", file=sys.stderr)
+            sys.exit(1)
 
     output_dir = Path(args.output_dir)
 
     print("=" * 60)
     print("LINK ANALYZER - FULL ANALYSIS")
     print("=" * 60)
-    print(f"Source: {dist_path}")
+    print(f"Source: {args.crawl or dist_path}")
     print(f"Output: {output_dir}")
 
     # Run analysis
@@ -245,7 +458,13 @@ def main():
         dist_path=dist_path,
         config=config,
         output_dir=output_dir,
-        skip_http=args.skip_http
+        skip_http=args.skip_http,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        extractor=args.extractor,
+        graph_format=args.graph_format or config.get("output", {}).get("graph_format", "json"),
+        profile=args.profile,
+        crawler=crawler
     )
 
     # Save overall results
@@ -273,6 +492,28 @@ def main():
     if results.get("internal"):
         print(f"  - Broken internal links: {results['internal']['broken_links']}")
 
+    if results.get("assets") and "status" not in results["assets"]:
+        print(f"  - Broken asset references: {results['assets']['broken_references']}")
+        print(f"  - Heavy pages: {results['assets']['heavy_pages']}")
+
+    if args.watch:
+        cache = None if args.no_cache else ExtractionCache(output_dir / CACHE_FILENAME, args.extractor)
+        watcher = SiteWatcher(
+            dist_path,
+            output_dir,
+            excluded_paths=config.get("excluded_paths", []),
+            underlinked_threshold=config.get("thresholds", {}).get("underlinked_min_inbound", 3),
+            cache=cache,
+            workers=args.workers,
+            extractor=args.extractor
+        )
+        try:
+            watcher.start()
+            watcher.run(args.watch_interval)
+        finally:
+            if cache:
+                cache.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Asset Audit
+Page weight from the images, scripts, stylesheets and icons each page
+loads. Asset references come from the same parse as the links; they are
+resolved against one index of file sizes under dist_path (built by a
+single walk, not a stat per reference). Reports the weight of every page,
+the heaviest pages, broken asset references and the assets the most pages
+share.
+"""
+
+import os
+import sys
+import json
+import argparse
+import posixpath
+import urllib.parse
+from pathlib import Path
+from collections import Counter
+
+# Add shared modules to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+from config_loader import load_json_config
+from utils import save_json, timestamp
+from extractor import DEFAULT_EXTRACTOR, EXTRACTORS, PageRecord, extract_site
+from instrumentation import step
+from internal_links import scan_tree
+
+# Pages heavier than this (HTML plus assets) are reported as heavy
+DEFAULT_HEAVY_PAGE_KB = 1600
+
+# URL schemes whose content is inline, not a file
+INLINE_SCHEMES = ('data:', 'blob:', 'javascript:', 'about:')
+
+
+def size_index(files: dict[str, tuple[int, int]]) -> dict[str, int]:
+    """AssetAuditor.file_sizes of a scan_tree() result"""
+    return {relative: size for relative, (_, size) in files.items()}
+
+
+class AssetAuditor:
+    """Resolve asset references to files under dist_path and add up page weight"""
+
+    def __init__(
+        self,
+        dist_path: Path,
+        internal_domains: list[str] = None,
+        excluded_paths: list[str] = None,
+        heavy_page_kb: int = DEFAULT_HEAVY_PAGE_KB,
+        workers: int = None,
+        extractor: str = DEFAULT_EXTRACTOR,
+        file_sizes: dict[str, int] = None
+    ):
+        self.dist_path = dist_path
+        self.internal_domains = {domain.lower() for domain in internal_domains or []}
+        self.excluded_paths = excluded_paths or []
+        self.heavy_page_bytes = heavy_page_kb * 1024
+        self.workers = workers
+        self.extractor = extractor
+        # Relative POSIX path -> size in bytes of every file under dist_path
+        # (given up front when the walk is shared with the internal link check)
+        self.file_sizes: dict[str, int] | None = file_sizes
+        # Memoized resolve() results per (page directory, URL)
+        self.resolved: dict[tuple[str, str], str | None] = {}
+
+    def build_size_index(self) -> None:
+        """Walk dist_path once, recording the size of every file"""
+        with step('index'):
+            self.file_sizes = size_index(scan_tree(self.dist_path)[0])
+        print(f"Indexed {len(self.file_sizes)} files.")
+
+    def is_excluded(self, path: str) -> bool:
+        """Check if a page should be left out of the audit"""
+        return any(('/' + path).startswith(pattern) for pattern in self.excluded_paths)
+
+    def resolve(self, url: str, directory: str) -> str | None:
+        """Relative POSIX path under dist_path an asset URL points to, whether or not it exists
+
+        Relative URLs resolve against the page's directory. Returns '' for
+        an asset on another domain and None when there is no file to fetch:
+        inline data, the page itself ('?v=2', '#top') or a directory ('/fonts/').
+        """
+        key = (directory, url)
+        if key in self.resolved:
+            return self.resolved[key]
+
+        value = url.strip()
+        parts = urllib.parse.urlsplit(value)
+        if not value or value.lower().startswith(INLINE_SCHEMES):
+            path = None
+        elif (parts.scheme or parts.netloc) and (parts.hostname or '') not in self.internal_domains:
+            path = ''
+        elif not parts.path or parts.path.endswith('/'):
+            path = None
+        else:
+            value = urllib.parse.unquote(parts.path)
+            joined = value if value.startswith('/') else posixpath.join('/' + directory, value)
+            # '..' up to the root names a directory too
+            path = posixpath.normpath(joined).lstrip('/') or None
+
+        self.resolved[key] = path
+        return path
+
+    def audit_page(self, page: PageRecord) -> tuple[dict, set[str], list[dict]]:
+        """(weight entry, files the page references, broken references) for one page
+
+        Of the URLs an element offers (src plus srcset candidates) the
+        browser loads one; the largest that exists is counted, so weights
+        are what a high-density screen downloads. Each file counts once
+        per page however often it is referenced, and an element with no
+        local candidate counts as one external asset.
+        """
+        directory = posixpath.dirname(page.path.replace(os.sep, '/'))
+        loaded: set[str] = set()
+        referenced: set[str] = set()
+        broken = []
+        external = 0
+
+        for asset in page.assets:
+            largest = None
+            remote = False
+            for url in filter(None, [asset.url, *asset.srcset]):
+                path = self.resolve(url, directory)
+                if path is None:
+                    continue
+                if path == '':
+                    remote = True
+                elif path not in self.file_sizes:
+                    broken.append({'source_file': page.path, 'url': url, 'kind': asset.kind})
+                else:
+                    referenced.add(path)
+                    if largest is None or self.file_sizes[path] > self.file_sizes[largest]:
+                        largest = path
+            if largest:
+                loaded.add(largest)
+            elif remote:
+                external += 1
+
+        html_bytes = self.file_sizes.get(page.path.replace(os.sep, '/'), 0)
+        asset_bytes = sum(self.file_sizes[path] for path in loaded)
+        weight = {
+            'page': page.path,
+            'html_bytes': html_bytes,
+            'asset_bytes': asset_bytes,
+            'total_bytes': html_bytes + asset_bytes,
+            'assets': len(loaded),
+            'external_assets': external
+        }
+        return weight, referenced, broken
+
+    def analyze(self, pages: list[PageRecord] = None) -> dict:
+        """Audit the asset references of all HTML files (or pre-extracted page records)"""
+        if pages is None:
+            pages = extract_site(self.dist_path, self.workers, extractor=self.extractor)
+        print(f"Found {len(pages)} HTML files to audit...")
+
+        if self.file_sizes is None:
+            self.build_size_index()
+
+        weights = []
+        broken_assets = []
+        pages_per_asset: Counter = Counter()
+        references = 0
+
+        with step('resolve'):
+            for page in pages:
+                if page.error or self.is_excluded(page.path):
+                    continue
+
+                weight, referenced, broken = self.audit_page(page)
+                weights.append(weight)
+                broken_assets.extend(broken)
+                pages_per_asset.update(referenced)
+                references += sum(bool(asset.url) + len(asset.srcset) for asset in page.assets)
+
+        weights.sort(key=lambda weight: (-weight['total_bytes'], weight['page']))
+        shared_assets = sorted(
+            (
+                {'asset': '/' + path, 'bytes': self.file_sizes[path], 'pages': count}
+                for path, count in pages_per_asset.items()
+                if count > 1
+            ),
+            key=lambda asset: (-asset['pages'], -asset['bytes'], asset['asset'])
+        )
+
+        totals = sorted(weight['total_bytes'] for weight in weights)
+        print(f"Audit complete. Resolved {references} asset references on {len(weights)} pages.")
+
+        return {
+            "metadata": {
+                "analyzed_at": timestamp(),
+                "files_analyzed": len(weights),
+                "files_indexed": len(self.file_sizes),
+                "asset_references": references,
+                "unique_assets": len(pages_per_asset),
+                "broken_references": len(broken_assets),
+                "heavy_pages": sum(total > self.heavy_page_bytes for total in totals),
+                "median_page_bytes": totals[len(totals) // 2] if totals else 0,
+                "max_page_bytes": totals[-1] if totals else 0,
+                "thresholds": {
+                    "heavy_page_bytes": self.heavy_page_bytes
+                }
+            },
+            "pages": weights,
+            "broken_assets": broken_assets,
+            "shared_assets": shared_assets
+        }
+
+
+def format_bytes(size: int) -> str:
+    """Human-readable size (1536 -> '1.5 KB')"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def generate_markdown_report(results: dict, limit: int = 20) -> str:
+    """Generate a markdown page weight report"""
+    meta = results['metadata']
+    lines = [
+        "# Page Weight Report",
+        "",
+        f"**Analyzed:** {meta['analyzed_at']}",
+        "",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| Pages | {meta['files_analyzed']} |",
+        f"| Asset references | {meta['asset_references']} |",
+        f"| Unique assets | {meta['unique_assets']} |",
+        f"| Broken asset references | {meta['broken_references']} |",
+        f"| Median page weight | {format_bytes(meta['median_page_bytes'])} |",
+        f"| Heaviest page | {format_bytes(meta['max_page_bytes'])} |",
+        f"| Pages over {format_bytes(meta['thresholds']['heavy_page_bytes'])} | {meta['heavy_pages']} |",
+        "",
+    ]
+
+    if results['pages']:
+        lines.extend([
+            "## Heaviest Pages",
+            "",
+            "| Page | Total | HTML | Assets | Files |",
+            "|------|-------|------|--------|-------|",
+        ])
+        for page in results['pages'][:limit]:
+            lines.append(
+                f"| `{page['page']}` | {format_bytes(page['total_bytes'])} | {format_bytes(page['html_bytes'])} | "
+                f"{format_bytes(page['asset_bytes'])} | {page['assets']} |"
+            )
+        lines.append("")
+
+    if results['broken_assets']:
+        lines.extend([
+            "## Broken Asset References",
+            "",
+            "| Page | Element | URL |",
+            "|------|---------|-----|",
+        ])
+        for entry in results['broken_assets'][:limit]:
+            lines.append(f"| `{entry['source_file']}` | `<{entry['kind']}>` | `{entry['url']}` |")
+        if len(results['broken_assets']) > limit:
+            lines.append(f"\n*... and {len(results['broken_assets']) - limit} more*")
+        lines.append("")
+
+    if results['shared_assets']:
+        lines.extend([
+            "## Most Shared Assets",
+            "",
+            "Loaded by many pages: worth keeping small and cacheable.",
+            "",
+            "| Asset | Size | Pages |",
+            "|-------|------|-------|",
+        ])
+        for asset in results['shared_assets'][:limit]:
+            lines.append(f"| `{asset['asset']}` | {format_bytes(asset['bytes'])} | {asset['pages']} |")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asset Audit - page weight and broken asset references")
+    parser.add_argument("--dist", "-d", required=True, help="Path to dist directory")
+    parser.add_argument("--config", help="Path to config.json")
+    parser.add_argument("--output", "-o", help="Output JSON file path")
+    parser.add_argument("--report", "-r", help="Output markdown report path")
+    parser.add_argument("--heavy-page-kb", type=int,
+                        help=f"Page weight reported as heavy (default: {DEFAULT_HEAVY_PAGE_KB} KB)")
+    parser.add_argument("--workers", "-w", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--extractor", choices=list(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help="Link extraction backend")
+
+    args = parser.parse_args()
+
+    # Load config
+    config = {}
+    if args.config:
+        config = load_json_config(Path(args.config))
+
+    internal_domains = config.get("internal_domains", [])
+    site_domain = config.get("site_domain", "")
+    if site_domain and not internal_domains:
+        internal_domains = [site_domain, f"www.{site_domain}"]
+
+    dist_path = Path(args.dist)
+    if not dist_path.exists():
+        print(f"Error: Directory not found: {dist_path}", file=sys.stderr)
+        sys.exit(1)
+
+    auditor = AssetAuditor(
+        dist_path,
+        internal_domains=internal_domains,
+        excluded_paths=config.get("excluded_paths", []),
+        heavy_page_kb=args.heavy_page_kb or config.get("assets", {}).get("heavy_page_kb", DEFAULT_HEAVY_PAGE_KB),
+        workers=args.workers,
+        extractor=args.extractor
+    )
+    results = auditor.analyze()
+
+    # Output
+    if args.output:
+        output_path = Path(args.output)
+        save_json(results, output_path)
+        print(f"\nJSON results saved to: {output_path}")
+    elif not args.report:
+        print(json.dumps(results, indent=2))
+
+    if args.report:
+        report_path = Path(args.report)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(generate_markdown_report(results))
+        print(f"Markdown report saved to: {report_path}")
+
+    # Print summary
+    meta = results["metadata"]
+    print(f"\n{'=' * 60}")
+    print("ASSET AUDIT SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Pages analyzed: {meta['files_analyzed']}")
+    print(f"Asset references: {meta['asset_references']} ({meta['unique_assets']} unique files)")
+    print(f"Broken asset references: {meta['broken_references']}")
+    print(f"Median page weight: {format_bytes(meta['median_page_bytes'])}")
+    print(f"Pages over {format_bytes(meta['thresholds']['heavy_page_bytes'])}: {meta['heavy_pages']}")
+
+    if results["pages"]:
+        print(f"\nHEAVIEST PAGES (first 10):")
+        for page in results["pages"][:10]:
+            print(f"  - {page['page']}: {format_bytes(page['total_bytes'])} ({page['assets']} files)")
+
+
+if __name__ == "__main__":
+    main()
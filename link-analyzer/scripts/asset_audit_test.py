@@ -0,0 +1,152 @@
+import io
+import unittest
+from pathlib import Path
+from contextlib import redirect_stdout
+
+from asset_audit import AssetAuditor
+from extractor import AssetRecord, PageRecord
+
+
+FILES = {
+    'index.html': 1000,
+    'blog/post/index.html': 2000,
+    'blog/post/hero.png': 300,
+    'img/logo.svg': 50,
+    'img/hero-1x.jpg': 100,
+    'img/hero-2x.jpg': 400,
+    'img/my photo.png': 70,
+    'css/site.css': 500,
+    'js/app.js': 800,
+}
+
+
+def auditor() -> AssetAuditor:
+    return AssetAuditor(Path("dist"), internal_domains=['example.com', 'www.example.com'], file_sizes=dict(FILES))
+
+
+class TestResolve(unittest.TestCase):
+
+    def test_resolve(self):
+        cases = [
+            # Relative to the page's directory vs root-relative
+            ('hero.png', 'blog/post/hero.png'),
+            ('/img/logo.svg', 'img/logo.svg'),
+            ('hero.png?v=3#top', 'blog/post/hero.png'),
+            # Absolute URLs on the site's own domains are local
+            ('https://example.com/img/logo.svg', 'img/logo.svg'),
+            ('https://WWW.Example.com/img/logo.svg', 'img/logo.svg'),
+            # Anything else is external
+            ('https://cdn.example.net/img/logo.svg', ''),
+            ('//cdn.example.net/img/logo.svg', ''),
+            # Inline data has nothing to fetch
+            ('data:image/png;base64,iVBORw0KGgo=', None),
+            ('  ', None),
+            ('/img/my%20photo.png', 'img/my photo.png'),
+            ('../../img/logo.svg', 'img/logo.svg'),
+            ('../../../../img/logo.svg', 'img/logo.svg'),
+            ('./../post/./hero.png', 'blog/post/hero.png'),
+            # The page itself and directories are not asset files
+            ('?v=2', None),
+            ('#x', None),
+            ('https://example.com', None),
+            ('https://example.com/', None),
+            ('/fonts/', None),
+            ('../', None),
+            ('../../..', None),
+        ]
+        audit = auditor()
+        for url, expected in cases:
+            with self.subTest(url=url):
+                self.assertEqual(audit.resolve(url, 'blog/post'), expected)
+
+
+class TestAuditPage(unittest.TestCase):
+
+    def test_largest_existing_candidate(self):
+        """Of src and srcset the largest file that exists is loaded; missing candidates are broken"""
+        page = PageRecord(path='index.html', assets=[
+            AssetRecord(kind='img', url='/img/hero-1x.jpg', srcset=['/img/hero-2x.jpg', '/img/hero-3x.jpg'])
+        ])
+        weight, referenced, broken = auditor().audit_page(page)
+        self.assertEqual(referenced, {'img/hero-1x.jpg', 'img/hero-2x.jpg'})
+        self.assertEqual((weight['assets'], weight['asset_bytes'], weight['total_bytes']), (1, 400, 1400))
+        self.assertEqual(broken, [{'source_file': 'index.html', 'url': '/img/hero-3x.jpg', 'kind': 'img'}])
+
+    def test_shared_file_counted_once(self):
+        page = PageRecord(path='blog/post/index.html', assets=[
+            AssetRecord(kind='link', url='/css/site.css'),
+            AssetRecord(kind='link', url='../../css/site.css'),
+            AssetRecord(kind='script', url='https://example.com/js/app.js'),
+            AssetRecord(kind='img', url='hero.png?v=2'),
+        ])
+        weight, referenced, broken = auditor().audit_page(page)
+        self.assertEqual(referenced, {'css/site.css', 'js/app.js', 'blog/post/hero.png'})
+        self.assertEqual((weight['html_bytes'], weight['asset_bytes'], weight['assets']), (2000, 1600, 3))
+        self.assertEqual(broken, [])
+
+    def test_external_counted_per_element(self):
+        """A CDN image counts once however many srcset candidates it offers"""
+        page = PageRecord(path='index.html', assets=[
+            AssetRecord(kind='img', url='https://cdn.example.net/a.jpg',
+                        srcset=['https://cdn.example.net/a-2x.jpg', 'https://cdn.example.net/a-3x.jpg']),
+            AssetRecord(kind='script', url='https://cdn.example.net/lib.js'),
+            # A local candidate is what gets counted
+            AssetRecord(kind='img', url='/img/logo.svg', srcset=['https://cdn.example.net/logo.svg']),
+        ])
+        weight, _, _ = auditor().audit_page(page)
+        self.assertEqual((weight['external_assets'], weight['assets']), (2, 1))
+
+    def test_no_file_references(self):
+        """Self-references, directories and inline data are neither broken nor external"""
+        page = PageRecord(path='index.html', assets=[
+            AssetRecord(kind='link', url='?v=2'),
+            AssetRecord(kind='link', url='#icons'),
+            AssetRecord(kind='link', url='https://example.com'),
+            AssetRecord(kind='link', url='/fonts/'),
+            AssetRecord(kind='img', url='data:image/gif;base64,R0lGOD=='),
+        ])
+        weight, referenced, broken = auditor().audit_page(page)
+        self.assertEqual((weight['assets'], weight['external_assets'], referenced, broken), (0, 0, set(), []))
+
+
+class TestAnalyze(unittest.TestCase):
+
+    def test_shared_asset_ranking(self):
+        """Assets on more than one page, most pages first, then largest, then by path"""
+        pages = [
+            PageRecord(path='index.html', assets=[
+                AssetRecord(kind='link', url='/css/site.css'),
+                AssetRecord(kind='script', url='/js/app.js'),
+                AssetRecord(kind='img', url='/img/logo.svg'),
+                AssetRecord(kind='img', url='/img/hero-1x.jpg'),
+            ]),
+            PageRecord(path='blog/post/index.html', assets=[
+                AssetRecord(kind='link', url='/css/site.css'),
+                AssetRecord(kind='img', url='/img/logo.svg'),
+                AssetRecord(kind='img', url='/img/missing.png'),
+            ]),
+            PageRecord(path='about/index.html', assets=[
+                AssetRecord(kind='img', url='/img/logo.svg'),
+                AssetRecord(kind='script', url='/js/app.js'),
+                AssetRecord(kind='link', url='/css/site.css'),
+            ]),
+            PageRecord(path='broken.html', error='unreadable'),
+        ]
+        with redirect_stdout(io.StringIO()):
+            results = auditor().analyze(pages)
+
+        self.assertEqual(results['shared_assets'], [
+            {'asset': '/css/site.css', 'bytes': 500, 'pages': 3},
+            {'asset': '/img/logo.svg', 'bytes': 50, 'pages': 3},
+            {'asset': '/js/app.js', 'bytes': 800, 'pages': 2},
+        ])
+        # Heaviest first: 2000 + 550, 1000 + 1450, 0 + 1350 bytes
+        self.assertEqual([page['page'] for page in results['pages']],
+                         ['blog/post/index.html', 'index.html', 'about/index.html'])
+        self.assertEqual(results['broken_assets'],
+                         [{'source_file': 'blog/post/index.html', 'url': '/img/missing.png', 'kind': 'img'}])
+        self.assertEqual((results['metadata']['files_analyzed'], results['metadata']['asset_references']), (3, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Async HTTP Link Checker
+asyncio engine for HTTPLinkChecker: one pooled keep-alive session, a global
+concurrency limit and a per-host limit. Same HEAD->GET fallback semantics
+and result schema as the threaded engine.
+"""
+
+import time
+import asyncio
+from collections import defaultdict
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from http_common import DEFAULT_USER_AGENT, HEAD_FALLBACK_STATUS_CODES, build_result, host_of, origin_of, print_progress
+from http_cache import HTTPResultCache, validators_from
+from domain_scheduler import DomainScheduler, interleave_by_domain
+from domain_probe import DomainProbe
+from check_journal import CheckJournal
+
+
+# requests follows up to 30 redirects; aiohttp defaults to 10
+MAX_REDIRECTS = 30
+
+
+class AsyncHTTPLinkChecker:
+    """Check external links with asyncio and pooled connections"""
+
+    def __init__(
+        self,
+        timeout: int = 5,
+        max_concurrency: int = 100,
+        max_per_host: int = 8,
+        retry_count: int = 1,
+        user_agent: str = DEFAULT_USER_AGENT,
+        cache: HTTPResultCache = None,
+        scheduler: DomainScheduler = None,
+        throttle_retries: int = 2,
+        probe: DomainProbe = None,
+        journal: CheckJournal = None
+    ):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("The async engine requires aiohttp (pip install aiohttp)")
+
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.retry_count = retry_count
+        self.user_agent = user_agent
+        self.cache = cache
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+        self.probe = probe
+        self.journal = journal
+        # Results stay in memory only when there is no journal to append them to
+        self.results: list[dict] = []
+        # Conditional request headers per URL, and final response headers seen
+        self.conditional: dict[str, dict] = {}
+        self.response_headers: dict[str, dict] = {}
+
+    def create_session(self) -> "aiohttp.ClientSession":
+        """Keep-alive session shared by every check in a run"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_per_host,
+            ttl_dns_cache=300,
+            resolver=self.probe.resolver() if self.probe else None
+        )
+        # Like requests' timeout: per connect and per read, not for the whole exchange
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={'User-Agent': self.user_agent},
+            cookie_jar=aiohttp.DummyCookieJar()
+        )
+
+    async def fetch_status(self, session: "aiohttp.ClientSession", url: str) -> tuple[int, str]:
+        """HEAD the URL, falling back to GET when HEAD is refused"""
+        headers = self.conditional.get(url)
+        async with session.head(url, headers=headers, allow_redirects=True, max_redirects=MAX_REDIRECTS) as response:
+            if response.status not in HEAD_FALLBACK_STATUS_CODES:
+                self.response_headers[url] = response.headers
+                return response.status, response.reason
+
+        async with session.get(url, headers=headers, allow_redirects=True, max_redirects=MAX_REDIRECTS) as response:
+            # Only read first 1KB
+            await response.content.read(1024)
+            self.response_headers[url] = response.headers
+            return response.status, response.reason
+
+    async def check_url(self, session: "aiohttp.ClientSession", url: str) -> tuple[int | None, str, bool]:
+        """Check if URL is accessible"""
+        for attempt in range(self.retry_count):
+            try:
+                status_code, reason = await self.fetch_status(session, url)
+                return status_code, reason, status_code >= 400
+
+            except asyncio.TimeoutError:
+                if attempt == self.retry_count - 1:
+                    return None, "Timeout", True
+                await asyncio.sleep(self.retry_delay(url))
+
+            except aiohttp.TooManyRedirects:
+                return None, "Too Many Redirects", True
+
+            # Includes SSL errors, as requests' ConnectionError does
+            except aiohttp.ClientConnectionError:
+                return None, "Connection Error (Domain may not exist)", True
+
+            except Exception as e:
+                return None, f"Error: {str(e)}", True
+
+        return None, "Unknown Error", True
+
+    def retry_delay(self, url: str) -> float:
+        """Seconds to wait before retrying a timed-out request; also slows its domain down"""
+        if self.scheduler:
+            self.scheduler.penalize(host_of(url))
+        return 1
+
+    async def check_scheduled(
+        self,
+        session: "aiohttp.ClientSession",
+        url: str,
+        global_limit: asyncio.Semaphore
+    ) -> tuple[int | None, str, bool]:
+        """Check a URL within its domain's rate limit, retrying throttled requests"""
+        if not self.scheduler:
+            async with global_limit:
+                return await self.check_url(session, url)
+
+        domain = host_of(url)
+        for attempt in range(self.throttle_retries + 1):
+            while (delay := self.scheduler.acquire(domain)) > 0:
+                await asyncio.sleep(delay)
+            self.response_headers.pop(url, None)
+            async with global_limit:
+                started = time.monotonic()
+                status = await self.check_url(session, url)
+            retry_after = self.response_headers.get(url, {}).get('Retry-After')
+            throttled = self.scheduler.record(domain, status[0], time.monotonic() - started, retry_after)
+            if not throttled:
+                break
+        return status
+
+    def store(self, result: dict) -> None:
+        """Keep a finished result (appended to the journal as soon as it completes)"""
+        if self.journal:
+            self.journal.append(result)
+        else:
+            self.results.append(result)
+
+    async def check_all(self, urls_with_info: dict[str, dict]) -> list[dict]:
+        """Check every URL, at most max_per_host at a time per host (and port)"""
+        if self.cache:
+            cached, urls_with_info, self.conditional = self.cache.partition(urls_with_info)
+            for result in cached:
+                self.store(result)
+            print(f"{len(cached)} URLs fresh in cache, {len(self.conditional)} to revalidate")
+
+        if self.probe:
+            failed, urls_with_info = await asyncio.to_thread(self.probe.short_circuit, urls_with_info)
+            for result in failed:
+                if self.cache:
+                    self.cache.record(result)
+                self.store(result)
+
+        if self.scheduler:
+            urls_with_info = interleave_by_domain(urls_with_info)
+
+        total = len(urls_with_info)
+        completed = 0
+
+        # Tasks wait for their host slot (and rate limit) before taking a
+        # global slot, so a busy host never holds up checks against other hosts
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
+
+        async with self.create_session() as session:
+            async def check_single(url: str, info: dict) -> dict:
+                async with host_limits[origin_of(url)]:
+                    status = await self.check_scheduled(session, url, global_limit)
+                return build_result(url, info, *status)
+
+            tasks = [
+                asyncio.ensure_future(check_single(url, info))
+                for url, info in urls_with_info.items()
+            ]
+            for future in asyncio.as_completed(tasks):
+                result = await future
+                completed += 1
+                headers = self.response_headers.pop(result['url'], {})
+                if self.cache:
+                    self.cache.record(result, validators_from(headers))
+                self.store(result)
+                print_progress(completed, total, result)
+
+        return self.results
+
+    def check_urls(self, urls_with_info: dict[str, dict]) -> list[dict]:
+        """Check multiple URLs concurrently"""
+        print(f"Checking {len(urls_with_info)} URLs asynchronously "
+              f"(max {self.max_concurrency} concurrent, {self.max_per_host} per host)...")
+        return asyncio.run(self.check_all(urls_with_info))
@@ -0,0 +1,163 @@
+import time
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from async_checker import AIOHTTP_AVAILABLE, AsyncHTTPLinkChecker
+
+
+# path -> (HEAD status, GET status, extra headers)
+ROUTES = {
+    '/ok': (200, 200, {}),
+    '/missing': (404, 404, {}),
+    '/no-head': (405, 200, {}),
+    '/head-forbidden': (403, 200, {}),
+    '/forbidden': (403, 403, {}),
+    '/gone': (410, 410, {}),
+    '/server-error': (500, 500, {}),
+    '/redirect': (301, 301, {'Location': '/ok'}),
+    '/redirect-to-missing': (302, 302, {'Location': '/missing'}),
+    '/loop': (302, 302, {'Location': '/loop'}),
+}
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops concurrent connects, which then time out
+    request_queue_size = 128
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves ROUTES over keep-alive HTTP/1.1 and records what it saw"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def respond(self, head: bool):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        path = urlparse(self.path).path
+        if path == '/slow':
+            time.sleep(1.0)
+        elif path == '/busy':
+            time.sleep(0.05)
+
+        head_status, get_status, headers = ROUTES.get(path, (200, 200, {}))
+        body = b'x' * 4096
+        self.send_response(head_status if head else get_status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+class TestAsyncHTTPLinkChecker(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer(('127.0.0.1', 0), StandInHandler)
+        self.server.lock = threading.Lock()
+        self.server.connections = set()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def check(self, paths: list[str], **kwargs) -> dict[str, dict]:
+        checker = AsyncHTTPLinkChecker(timeout=0.5, **kwargs)
+        urls_with_info = {
+            f"{self.base}{path}": {'count': 2, 'pages': ['/a/', '/b/']}
+            for path in paths
+        }
+        results = checker.check_urls(urls_with_info)
+        return {result['url'][len(self.base):]: result for result in results}
+
+    def test_statuses_and_head_fallback(self):
+        """Same status codes, messages and HEAD->GET fallback as the threaded engine"""
+        results = self.check(list(ROUTES))
+        expected = {
+            '/ok': (200, 'OK', False),
+            '/missing': (404, 'Not Found', True),
+            '/no-head': (200, 'OK', False),
+            '/head-forbidden': (200, 'OK', False),
+            '/forbidden': (403, 'Forbidden', True),
+            '/gone': (410, 'Gone', True),
+            '/server-error': (500, 'Internal Server Error', True),
+            '/redirect': (200, 'OK', False),
+            '/redirect-to-missing': (404, 'Not Found', True),
+            '/loop': (None, 'Too Many Redirects', True),
+        }
+        for path, (status_code, status_message, is_broken) in expected.items():
+            with self.subTest(path=path):
+                result = results[path]
+                self.assertEqual(result['status_code'], status_code)
+                self.assertEqual(result['status_message'], status_message)
+                self.assertEqual(result['is_broken'], is_broken)
+
+    def test_result_schema(self):
+        """Result records match the threaded engine's schema"""
+        result = self.check(['/ok'])['/ok']
+        self.assertEqual(result, {
+            'url': f"{self.base}/ok",
+            'status_code': 200,
+            'status_message': 'OK',
+            'is_broken': False,
+            'occurrences': 2,
+            'sample_pages': ['/a/', '/b/']
+        })
+
+    def test_timeout(self):
+        result = self.check(['/slow'])['/slow']
+        self.assertEqual((result['status_code'], result['status_message'], result['is_broken']),
+                         (None, 'Timeout', True))
+
+    def test_connection_error(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed_port = sock.getsockname()[1]
+        checker = AsyncHTTPLinkChecker(timeout=0.5)
+        [result] = checker.check_urls({f"http://127.0.0.1:{closed_port}/": {}})
+        self.assertEqual(result['status_message'], 'Connection Error (Domain may not exist)')
+        self.assertTrue(result['is_broken'])
+
+    def test_invalid_url(self):
+        checker = AsyncHTTPLinkChecker(timeout=0.5)
+        [result] = checker.check_urls({'mailto:someone@example.com': {}})
+        self.assertIsNone(result['status_code'])
+        self.assertTrue(result['status_message'].startswith('Error: '))
+        self.assertTrue(result['is_broken'])
+
+    def test_per_host_limit_and_connection_reuse(self):
+        """Never more than max_per_host requests in flight, over reused connections"""
+        paths = [f"/busy?page={i}" for i in range(40)]
+        results = self.check(paths, max_concurrency=50, max_per_host=4)
+        self.assertEqual(len(results), 40)
+        self.assertLessEqual(self.server.max_in_flight, 4)
+        self.assertLessEqual(len(self.server.connections), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
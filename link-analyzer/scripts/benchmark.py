@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Link Analyzer Benchmark
+Times every phase of the full analysis, plus the HTTP checker against a
+local stub server, on synthetic sites of increasing size. Records wall time,
+CPU time, peak RSS growth and files/sec per phase to a JSON baseline, and
+flags regressions against a previously recorded baseline.
+"""
+
+import os
+import sys
+import json
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Add shared modules to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+from config_loader import load_json_config
+from utils import save_json, load_json, timestamp
+from synthetic_site import SITE_CONFIG_FILENAME, generate_site
+from instrumentation import Instrumentation, peak_rss_mb
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE = Path(__file__).parent.parent / "benchmarks" / "baseline.json"
+DEFAULT_CONFIG = Path(__file__).parent.parent / "benchmarks" / "config.json"
+
+# A phase regresses when it is this much slower (or bigger) than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+# Phases shorter than this are too noisy to flag on wall time
+MIN_COMPARABLE_SECONDS = 0.5
+
+# Wall times only compare between runs on the same kind of machine
+HOST_KEYS = ('platform', 'cpu_count')
+
+# Most unique outbound URLs checked per size (keeps the HTTP phase bounded)
+DEFAULT_HTTP_URLS = 2000
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every URL instantly: 404 for paths containing 'missing', else 200"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.send_response(404 if 'missing' in self.path else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, format, *args):
+        pass
+
+
+def stub_urls(outbound_links: dict[str, list[str]], base: str, limit: int) -> dict[str, dict]:
+    """Map external URLs onto the stub server (host becomes the first path segment)"""
+    urls_with_info = {}
+    for url, pages in outbound_links.items():
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            continue
+        urls_with_info[f"{base}/{parts.hostname}{parts.path}"] = {'count': len(pages), 'pages': pages}
+        if len(urls_with_info) >= limit:
+            break
+    return urls_with_info
+
+
+def run_size(dist_path: Path, output_dir: Path, config: dict, workers: int = None,
+             http_urls: int = DEFAULT_HTTP_URLS) -> dict:
+    """Run the full analysis once against a generated site (called in a fresh process per size)
+
+    Phase timings come from run_full_analysis's own instrumentation; the
+    HTTP check, which it leaves to http_checker.py, is timed here against
+    the stub server.
+    """
+    from io import StringIO
+    from contextlib import redirect_stdout
+
+    from analyze import run_full_analysis
+    from async_checker import AIOHTTP_AVAILABLE, AsyncHTTPLinkChecker
+    from http_checker import HTTPLinkChecker
+
+    instrumentation = Instrumentation()
+    with redirect_stdout(StringIO()):
+        results = run_full_analysis(dist_path, config, output_dir, skip_http=True, workers=workers, use_cache=False)
+        outbound_results = load_json(output_dir / "outbound_links.json")
+
+        server = StubServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            urls_with_info = stub_urls(
+                outbound_results["outbound_links"], f"http://127.0.0.1:{server.server_address[1]}", http_urls
+            )
+            if AIOHTTP_AVAILABLE:
+                checker = AsyncHTTPLinkChecker(timeout=10, max_concurrency=100, max_per_host=100)
+            else:
+                checker = HTTPLinkChecker(timeout=10, max_workers=20)
+            with instrumentation.phase("http_check") as phase:
+                phase.links = len(urls_with_info)
+                checker.check_urls(urls_with_info)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    phases = {**results["metadata"]["timings"], **instrumentation.as_dict()}
+    return {
+        "pages": phases["extraction"]["files"],
+        "links": phases["extraction"]["links"],
+        "phases": phases,
+        "total_wall_s": round(sum(phase["wall_s"] for phase in phases.values()), 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def slower(name: str, wall: float, base_wall: float, tolerance: float) -> str | None:
+    """A regression line if wall time grew past the tolerance on a long enough baseline"""
+    if base_wall >= MIN_COMPARABLE_SECONDS and wall > base_wall * (1 + tolerance):
+        return f"{name}: {wall}s vs {base_wall}s baseline (+{wall / base_wall - 1:.0%})"
+    return None
+
+
+def host_mismatches(metadata: dict, baseline_metadata: dict) -> list[str]:
+    """How this machine differs from the one the baseline was recorded on"""
+    return [
+        f"{key}: {metadata[key]} here, {baseline_metadata.get(key)} in the baseline"
+        for key in HOST_KEYS
+        if metadata[key] != baseline_metadata.get(key)
+    ]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describe every phase (and timed sub-step) that got slower or bigger than the baseline allows"""
+    regressions = []
+    for size, run in results.items():
+        base_run = baseline.get("results", {}).get(size)
+        if not base_run:
+            continue
+        for phase, metrics in run["phases"].items():
+            base = base_run["phases"].get(phase)
+            if not base:
+                continue
+            regressions.append(slower(f"{size} pages / {phase}", metrics["wall_s"], base["wall_s"], tolerance))
+            for step, step_metrics in metrics.get("steps", {}).items():
+                base_step = base.get("steps", {}).get(step, {})
+                if "wall_s" in step_metrics and "wall_s" in base_step:
+                    regressions.append(slower(f"{size} pages / {phase}.{step}", step_metrics["wall_s"],
+                                              base_step["wall_s"], tolerance))
+        if run["peak_rss_mb"] > base_run["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{size} pages: peak RSS {run['peak_rss_mb']} MB vs {base_run['peak_rss_mb']} MB baseline"
+            )
+    return [line for line in regressions if line]
+
+
+def print_results(results: dict) -> None:
+    print(f"\n{'pages':>8} {'phase':<12} {'wall s':>9} {'cpu s':>9} {'rate':>18} {'+RSS MB':>8}")
+    print("-" * 69)
+    for size, run in results.items():
+        for phase, metrics in run["phases"].items():
+            if metrics["files_per_sec"] is not None:
+                rate = f"{metrics['files_per_sec']} files/s"
+            elif metrics["links_per_sec"] is not None:
+                rate = f"{metrics['links_per_sec']} links/s"
+            else:
+                rate = '-'
+            print(f"{size:>8} {phase:<12} {metrics['wall_s']:>9} {metrics['cpu_s']:>9} {rate:>18} "
+                  f"{metrics['peak_rss_delta_mb']:>8}")
+        print(f"{size:>8} {'total':<12} {run['total_wall_s']:>9} {'':>9} {'':>18} {'':>8}  "
+              f"peak RSS {run['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link Analyzer Benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Site sizes in pages")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic site seed")
+    parser.add_argument("--workdir", help="Where generated sites are kept between runs (default: a temp dir)")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Analysis config for the synthetic sites")
+    parser.add_argument("--workers", "-w", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--http-urls", type=int, default=DEFAULT_HTTP_URLS, help="Most outbound URLs to check per size")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown/growth before a phase counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's results as the new baseline")
+    parser.add_argument("--output", "-o", help="Also save this run's results here")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="link-analyzer-bench-"))
+
+    # Child mode: measure one size in this (fresh) process and print JSON
+    if args.run_size:
+        site_dir = workdir / f"site-{args.run_size}-{args.seed}"
+        output_dir = workdir / f"output-{args.run_size}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        config = load_json_config(Path(args.config))
+        print(json.dumps(run_size(site_dir, output_dir, config, args.workers, args.http_urls)))
+        return
+
+    results = {}
+    for size in args.sizes:
+        site_dir = workdir / f"site-{size}-{args.seed}"
+        if not (site_dir / SITE_CONFIG_FILENAME).exists():
+            shutil.rmtree(site_dir, ignore_errors=True)
+            print(f"Generating {size}-page site in {site_dir}...")
+            generate_site(site_dir, pages=size, seed=args.seed)
+
+        print(f"Benchmarking {size} pages...")
+        command = [sys.executable, __file__, "--run-size", str(size), "--seed", str(args.seed),
+                   "--workdir", str(workdir), "--http-urls", str(args.http_urls), "--config", args.config]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            sys.exit(completed.returncode)
+        results[str(size)] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+
+    report = {
+        "metadata": {
+            "recorded_at": timestamp(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "config": Path(args.config).name,
+            "http_urls": args.http_urls
+        },
+        "results": results
+    }
+    if args.output:
+        save_json(report, Path(args.output))
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        save_json(report, baseline_path)
+        print(f"\nBaseline saved to: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}; run with --update-baseline to record one.")
+        return
+
+    baseline = load_json(baseline_path)
+    mismatches = host_mismatches(report["metadata"], baseline.get("metadata", {}))
+    if mismatches:
+        print(f"\nNot comparing against {baseline_path}: it was recorded on another machine.", file=sys.stderr)
+        for line in mismatches:
+            print(f"  - {line}", file=sys.stderr)
+        print("Record a baseline on this machine with --update-baseline.", file=sys.stderr)
+        sys.exit(2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\nNo regressions against {baseline_path} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
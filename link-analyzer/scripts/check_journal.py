@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Check Journal
+Checkpoint journal for HTTP check runs: every result is appended as one
+NDJSON line the moment it completes, so an interrupted run can resume where
+it stopped, and the final report is streamed from the journal instead of
+being held in memory.
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Iterator
+
+
+JOURNAL_SUFFIX = ".journal.ndjson"
+JOURNAL_FILENAME = "http_check" + JOURNAL_SUFFIX
+
+
+class CheckJournal:
+    """Append-only NDJSON journal of HTTP check results"""
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        # URLs already checked by an earlier, interrupted run
+        self.done: set[str] = set()
+        if resume and path.exists():
+            self.done = self.recover()
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def recover(self) -> set[str]:
+        """URLs recorded so far, dropping a last line cut short by a crash"""
+        done = set()
+        good_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                # Without its newline the next append would be glued onto it
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    done.add(json.loads(line)['url'])
+                except (ValueError, KeyError):
+                    break
+                good_size += len(line)
+        if good_size != self.path.stat().st_size:
+            os.truncate(self.path, good_size)
+        return done
+
+    def pending(self, urls_with_info: dict[str, dict]) -> dict[str, dict]:
+        """URLs not yet in the journal"""
+        if not self.done:
+            return urls_with_info
+        return {url: info for url, info in urls_with_info.items() if url not in self.done}
+
+    def append(self, result: dict) -> None:
+        self.file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        # Flushed per result: a killed run loses at most the line being written
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __iter__(self) -> Iterator[dict]:
+        """Stream every recorded result"""
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def indent_json(value, level: int) -> str:
+    """json.dumps(value, indent=2) for a value nested level deep"""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * level)
+
+
+def save_report(sections: dict, output_path: Path) -> None:
+    """Write a JSON object laid out like json.dump(indent=2), streaming iterator values as lists"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for position, (key, value) in enumerate(sections.items()):
+            f.write(',' if position else '')
+            f.write(f'\n  {json.dumps(key)}: ')
+            if isinstance(value, (dict, list, str, int, float, bool)) or value is None:
+                f.write(indent_json(value, 1))
+                continue
+
+            empty = True
+            for item in value:
+                f.write(('[' if empty else ',') + '\n    ' + indent_json(item, 2))
+                empty = False
+            f.write('[]' if empty else '\n  ]')
+        f.write('\n}' if sections else '}')
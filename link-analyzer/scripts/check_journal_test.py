@@ -0,0 +1,157 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from async_checker import AIOHTTP_AVAILABLE, AsyncHTTPLinkChecker
+from check_journal import CheckJournal, save_report
+from http_common import build_result
+
+
+def result(url: str, status_code: int = 200) -> dict:
+    return build_result(url, {'count': 1, 'pages': ['/a/']}, status_code, 'OK' if status_code < 400 else 'Not Found',
+                        status_code >= 400)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Answers 200 and records every path requested"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.server.paths.append(urlparse(self.path).path)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCheckJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "http_check.journal.ndjson"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_journal(self, results: list[dict], tail: bytes = b'') -> None:
+        lines = b''.join(json.dumps(r).encode('utf-8') + b'\n' for r in results)
+        self.path.write_bytes(lines + tail)
+
+    def test_recover_truncates_partial_line(self):
+        """A line cut short by a crash is dropped; new results append cleanly after it"""
+        complete = [result('https://a.com/'), result('https://b.com/', 404)]
+        self.write_journal(complete, b'{"url": "https://c.com/", "status_co')
+        good_size = len(self.path.read_bytes()) - len(b'{"url": "https://c.com/", "status_co')
+
+        journal = CheckJournal(self.path, resume=True)
+        self.assertEqual(journal.done, {'https://a.com/', 'https://b.com/'})
+        self.assertEqual(self.path.stat().st_size, good_size)
+
+        journal.append(result('https://c.com/'))
+        journal.close()
+        self.assertEqual([r['url'] for r in journal], ['https://a.com/', 'https://b.com/', 'https://c.com/'])
+
+    def test_recover_drops_line_without_newline(self):
+        """Complete JSON without its newline is still a torn write"""
+        self.write_journal([result('https://a.com/')], json.dumps(result('https://b.com/')).encode('utf-8'))
+        journal = CheckJournal(self.path, resume=True)
+        self.assertEqual(journal.done, {'https://a.com/'})
+        journal.append(result('https://b.com/'))
+        journal.close()
+        self.assertEqual([r['url'] for r in journal], ['https://a.com/', 'https://b.com/'])
+
+    def test_recover_stops_at_corrupt_line(self):
+        self.write_journal([result('https://a.com/')], b'not json\n' + json.dumps(result('https://b.com/')).encode() + b'\n')
+        journal = CheckJournal(self.path, resume=True)
+        journal.close()
+        self.assertEqual(journal.done, {'https://a.com/'})
+        self.assertEqual([r['url'] for r in journal], ['https://a.com/'])
+
+    def test_fresh_run_starts_over(self):
+        self.write_journal([result('https://a.com/')])
+        journal = CheckJournal(self.path)
+        journal.close()
+        self.assertEqual((journal.done, self.path.read_bytes()), (set(), b''))
+
+    def test_resume_without_journal(self):
+        journal = CheckJournal(self.path, resume=True)
+        journal.close()
+        self.assertEqual(journal.done, set())
+        self.assertTrue(self.path.exists())
+
+    def test_pending(self):
+        self.write_journal([result('https://a.com/'), result('https://b.com/')])
+        journal = CheckJournal(self.path, resume=True)
+        journal.close()
+        urls = {'https://a.com/': {}, 'https://c.com/': {'count': 2}, 'https://b.com/': {}}
+        self.assertEqual(journal.pending(urls), {'https://c.com/': {'count': 2}})
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_resume_skips_journaled_urls(self):
+        """A resumed run only requests what the interrupted run had not recorded"""
+        server = StandInServer(('127.0.0.1', 0), RecordingHandler)
+        server.paths = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            urls = {f"{base}/{i}": {'count': 1, 'pages': ['/a/']} for i in range(6)}
+            self.write_journal([result(f"{base}/0"), result(f"{base}/3", 404)], b'{"url": "' + base.encode())
+
+            journal = CheckJournal(self.path, resume=True)
+            checker = AsyncHTTPLinkChecker(timeout=2, journal=journal)
+            try:
+                self.assertEqual(checker.check_urls(journal.pending(urls)), [])
+            finally:
+                journal.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(sorted(server.paths), ['/1', '/2', '/4', '/5'])
+        recorded = {r['url']: r['status_code'] for r in journal}
+        self.assertEqual(set(recorded), set(urls))
+        self.assertEqual(recorded[f"{base}/3"], 404)
+
+
+class TestSaveReport(unittest.TestCase):
+
+    def test_matches_json_dump(self):
+        """Streamed sections produce exactly what json.dump(indent=2) writes for the in-memory report"""
+        results = [result('https://a.com/'), result('https://b.com/ünïcode', 404), result('https://c.com/')]
+        sections = {
+            "metadata": {"total_checked": 3, "nested": {"list": [1, 2], "empty": {}}, "none": None},
+            "broken_links": [r for r in results if r['is_broken']],
+            "working_links": [r for r in results if not r['is_broken']],
+            "none_working": [],
+            "domain_stats": [],
+            "flag": True,
+            "text": "x",
+        }
+        streamed = {
+            **sections,
+            "working_links": (r for r in results if not r['is_broken']),
+            "none_working": (r for r in []),
+        }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "report.json"
+            save_report(streamed, path)
+            self.assertEqual(path.read_text(encoding='utf-8'), json.dumps(sections, indent=2, ensure_ascii=False))
+
+            save_report({}, path)
+            self.assertEqual(path.read_text(encoding='utf-8'), json.dumps({}, indent=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
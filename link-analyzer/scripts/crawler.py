@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Site Crawler
+Builds page records from a running site instead of a dist/ build: starts
+from the homepage and/or sitemap.xml, fetches pages concurrently over pooled
+keep-alive connections with a bounded number of requests in flight, and
+runs every page through the same link extractor, so the outbound, internal
+and link graph analyzers work on a crawl exactly as on a local build.
+"""
+
+import time
+import xml.etree.ElementTree as ElementTree
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from extractor import DEFAULT_EXTRACTOR, HREF_PATTERN, PageRecord, decode_content, extract_main_text, parse_links
+from http_common import DEFAULT_USER_AGENT
+from domain_scheduler import DomainScheduler
+from instrumentation import record_step
+
+
+# Links the internal links check skips by default; never fetched
+ASSET_EXTENSIONS = (
+    '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg',
+    '.ico', '.pdf', '.xml', '.txt', '.woff', '.woff2'
+)
+
+# Sitemap indexes nested deeper than this are not followed
+MAX_SITEMAP_DEPTH = 3
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one URL"""
+    url: str
+    final_url: str | None
+    status_code: int | None
+    page: PageRecord | None = None
+    error: str | None = None
+    fetch_time: float = 0.0
+    parse_time: float = 0.0
+
+
+def url_to_path(path: str) -> str:
+    """Relative file path a static build serves a URL path from ('/a/' -> 'a/index.html')"""
+    relative = path.lstrip('/')
+    if not relative or relative.endswith('/'):
+        return relative + 'index.html'
+    if relative.lower().endswith('.html'):
+        return relative
+    return relative + '/index.html'
+
+
+def path_key(url: str) -> str:
+    """Decoded URL path, the unit pages are crawled by (query and fragment ignored)"""
+    return unquote(urlsplit(url).path) or '/'
+
+
+class SiteCrawler:
+    """Crawl a site over HTTP into the page records the analyzers read"""
+
+    def __init__(
+        self,
+        base_url: str,
+        internal_domains: list[str] = None,
+        max_workers: int = 8,
+        max_pages: int = None,
+        queue_size: int = None,
+        timeout: int = 10,
+        user_agent: str = DEFAULT_USER_AGENT,
+        extractor: str = DEFAULT_EXTRACTOR,
+        sitemap_url: str | None = '/sitemap.xml',
+        scheduler: DomainScheduler = None,
+        throttle_retries: int = 2
+    ):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Not an http(s) URL: {base_url}")
+
+        self.base_url = base_url
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        # Links to any of these hosts are internal (and crawled on the base origin)
+        self.hosts = {parts.hostname.lower(), *(domain.lower() for domain in internal_domains or [])}
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        # Most fetches submitted but not yet handled; the frontier only holds URLs
+        self.queue_size = queue_size or max_workers * 2
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.extractor = extractor
+        self.sitemap_url = urljoin(base_url, sitemap_url) if sitemap_url else None
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+        # Stand-in for dist_path: page records carry paths relative to it
+        self.root = Path(parts.netloc)
+
+        self.session = self.create_session()
+        # URLs waiting to be fetched, and every path ever queued
+        self.frontier: deque[str] = deque()
+        self.seen: set[str] = set()
+        # Page records by path, one per distinct final URL
+        self.pages: dict[str, PageRecord] = {}
+        # Relative POSIX paths that exist on the site, in InternalLinksChecker.file_index form
+        self.file_index: set[str] = {'.'}
+
+        self.fetched = 0
+        self.statuses: Counter = Counter()
+        self.errors: dict[str, str] = {}
+        self.redirects = 0
+        self.sitemap_urls = 0
+        self.truncated = False
+        self.elapsed = 0.0
+
+    def create_session(self) -> requests.Session:
+        """Keep-alive session with one connection per worker"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.max_workers, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = self.user_agent
+        return session
+
+    def in_scope(self, url: str) -> bool:
+        """Whether a URL belongs to the crawled site"""
+        try:
+            parts = urlsplit(url)
+            return parts.scheme in ('http', 'https') and (parts.hostname or '').lower() in self.hosts
+        except ValueError:
+            return False
+
+    def localize(self, href: str, page_url: str) -> str | None:
+        """Root-relative form of a relative or same-site absolute href (None when off-site)"""
+        value = href.strip()
+        if value.startswith('/') and not value.startswith('//'):
+            return None
+        resolved = urljoin(page_url, value)
+        if not self.in_scope(resolved):
+            return None
+        parts = urlsplit(resolved)
+        local = parts.path or '/'
+        if parts.query:
+            local += '?' + parts.query
+        if parts.fragment:
+            local += '#' + parts.fragment
+        return local
+
+    def localize_page(self, page: PageRecord, page_url: str) -> None:
+        """Rewrite links into this site the way a static build writes them (root-relative)"""
+        links = []
+        for link in page.links:
+            if link.kind in ('relative', 'external'):
+                local = self.localize(link.href, page_url)
+                if local is not None:
+                    link = replace(link, href=local, kind='internal')
+            links.append(link)
+        page.links = links
+
+        hrefs = []
+        for href in page.hrefs:
+            if not href.startswith('/') or href.startswith('//'):
+                href = self.localize(href, page_url) or href
+            hrefs.append(href)
+        page.hrefs = hrefs
+
+    def enqueue(self, href: str) -> None:
+        """Queue an internal link or in-scope URL for fetching, once per path"""
+        url = urljoin(self.origin + '/', href)
+        if not self.in_scope(url):
+            return
+        key = path_key(url)
+        if key in self.seen or key.lower().endswith(ASSET_EXTENSIONS):
+            return
+        self.seen.add(key)
+        self.frontier.append(self.origin + (urlsplit(url).path or '/'))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET within the origin's rate limit, retrying throttled requests"""
+        if not self.scheduler:
+            return self.session.get(url, timeout=self.timeout, **kwargs)
+
+        domain = urlsplit(url).hostname or ''
+        for attempt in range(self.throttle_retries + 1):
+            while (delay := self.scheduler.acquire(domain)) > 0:
+                time.sleep(delay)
+            started = time.monotonic()
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+            throttled = self.scheduler.record(
+                domain, response.status_code, time.monotonic() - started, response.headers.get('Retry-After')
+            )
+            if not throttled or attempt == self.throttle_retries:
+                return response
+            response.close()
+
+    def fetch(self, url: str) -> FetchResult:
+        """Fetch one URL and extract its links if it is an HTML page of this site"""
+        started = time.perf_counter()
+        try:
+            with self.get(url, allow_redirects=True, stream=True) as response:
+                status_code = response.status_code
+                final_url = response.url
+                is_html = 'html' in response.headers.get('Content-Type', '').lower()
+                # HTML bodies (error pages too) are read so the connection goes back to the
+                # pool; other bodies are not needed, their status is all the analyzers use
+                data = response.content if is_html else None
+        except requests.exceptions.RequestException as e:
+            return FetchResult(url, None, None, error=type(e).__name__, fetch_time=time.perf_counter() - started)
+
+        result = FetchResult(url, final_url, status_code, fetch_time=time.perf_counter() - started)
+        if data is None or status_code >= 400 or not self.in_scope(final_url):
+            return result
+
+        started = time.perf_counter()
+        page = PageRecord(path=url_to_path(path_key(final_url)))
+        try:
+            content = decode_content(data)
+            page.links = parse_links(content, self.extractor)
+            page.hrefs = HREF_PATTERN.findall(content)
+            page.text = extract_main_text(content)
+            self.localize_page(page, final_url)
+        except Exception as e:
+            page.error = str(e)
+        result.page = page
+        result.parse_time = time.perf_counter() - started
+        return result
+
+    def load_sitemap(self, url: str, depth: int = 0) -> list[str]:
+        """Page URLs listed in a sitemap (following sitemap indexes)"""
+        try:
+            response = self.get(url)
+            if response.status_code >= 400:
+                return []
+            root = ElementTree.fromstring(response.content)
+        except (requests.exceptions.RequestException, ElementTree.ParseError):
+            return []
+
+        locations = [
+            element.text.strip() for element in root.iter()
+            if element.tag.endswith('loc') and element.text
+        ]
+        if not root.tag.endswith('sitemapindex'):
+            return [location for location in locations if self.in_scope(location)]
+
+        urls = []
+        if depth < MAX_SITEMAP_DEPTH:
+            for location in locations:
+                urls.extend(self.load_sitemap(location, depth + 1))
+        return urls
+
+    def handle(self, result: FetchResult) -> None:
+        """Record a finished fetch and queue the links of a new page"""
+        self.fetched += 1
+        record_step('fetch', result.fetch_time)
+        if result.error:
+            self.statuses['error'] += 1
+            self.errors[result.url] = result.error
+            return
+
+        self.statuses[str(result.status_code)] += 1
+        if result.status_code >= 400:
+            return
+
+        # Both the requested and the final path resolve
+        final_key = path_key(result.final_url)
+        self.file_index.add(path_key(result.url).strip('/') or '.')
+        if self.in_scope(result.final_url):
+            self.file_index.add(final_key.strip('/') or '.')
+            self.seen.add(final_key)
+        if result.final_url != result.url:
+            self.redirects += 1
+
+        page = result.page
+        if page is None:
+            return
+        record_step('parse', result.parse_time)
+        # Several URLs can redirect to one page; it is recorded once
+        if page.path in self.pages:
+            return
+        self.pages[page.path] = page
+        self.file_index.add(page.path)
+
+        for href in page.hrefs:
+            if href.startswith('/') and not href.startswith('//'):
+                self.enqueue(href)
+        for link in page.links:
+            if link.kind == 'internal':
+                self.enqueue(link.href)
+
+    def crawl(self) -> list[PageRecord]:
+        """Crawl the site; returns one page record per HTML page, ordered by path"""
+        started = time.perf_counter()
+        self.enqueue(self.base_url)
+        if self.sitemap_url:
+            sitemap = self.load_sitemap(self.sitemap_url)
+            self.sitemap_urls = len(sitemap)
+            for url in sitemap:
+                self.enqueue(url)
+            print(f"Sitemap: {len(sitemap)} URLs")
+
+        print(f"Crawling {self.base_url} ({self.max_workers} workers)...")
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self.frontier or in_flight:
+                while self.frontier and len(in_flight) < self.queue_size:
+                    if self.max_pages is not None and self.fetched + len(in_flight) >= self.max_pages:
+                        self.truncated = True
+                        break
+                    in_flight.add(executor.submit(self.fetch, self.frontier.popleft()))
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.handle(future.result())
+                if self.fetched % 100 < len(done):
+                    print(f"  {self.fetched} fetched, {len(self.pages)} pages, {len(self.frontier)} queued")
+
+        self.session.close()
+        self.elapsed = time.perf_counter() - started
+        if self.truncated:
+            print(f"Stopped at --max-pages {self.max_pages}; {len(self.frontier)} URLs were not fetched")
+        print(f"Crawled {len(self.pages)} pages ({self.fetched} URLs fetched) in {self.elapsed:.1f}s")
+        return [self.pages[path] for path in sorted(self.pages)]
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "pages": len(self.pages),
+            "fetched": self.fetched,
+            "redirects": self.redirects,
+            "sitemap_urls": self.sitemap_urls,
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": len(self.errors),
+            "truncated": self.truncated,
+            "elapsed_s": round(self.elapsed, 2)
+        }
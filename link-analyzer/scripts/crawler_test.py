@@ -0,0 +1,213 @@
+import tempfile
+import threading
+import unittest
+from functools import partial
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from crawler import SiteCrawler, url_to_path
+from extractor import extract_site
+from synthetic_site import generate_site
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class DirectoryHandler(SimpleHTTPRequestHandler):
+    """Serves a dist directory over keep-alive HTTP/1.1, like a preview server"""
+    protocol_version = 'HTTP/1.1'
+
+    def handle_one_request(self):
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+        super().handle_one_request()
+
+    def log_message(self, format, *args):
+        pass
+
+
+# path -> (status, content type, body, extra headers); bodies use {base} for this server's URL
+ROUTES = {
+    '/': (200, 'text/html; charset=utf-8', (
+        '<a href="about/">Relative</a>'
+        '<a href="{base}/contact">Absolute</a>'
+        '<a href="/old">Redirected</a>'
+        '<a href="/gone/">Missing</a>'
+        '<a href="/data.json">Data</a>'
+        '<a href="/style.css">Asset</a>'
+        '<a href="https://external.example/page">External</a>'
+        '<a href="mailto:me@example.com">Mail</a>'
+    ), {}),
+    '/about/': (200, 'text/html', '<a href="../">Home</a><a href="../new/#top">New</a>', {}),
+    '/contact': (200, 'text/html', '<a href="/">Home</a>', {}),
+    '/old': (301, 'text/html', '', {'Location': '/new/'}),
+    '/new/': (200, 'text/html', '<link rel="canonical" href="{base}/new/"><a href="/">Home</a>', {}),
+    '/data.json': (200, 'application/json', '{{}}', {}),
+    '/listed/': (200, 'text/html', '<p>Only in the sitemap</p>', {}),
+    '/sitemap.xml': (200, 'application/xml', (
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<sitemap><loc>{base}/pages.xml</loc></sitemap></sitemapindex>'
+    ), {}),
+    '/pages.xml': (200, 'application/xml', (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<url><loc>{base}/listed/</loc></url><url><loc>https://elsewhere.example/</loc></url></urlset>'
+    ), {}),
+}
+
+
+class RoutesHandler(BaseHTTPRequestHandler):
+    """Serves ROUTES and records every path requested"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requested.append(self.path)
+        status, content_type, body, headers = ROUTES.get(self.path, (404, 'text/html', 'Not found', {}))
+        body = body.format(base=self.server.base).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(handler) -> StandInServer:
+    server = StandInServer(('127.0.0.1', 0), handler)
+    server.lock = threading.Lock()
+    server.connections = set()
+    server.requested = []
+    server.base = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestURLToPath(unittest.TestCase):
+
+    def test_paths(self):
+        self.assertEqual(url_to_path('/'), 'index.html')
+        self.assertEqual(url_to_path('/blog/post/'), 'blog/post/index.html')
+        self.assertEqual(url_to_path('/blog/post'), 'blog/post/index.html')
+        self.assertEqual(url_to_path('/blog/post.html'), 'blog/post.html')
+
+
+class TestCrawlMatchesBuild(unittest.TestCase):
+    """Crawling a served build yields the same page records as reading it from disk"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dist = Path(cls.tmp.name)
+        generate_site(cls.dist, pages=150, seed=3)
+        cls.server = serve(partial(DirectoryHandler, directory=str(cls.dist)))
+
+        # List every page, so orphans are crawled too
+        locations = []
+        for path in sorted(cls.dist.glob('**/index.html')):
+            relative = path.parent.relative_to(cls.dist).as_posix()
+            locations.append(f"<url><loc>{cls.server.base}/{'' if relative == '.' else relative + '/'}</loc></url>")
+        (cls.dist / 'sitemap.xml').write_text(
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{"".join(locations)}</urlset>'
+        )
+
+        cls.crawler = SiteCrawler(cls.server.base + '/', max_workers=4)
+        cls.pages = cls.crawler.crawl()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+
+    def test_same_page_records(self):
+        expected = sorted(extract_site(self.dist, workers=1), key=lambda page: page.path)
+        self.assertEqual([page.path for page in self.pages], [page.path for page in expected])
+        for crawled, built in zip(self.pages, expected):
+            with self.subTest(path=built.path):
+                self.assertEqual(crawled.links, built.links)
+                self.assertEqual(crawled.hrefs, built.hrefs)
+
+    def test_file_index(self):
+        """Every page exists; broken internal links do not"""
+        for page in self.pages:
+            self.assertIn(page.path, self.crawler.file_index)
+            self.assertIn(page.path[:-len('/index.html')] if page.path != 'index.html' else '.',
+                          self.crawler.file_index)
+        missing = {link.href.strip('/') for page in self.pages for link in page.links if link.href.startswith('/missing/')}
+        self.assertTrue(missing)
+        self.assertFalse(missing & self.crawler.file_index)
+
+    def test_bounded_pooled_connections(self):
+        """One keep-alive connection per worker (http.server closes the connection after a 404)"""
+        stats = self.crawler.stats()
+        self.assertEqual(stats['errors'], 0)
+        self.assertLessEqual(len(self.server.connections), 4 + stats['statuses'].get('404', 0))
+        self.assertLess(len(self.server.connections), stats['fetched'] / 2)
+
+
+class TestCrawl(unittest.TestCase):
+
+    def setUp(self):
+        self.server = serve(RoutesHandler)
+        self.base = self.server.base
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_links_redirects_and_sitemap(self):
+        crawler = SiteCrawler(self.base + '/', max_workers=2)
+        pages = {page.path: page for page in crawler.crawl()}
+
+        self.assertEqual(set(pages), {
+            'index.html', 'about/index.html', 'contact/index.html', 'new/index.html', 'listed/index.html'
+        })
+        # Relative and same-site absolute links read as root-relative internal links
+        home = [(link.href, link.kind) for link in pages['index.html'].links]
+        self.assertEqual(home, [
+            ('/about/', 'internal'),
+            ('/contact', 'internal'),
+            ('/old', 'internal'),
+            ('/gone/', 'internal'),
+            ('/data.json', 'internal'),
+            ('/style.css', 'internal'),
+            ('https://external.example/page', 'external'),
+            ('mailto:me@example.com', 'email'),
+        ])
+        self.assertEqual([link.href for link in pages['about/index.html'].links], ['/', '/new/#top'])
+        self.assertEqual(pages['new/index.html'].hrefs, ['/new/', '/'])
+
+        # Redirect sources, non-HTML resources and the root exist; 404s do not
+        self.assertLessEqual({'.', 'old', 'new', 'new/index.html', 'data.json', 'listed'}, crawler.file_index)
+        self.assertNotIn('gone', crawler.file_index)
+
+        # Assets and other sites are never fetched
+        self.assertNotIn('/style.css', self.server.requested)
+        self.assertEqual(crawler.stats()['sitemap_urls'], 1)
+        self.assertEqual(crawler.stats()['redirects'], 1)
+        self.assertEqual(crawler.stats()['statuses']['404'], 1)
+
+    def test_no_sitemap(self):
+        crawler = SiteCrawler(self.base + '/', sitemap_url=None)
+        paths = {page.path for page in crawler.crawl()}
+        self.assertNotIn('listed/index.html', paths)
+        self.assertNotIn('/sitemap.xml', self.server.requested)
+
+    def test_max_pages(self):
+        crawler = SiteCrawler(self.base + '/', max_workers=1, max_pages=3, sitemap_url=None)
+        crawler.crawl()
+        self.assertEqual(crawler.fetched, 3)
+        self.assertTrue(crawler.stats()['truncated'])
+
+    def test_rejects_non_http_url(self):
+        with self.assertRaises(ValueError):
+            SiteCrawler('ftp://example.com/')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Domain Probe
+DNS pre-resolution for the HTTP checkers: resolves every host once, up front
+and concurrently, probes each host:port once, and fails every URL on a dead
+domain (NXDOMAIN or connection refused) with one shared verdict instead of
+checking them one by one. Lookups stay cached for the rest of the run,
+for the checkers' own sessions only: requests sessions get an adapter and
+aiohttp connectors a resolver that answer from the cache, and nothing else
+in the process sees it.
+"""
+
+import socket
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from urllib.request import getproxies
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from http_common import DEFAULT_PORTS, build_result, host_of, origin_of
+
+
+# getaddrinfo errors that prove a name does not exist (EAI_AGAIN and
+# friends are transient and prove nothing)
+DEAD_DNS_ERRORS = {
+    code for code in (getattr(socket, 'EAI_NONAME', None), getattr(socket, 'EAI_NODATA', None))
+    if code is not None
+}
+
+NXDOMAIN_MESSAGE = "Connection Error (Domain does not exist)"
+REFUSED_MESSAGE = "Connection Error (Connection refused)"
+
+
+class DomainProbe:
+    """Shared DNS cache and dead-domain detection for one run"""
+
+    def __init__(self, timeout: float = 5, max_workers: int = 64):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        # host -> getaddrinfo() results (port 0), or the gaierror proving it dead
+        self.addresses: dict[str, list | socket.gaierror] = {}
+        # host:port -> verdict message for origins proven dead
+        self.dead: dict[str, str] = {}
+        self.lock = threading.Lock()
+        # The resolver behind the cache
+        self.system_getaddrinfo = socket.getaddrinfo
+
+        self.lookups = 0
+        self.cache_hits = 0
+        self.short_circuited = 0
+
+    def resolve(self, host: str) -> list | socket.gaierror:
+        """Addresses for a host (resolved once per run), or the error proving it does not exist
+
+        Transient failures are raised, and not cached.
+        """
+        with self.lock:
+            if host in self.addresses:
+                self.cache_hits += 1
+                return self.addresses[host]
+            self.lookups += 1
+
+        try:
+            entry = self.system_getaddrinfo(host, None, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno not in DEAD_DNS_ERRORS:
+                raise
+            entry = e
+
+        with self.lock:
+            self.addresses[host] = entry
+        return entry
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in socket.getaddrinfo() answering TCP lookups from the cache"""
+        if (
+            not isinstance(host, str) or not host
+            or type not in (0, socket.SOCK_STREAM)
+            or proto not in (0, socket.IPPROTO_TCP)
+        ):
+            return self.system_getaddrinfo(host, port, family, type, proto, flags)
+        if isinstance(port, str):
+            if not port.isdigit():
+                return self.system_getaddrinfo(host, port, family, type, proto, flags)
+            port = int(port)
+
+        entry = self.resolve(host)
+        if isinstance(entry, socket.gaierror):
+            raise entry
+        return [
+            (af, socktype, sock_proto, canonname, (sockaddr[0], port or 0, *sockaddr[2:]))
+            for af, socktype, sock_proto, canonname, sockaddr in entry
+            if not family or af == family
+        ]
+
+    def session(self) -> requests.Session:
+        """A requests session whose direct connections resolve through the cache"""
+        session = requests.Session()
+        adapter = ProbeAdapter(self)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def resolver(self) -> "ProbeResolver":
+        """An aiohttp resolver answering from the cache"""
+        return ProbeResolver(self)
+
+    def connect_refused(self, entry: list, port: int) -> bool:
+        """True when every address of a host refuses connections on a port"""
+        for af, socktype, proto, _, sockaddr in entry:
+            try:
+                with socket.socket(af, socktype, proto) as sock:
+                    sock.settimeout(self.timeout)
+                    sock.connect((sockaddr[0], port, *sockaddr[2:]))
+                return False
+            except ConnectionRefusedError:
+                continue
+            except OSError:
+                return False
+        return bool(entry)
+
+    def probe_host(self, host: str, ports: set[int]) -> dict[str, str]:
+        """Verdicts for a host's dead origins"""
+        try:
+            entry = self.resolve(host)
+        except (socket.gaierror, UnicodeError):
+            return {}
+        if isinstance(entry, socket.gaierror):
+            return {f"{host}:{port}": NXDOMAIN_MESSAGE for port in ports}
+        return {
+            f"{host}:{port}": REFUSED_MESSAGE
+            for port in ports
+            if self.connect_refused(entry, port)
+        }
+
+    def probe(self, urls_with_info: dict[str, dict]) -> dict[str, str]:
+        """Resolve every host and probe every host:port once, concurrently"""
+        # Through a proxy, the proxy resolves and connects, not us
+        proxied = set(getproxies())
+        ports_by_host = defaultdict(set)
+        for url in urls_with_info:
+            try:
+                parsed = urlparse(url)
+                port = parsed.port or DEFAULT_PORTS.get(parsed.scheme)
+            except ValueError:
+                continue
+            if parsed.hostname and port and parsed.scheme not in proxied:
+                ports_by_host[parsed.hostname].add(port)
+
+        if not ports_by_host:
+            return self.dead
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ports_by_host))) as executor:
+            for verdicts in executor.map(lambda item: self.probe_host(*item), ports_by_host.items()):
+                self.dead.update(verdicts)
+        return self.dead
+
+    def short_circuit(self, urls_with_info: dict[str, dict]) -> tuple[list[dict], dict[str, dict]]:
+        """Split URLs into failed results for dead domains and URLs still to check"""
+        self.probe(urls_with_info)
+        failed = []
+        remaining = {}
+        for url, info in urls_with_info.items():
+            verdict = self.dead.get(origin_of(url))
+            if verdict:
+                failed.append(build_result(url, info, None, verdict, True))
+            else:
+                remaining[url] = info
+
+        self.short_circuited += len(failed)
+        dead_domains = len({host_of(result['url']) for result in failed})
+        print(f"Resolved {len(self.addresses)} hosts, {len(failed)} URLs on {dead_domains} dead domains failed fast")
+        return failed, remaining
+
+    def stats(self) -> dict:
+        """DNS and dead-domain statistics for the current run"""
+        return {
+            "enabled": True,
+            "hosts_resolved": len(self.addresses),
+            "lookups": self.lookups,
+            "cache_hits": self.cache_hits,
+            "dead_domains": sorted(self.dead),
+            "short_circuited": self.short_circuited
+        }
+
+
+class ProbedConnectionMixin:
+    """urllib3 connection that looks its host up in a DomainProbe
+
+    Tries each cached address in turn, as urllib3's create_connection() does
+    with getaddrinfo() results. TLS still verifies against the host name.
+    """
+    probe: DomainProbe = None
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = self.probe.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        if not addresses:
+            return super()._new_conn()
+
+        error = None
+        for *_, sockaddr in addresses:
+            self._dns_host = sockaddr[0]
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+
+
+class ProbeAdapter(HTTPAdapter):
+    """requests transport adapter whose direct connections resolve through a DomainProbe
+
+    Proxied requests are left alone: the proxy resolves those.
+    """
+
+    def __init__(self, probe: DomainProbe, **kwargs):
+        connection_classes = {
+            scheme: type(f"Probed{base.__name__}", (ProbedConnectionMixin, base), {'probe': probe})
+            for scheme, base in (('http', HTTPConnection), ('https', HTTPSConnection))
+        }
+        self.pool_classes = {
+            scheme: type(f"Probed{base.__name__}", (base,), {'ConnectionCls': connection_classes[scheme]})
+            for scheme, base in (('http', HTTPConnectionPool), ('https', HTTPSConnectionPool))
+        }
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.pool_classes
+
+
+class ProbeResolver:
+    """aiohttp resolver (AbstractResolver interface) answering from a DomainProbe"""
+
+    def __init__(self, probe: DomainProbe):
+        self.probe = probe
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> list[dict]:
+        # Hosts outside the pre-pass (redirect targets) may still need a real lookup
+        addresses = await asyncio.to_thread(self.probe.getaddrinfo, host, port, family, socket.SOCK_STREAM)
+        return [
+            {
+                'hostname': host,
+                'host': sockaddr[0],
+                'port': sockaddr[1],
+                'family': af,
+                'proto': proto,
+                'flags': socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+            }
+            for af, _, proto, _, sockaddr in addresses
+        ]
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,162 @@
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from async_checker import AIOHTTP_AVAILABLE, AsyncHTTPLinkChecker
+from domain_probe import NXDOMAIN_MESSAGE, REFUSED_MESSAGE, DomainProbe
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class HostEchoHandler(BaseHTTPRequestHandler):
+    """Answers 200, echoing the Host header it was sent"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('X-Host', self.headers.get('Host', ''))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, format, *args):
+        pass
+
+
+def fake_dns(table: dict[str, list[str] | int]):
+    """getaddrinfo() answering names in table (addresses, or a gaierror code) and nothing else"""
+    def getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        answer = table.get(host)
+        if answer is None:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        if isinstance(answer, int):
+            raise socket.gaierror(answer, 'lookup failed')
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (address, port or 0))
+            for address in answer
+        ]
+    return getaddrinfo
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestDomainProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer(('127.0.0.1', 0), HostEchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+        self.system_getaddrinfo = socket.getaddrinfo
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        # Nothing may touch the process-wide resolver
+        self.assertIs(socket.getaddrinfo, self.system_getaddrinfo)
+
+    def probe(self, table: dict) -> DomainProbe:
+        probe = DomainProbe(timeout=0.5)
+        probe.system_getaddrinfo = fake_dns(table)
+        return probe
+
+    def test_short_circuit(self):
+        """Dead names and refused ports fail fast; transient failures are left to the check"""
+        refused = closed_port()
+        probe = self.probe({
+            'site.test': ['127.0.0.1'],
+            'flaky.test': socket.EAI_AGAIN,
+        })
+        urls = {
+            f'http://site.test:{self.port}/a': {},
+            f'http://site.test:{self.port}/b': {},
+            f'http://site.test:{refused}/c': {'count': 2},
+            'http://dead.test/d': {},
+            'https://dead.test/e': {},
+            'http://flaky.test/f': {},
+        }
+        failed, remaining = probe.short_circuit(urls)
+        self.assertEqual({result['url']: result['status_message'] for result in failed}, {
+            f'http://site.test:{refused}/c': REFUSED_MESSAGE,
+            'http://dead.test/d': NXDOMAIN_MESSAGE,
+            'https://dead.test/e': NXDOMAIN_MESSAGE,
+        })
+        self.assertEqual(list(remaining), [f'http://site.test:{self.port}/a', f'http://site.test:{self.port}/b',
+                                           'http://flaky.test/f'])
+        self.assertNotIn('flaky.test', probe.addresses)
+        self.assertEqual(probe.stats()['lookups'], 3)
+
+    def test_session_resolves_through_cache(self):
+        """Requests go to the cached address with the original Host header; others don't see the name"""
+        probe = self.probe({'site.test': ['127.0.0.1']})
+        with probe.session() as session:
+            response = session.head(f'http://site.test:{self.port}/', timeout=2)
+            self.assertEqual((response.status_code, response.headers['X-Host']), (200, f'site.test:{self.port}'))
+        with probe.session() as session:
+            session.get(f'http://site.test:{self.port}/again', timeout=2)
+        self.assertEqual((probe.lookups, probe.cache_hits), (1, 1))
+
+        with self.assertRaises(socket.gaierror):
+            socket.getaddrinfo('site.test', self.port)
+
+    def test_session_tries_every_address(self):
+        """An address that refuses is skipped, as urllib3 does with getaddrinfo() results"""
+        probe = self.probe({'site.test': ['127.0.0.2', '127.0.0.1']})
+        with probe.session() as session:
+            self.assertEqual(session.head(f'http://site.test:{self.port}/', timeout=2).status_code, 200)
+
+    def test_session_dead_name(self):
+        probe = self.probe({})
+        with probe.session() as session, self.assertRaises(requests.exceptions.ConnectionError):
+            session.head('http://dead.test/', timeout=2)
+
+    def test_concurrent_probes(self):
+        """Probes answering the same name differently never see each other's answers"""
+        up = self.probe({'site.test': ['127.0.0.1']})
+        down = self.probe({'site.test': ['127.0.0.2']})
+
+        def fetch(probe: DomainProbe) -> list[bool]:
+            outcomes = []
+            with probe.session() as session:
+                for _ in range(20):
+                    try:
+                        session.head(f'http://site.test:{self.port}/', timeout=2)
+                        outcomes.append(True)
+                    except Exception:
+                        outcomes.append(False)
+            return outcomes
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(fetch, [up, down, up, down]))
+        self.assertEqual([all(outcomes) for outcomes in results], [True, False, True, False])
+        self.assertEqual([any(outcomes) for outcomes in results], [True, False, True, False])
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_async_checker(self):
+        """The async engine resolves through the probe's connector resolver"""
+        probe = self.probe({'site.test': ['127.0.0.1']})
+        checker = AsyncHTTPLinkChecker(timeout=0.5, probe=probe)
+        results = checker.check_urls({
+            f'http://site.test:{self.port}/ok': {},
+            'http://dead.test/': {},
+        })
+        self.assertEqual(
+            {result['url']: (result['status_code'], result['status_message']) for result in results},
+            {f'http://site.test:{self.port}/ok': (200, 'OK'), 'http://dead.test/': (None, NXDOMAIN_MESSAGE)}
+        )
+        self.assertEqual(probe.lookups, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Domain Scheduler
+Per-domain rate limiting for the HTTP checkers: a token bucket per domain
+whose rate backs off on 429/5xx responses and recovers on success,
+Retry-After handling, request interleaving across domains, and per-domain
+throughput and latency statistics.
+"""
+
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from http_common import host_of
+
+
+# Responses that mean "slow down"
+THROTTLE_STATUS_CODES = [429, 503]
+
+# Never wait longer than this for a single Retry-After
+MAX_RETRY_AFTER = 300
+
+# Cut a domain's rate at most once per this many seconds (one burst of
+# throttled responses is one signal, not many)
+PENALTY_WINDOW = 1.0
+
+
+def parse_retry_after(value: str | None, now: float = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return min(max(0.0, retry_at - now), MAX_RETRY_AFTER)
+
+
+def interleave_by_domain(urls_with_info: dict[str, dict]) -> dict[str, dict]:
+    """Reorder URLs round-robin across domains, so no domain gets a burst"""
+    by_domain = defaultdict(list)
+    for url, info in urls_with_info.items():
+        by_domain[host_of(url)].append((url, info))
+
+    queues = sorted(by_domain.values(), key=len, reverse=True)
+    interleaved = {}
+    for position in range(len(queues[0]) if queues else 0):
+        for queue in queues:
+            if position < len(queue):
+                url, info = queue[position]
+                interleaved[url] = info
+    return interleaved
+
+
+@dataclass
+class DomainState:
+    """Token bucket and statistics for one domain"""
+    rate: float
+    tokens: float
+    updated: float = 0.0
+    blocked_until: float = 0.0
+    last_penalty: float = float('-inf')
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    first_sent: float | None = None
+    last_done: float = 0.0
+    statuses: dict = field(default_factory=lambda: defaultdict(int))
+
+
+class DomainScheduler:
+    """Adaptive per-domain rate limiter (thread-safe, never sleeps itself)
+
+    acquire() either takes a token (returns 0) or returns how long to wait
+    before asking again; callers sleep with time.sleep() or asyncio.sleep()
+    as appropriate. Nothing is reserved ahead of time, so a rate cut applies
+    to every waiting request at once.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        min_rate: float = 0.2,
+        backoff: float = 0.5,
+        recovery: float = 0.1
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.backoff = backoff
+        # Rate regained per successful response, as a fraction of the configured rate
+        self.recovery = recovery
+        self.domains: dict[str, DomainState] = {}
+        self.lock = threading.Lock()
+
+    def state(self, domain: str) -> DomainState:
+        if domain not in self.domains:
+            self.domains[domain] = DomainState(rate=self.rate, tokens=self.burst, updated=time.monotonic())
+        return self.domains[domain]
+
+    def refill(self, state: DomainState, now: float) -> None:
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+
+    def acquire(self, domain: str, now: float = None) -> float:
+        """Take a request token for a domain; returns 0, or seconds to wait before retrying"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            state = self.state(domain)
+            self.refill(state, now)
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+
+            state.tokens -= 1
+            if state.first_sent is None:
+                state.first_sent = now
+            return 0.0
+
+    def penalize(self, domain: str, retry_after: float = None, now: float = None) -> None:
+        """Slow a domain down after a throttled or failed request"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            state = self.state(domain)
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            if now - state.last_penalty < PENALTY_WINDOW:
+                return
+            self.refill(state, now)
+            state.rate = max(self.min_rate, state.rate * self.backoff)
+            state.last_penalty = now
+            # Empty the bucket: no burst straight after being throttled
+            state.tokens = min(state.tokens, 0.0)
+
+    def record(
+        self,
+        domain: str,
+        status_code: int | None,
+        latency: float,
+        retry_after: str = None,
+        now: float = None
+    ) -> bool:
+        """Record a finished request; returns True when the domain throttled it"""
+        now = time.monotonic() if now is None else now
+        throttled = status_code in THROTTLE_STATUS_CODES
+        # Connection errors say nothing about load; server errors might
+        failed = status_code is not None and status_code >= 500
+
+        with self.lock:
+            state = self.state(domain)
+            state.requests += 1
+            state.statuses[str(status_code) if status_code is not None else "error"] += 1
+            state.latency_total += latency
+            state.latency_max = max(state.latency_max, latency)
+            state.last_done = max(state.last_done, now)
+            if throttled:
+                state.throttled += 1
+            elif status_code is None:
+                state.errors += 1
+            elif not failed:
+                self.refill(state, now)
+                state.rate = min(self.rate, state.rate + self.rate * self.recovery)
+
+        if throttled or failed:
+            self.penalize(domain, parse_retry_after(retry_after), now)
+        return throttled
+
+    def stats(self) -> list[dict]:
+        """Throughput and latency per domain, busiest first"""
+        rows = []
+        with self.lock:
+            for domain, state in self.domains.items():
+                if not state.requests:
+                    continue
+                elapsed = state.last_done - (state.first_sent or state.last_done)
+                rows.append({
+                    "domain": domain,
+                    "requests": state.requests,
+                    "throttled": state.throttled,
+                    "errors": state.errors,
+                    "statuses": dict(state.statuses),
+                    "avg_latency_ms": round(state.latency_total / state.requests * 1000, 1),
+                    "max_latency_ms": round(state.latency_max * 1000, 1),
+                    "requests_per_second": round(state.requests / elapsed, 2) if elapsed > 0 else None,
+                    "final_rate": round(state.rate, 2)
+                })
+        return sorted(rows, key=lambda row: row["requests"], reverse=True)
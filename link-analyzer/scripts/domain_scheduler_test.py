@@ -0,0 +1,171 @@
+import time
+import threading
+import unittest
+from email.utils import formatdate
+
+from domain_scheduler import MAX_RETRY_AFTER, PENALTY_WINDOW, DomainScheduler, interleave_by_domain, parse_retry_after
+
+
+# Far enough ahead of the scheduler's own clock that new buckets start full
+T0 = time.monotonic() + 1000
+
+
+class TestParseRetryAfter(unittest.TestCase):
+
+    def test_delay_seconds(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after(' 7 '), 7.0)
+        self.assertEqual(parse_retry_after('86400'), MAX_RETRY_AFTER)
+
+    def test_http_date(self):
+        now = 1_760_000_000
+        self.assertEqual(parse_retry_after(formatdate(now + 30, usegmt=True), now=now), 30.0)
+        self.assertEqual(parse_retry_after(formatdate(now - 30, usegmt=True), now=now), 0.0)
+        self.assertEqual(parse_retry_after(formatdate(now + 3600, usegmt=True), now=now), MAX_RETRY_AFTER)
+
+    def test_invalid(self):
+        for value in [None, '', 'soon', '-5', '1.5']:
+            with self.subTest(value=value):
+                self.assertIsNone(parse_retry_after(value))
+
+
+class TestInterleaveByDomain(unittest.TestCase):
+
+    def test_round_robin(self):
+        urls = {
+            'https://a.com/1': {}, 'https://a.com/2': {}, 'https://a.com/3': {},
+            'https://b.com/1': {'count': 2},
+            'https://c.com/1': {}, 'https://c.com/2': {},
+        }
+        interleaved = interleave_by_domain(urls)
+        self.assertEqual(list(interleaved), [
+            'https://a.com/1', 'https://c.com/1', 'https://b.com/1',
+            'https://a.com/2', 'https://c.com/2',
+            'https://a.com/3',
+        ])
+        self.assertEqual(interleaved['https://b.com/1'], {'count': 2})
+
+    def test_empty(self):
+        self.assertEqual(interleave_by_domain({}), {})
+
+
+class TestDomainScheduler(unittest.TestCase):
+
+    def test_token_bucket(self):
+        """A full bucket allows a burst, then one request per 1/rate seconds"""
+        scheduler = DomainScheduler(rate=2.0, burst=3)
+        self.assertEqual([scheduler.acquire('a.com', T0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(scheduler.acquire('a.com', T0), 0.5)
+        self.assertAlmostEqual(scheduler.acquire('a.com', T0 + 0.25), 0.25)
+        self.assertEqual(scheduler.acquire('a.com', T0 + 0.5), 0.0)
+        # Buckets are per domain
+        self.assertEqual(scheduler.acquire('b.com', T0), 0.0)
+
+    def test_penalize(self):
+        """Rate halves (once per window), down to min_rate, and the bucket empties"""
+        scheduler = DomainScheduler(rate=4.0, burst=5, min_rate=0.5)
+        scheduler.acquire('a.com', T0)
+        scheduler.penalize('a.com', now=T0)
+        state = scheduler.domains['a.com']
+        self.assertEqual((state.rate, state.tokens), (2.0, 0.0))
+        self.assertAlmostEqual(scheduler.acquire('a.com', T0), 0.5)
+
+        scheduler.penalize('a.com', now=T0 + PENALTY_WINDOW / 2)
+        self.assertEqual(state.rate, 2.0)
+
+        for step in range(1, 5):
+            scheduler.penalize('a.com', now=T0 + step * PENALTY_WINDOW)
+        self.assertEqual(state.rate, 0.5)
+
+    def test_retry_after_blocks_domain(self):
+        scheduler = DomainScheduler(rate=4.0, burst=5)
+        scheduler.penalize('a.com', retry_after=10, now=T0)
+        self.assertEqual(scheduler.acquire('a.com', T0 + 4), 6.0)
+        self.assertEqual(scheduler.acquire('a.com', T0 + 10), 0.0)
+        # Retry-After inside the penalty window still extends the block
+        scheduler.penalize('a.com', retry_after=20, now=T0 + 10.1)
+        self.assertAlmostEqual(scheduler.acquire('a.com', T0 + 11), 19.1)
+
+    def test_record(self):
+        """429/503 throttle, other 5xx slow down, successes recover, errors do neither"""
+        scheduler = DomainScheduler(rate=4.0, burst=5, recovery=0.25)
+        state = scheduler.state('a.com')
+
+        self.assertFalse(scheduler.record('a.com', None, 0.1, now=T0))
+        self.assertEqual((state.rate, state.errors), (4.0, 1))
+
+        self.assertTrue(scheduler.record('a.com', 429, 0.1, retry_after='5', now=T0))
+        self.assertEqual((state.rate, state.throttled, state.blocked_until), (2.0, 1, T0 + 5))
+
+        self.assertFalse(scheduler.record('a.com', 500, 0.1, now=T0 + 2))
+        self.assertEqual(state.rate, 1.0)
+
+        for _ in range(3):
+            scheduler.record('a.com', 200, 0.1, now=T0 + 3)
+        self.assertEqual(state.rate, 4.0)
+        scheduler.record('a.com', 200, 0.1, now=T0 + 3)
+        self.assertEqual(state.rate, 4.0)
+
+    def test_stats(self):
+        scheduler = DomainScheduler()
+        scheduler.acquire('a.com', T0)
+        scheduler.record('a.com', 200, 0.1, now=T0 + 1)
+        scheduler.acquire('a.com', T0 + 1)
+        scheduler.record('a.com', 404, 0.3, now=T0 + 2)
+        scheduler.state('idle.com')
+        self.assertEqual(scheduler.stats(), [{
+            'domain': 'a.com',
+            'requests': 2,
+            'throttled': 0,
+            'errors': 0,
+            'statuses': {'200': 1, '404': 1},
+            'avg_latency_ms': 200.0,
+            'max_latency_ms': 300.0,
+            'requests_per_second': 1.0,
+            'final_rate': 5.0,
+        }])
+
+    def test_concurrent_acquire(self):
+        """Threads racing for one bucket never take more than it holds"""
+        scheduler = DomainScheduler(rate=1.0, burst=10)
+        granted = []
+
+        def worker():
+            granted.extend(1 for _ in range(200) if scheduler.acquire('a.com', T0) == 0)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(granted), 10)
+
+    def test_converges_on_server_limit(self):
+        """Against a server allowing 3 requests per second, most requests get through
+
+        Simulated clock: the server answers 429 once it has accepted 3
+        requests in the past second. Without the scheduler nearly every
+        request would be throttled.
+        """
+        scheduler = DomainScheduler()
+        now = T0
+        accepted, throttled = [], []
+        while now < T0 + 60:
+            wait = scheduler.acquire('a.com', now)
+            if wait > 0:
+                now += max(wait, 0.001)
+                continue
+            status = 429 if sum(1 for t in accepted[-3:] if t > now - 1) >= 3 else 200
+            (throttled if status == 429 else accepted).append(now)
+            scheduler.record('a.com', status, 0.05, now=now)
+            now += 0.001
+
+        # Steady state, once the initial burst has been absorbed
+        accepted_late = sum(1 for t in accepted if t >= T0 + 30)
+        throttled_late = sum(1 for t in throttled if t >= T0 + 30)
+        self.assertGreaterEqual(accepted_late / 30, 2.0)
+        self.assertLessEqual(throttled_late / (accepted_late + throttled_late), 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Extraction Cache
+Persists extracted page records in SQLite so unchanged pages are not
+re-parsed on the next run. Entries are keyed by relative file path and
+validated by mtime/size first, then by content hash. The whole cache is
+dropped when the extractor backend changes, since backends may disagree
+on malformed markup.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from dataclasses import asdict
+
+from extractor import DEFAULT_EXTRACTOR, AssetRecord, LinkRecord, PageRecord
+
+
+CACHE_FILENAME = "extract_cache.sqlite"
+
+# Bump whenever the shape or content of PageRecord changes
+CACHE_VERSION = "4"
+
+
+class ExtractionCache:
+    """SQLite-backed cache of PageRecords"""
+
+    def __init__(self, db_path: Path, extractor: str = DEFAULT_EXTRACTOR):
+        self.db_path = db_path
+        self.extractor = extractor
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+            "digest TEXT, record TEXT)"
+        )
+
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get('version') != CACHE_VERSION or meta.get('extractor') != extractor:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [('version', CACHE_VERSION), ('extractor', extractor)]
+            )
+        self.conn.commit()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.removed = 0
+
+    def entries(self) -> dict[str, tuple[int, int, str]]:
+        """Return path -> (mtime_ns, size, digest) for every cached page"""
+        return {
+            path: (mtime_ns, size, digest)
+            for path, mtime_ns, size, digest in self.conn.execute(
+                "SELECT path, mtime_ns, size, digest FROM pages"
+            )
+        }
+
+    def load(self, path: str) -> PageRecord | None:
+        """Load a cached record"""
+        row = self.conn.execute("SELECT record FROM pages WHERE path = ?", (path,)).fetchone()
+        if not row:
+            return None
+
+        data = json.loads(row[0])
+        data['links'] = [LinkRecord(**link) for link in data['links']]
+        data['assets'] = [AssetRecord(**asset) for asset in data['assets']]
+        return PageRecord(**data)
+
+    def store(self, page: PageRecord, mtime_ns: int, size: int, digest: str) -> None:
+        """Store (or replace) a freshly extracted record"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (path, mtime_ns, size, digest, record) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (page.path, mtime_ns, size, digest, json.dumps(asdict(page)))
+        )
+
+    def touch(self, path: str, mtime_ns: int, size: int) -> None:
+        """Record a new mtime/size for a page whose content is unchanged"""
+        self.conn.execute(
+            "UPDATE pages SET mtime_ns = ?, size = ? WHERE path = ?",
+            (mtime_ns, size, path)
+        )
+
+    def prune(self, current_paths: set[str]) -> None:
+        """Drop entries for pages that no longer exist"""
+        stale = [(path,) for path in self.entries() if path not in current_paths]
+        self.conn.executemany("DELETE FROM pages WHERE path = ?", stale)
+        self.removed += len(stale)
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def stats(self) -> dict:
+        """Cache hit statistics for the current run"""
+        total = self.hits + self.revalidated + self.misses
+        return {
+            "enabled": True,
+            "path": str(self.db_path),
+            "extractor": self.extractor,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "removed": self.removed,
+            "hit_rate": round((self.hits + self.revalidated) / total, 4) if total else 0.0
+        }
@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from extract_cache import ExtractionCache
+from extractor import extract_site
+
+
+class TestExtractionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dist = self.root / "dist"
+        self.dist.mkdir()
+        (self.dist / "index.html").write_text('<a href="/about/">About</a>', encoding='utf-8')
+        self.db_path = self.root / "cache.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_site(self, extractor):
+        cache = ExtractionCache(self.db_path, extractor)
+        try:
+            pages = extract_site(self.dist, 1, cache, extractor)
+        finally:
+            cache.close()
+        return pages, cache.stats()
+
+    def test_reused_with_same_extractor(self):
+        self.run_site('stream')
+        pages, stats = self.run_site('stream')
+        self.assertEqual((stats['hits'], stats['misses']), (1, 0))
+        self.assertEqual(pages[0].links[0].href, '/about/')
+
+    def test_dropped_when_extractor_changes(self):
+        """Records parsed by one backend are never served to another"""
+        self.run_site('stream')
+        _, stats = self.run_site('soup')
+        self.assertEqual((stats['hits'], stats['misses'], stats['extractor']), (0, 1, 'soup'))
+        _, stats = self.run_site('soup')
+        self.assertEqual(stats['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
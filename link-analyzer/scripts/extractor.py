@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Page Link Extractor
+Reads and parses every HTML page once, producing a per-page link record
+(plus the page's asset references and main-content text) that the
+outbound, internal, link graph and asset analyzers all read from
+"""
+
+import os
+import sys
+import re
+import time
+import hashlib
+import html
+from pathlib import Path
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from html.entities import html5
+
+from bs4 import BeautifulSoup
+
+from instrumentation import record_step, step
+
+
+# Matches href attributes on any element (used by the internal links check)
+HREF_PATTERN = re.compile(r'href=["\']([^"\']*)["\']', re.IGNORECASE)
+
+DEFAULT_EXTRACTOR = 'stream'
+
+# <link rel> values that make the browser fetch the linked file
+ASSET_LINK_RELS = frozenset([
+    'stylesheet', 'icon', 'apple-touch-icon', 'apple-touch-icon-precomposed',
+    'mask-icon', 'manifest', 'preload', 'modulepreload'
+])
+
+# Elements that can reference an asset
+ASSET_TAGS = frozenset(['img', 'source', 'script', 'link'])
+
+# Start of one srcset candidate: its URL runs to the next whitespace
+SRCSET_URL = re.compile(r'[\s,]*(\S+)')
+
+# Main-content containers, most specific first; the body is the fallback. A tag name
+# ends at whitespace, '>' or '/', so custom elements such as <main-nav> don't match
+MAIN_CONTENT_PATTERNS = [
+    re.compile(rf'<{tag}(?=[\s>/])[^>]*>(.*)</{tag}\s*>', re.IGNORECASE | re.DOTALL)
+    for tag in ('main', 'article', 'body')
+]
+
+# Elements that never hold main-content text
+BOILERPLATE_PATTERN = re.compile(
+    r'<!--.*?-->|<(script|style|template|noscript|svg|nav|aside|form)(?=[\s>/])[^>]*>.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Site header and footer, dropped when there is no <main> or <article> to pick out
+PAGE_CHROME_PATTERN = re.compile(r'<(header|footer)(?=[\s>/])[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+TAG_PATTERN = re.compile(r'<[^>]*>')
+
+# Main-content text kept per page (the opening of a page places it topically)
+MAX_TEXT_CHARS = 5000
+
+
+@dataclass
+class LinkRecord:
+    """A single <a href> occurrence on a page"""
+    href: str
+    rel: str
+    text: str
+    kind: str
+
+
+@dataclass
+class AssetRecord:
+    """A file a page loads: <img>/<source> src or srcset, <script src> or <link href>"""
+    kind: str
+    # src or href; empty for a <source> or <img> with only a srcset
+    url: str
+    # srcset candidate URLs (the browser loads one of these or url, not all)
+    srcset: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PageRecord:
+    """Everything the analyzers need from one HTML file"""
+    path: str
+    links: list[LinkRecord] = field(default_factory=list)
+    assets: list[AssetRecord] = field(default_factory=list)
+    hrefs: list[str] = field(default_factory=list)
+    text: str = ''
+    error: str | None = None
+
+
+def classify_href(href: str) -> str:
+    """Classify an href by its form"""
+    value = href.strip().lower()
+
+    if not value:
+        return 'empty'
+    if href.startswith('/'):
+        return 'internal'
+    if value.startswith('#'):
+        return 'fragment'
+    if value.startswith('mailto:'):
+        return 'email'
+    if value.startswith('tel:'):
+        return 'phone'
+    if value.startswith('javascript:'):
+        return 'javascript'
+    if '://' in value or value.startswith('//'):
+        return 'external'
+    return 'relative'
+
+
+def srcset_urls(value: str) -> list[str]:
+    """Candidate URLs of a srcset attribute ('a.jpg 1x, b.jpg 2x' -> ['a.jpg', 'b.jpg'])
+
+    As in the HTML spec, a URL runs to the next whitespace (so it may hold
+    commas, as data: URLs and image CDN paths do) and its descriptors run
+    to the next comma.
+    """
+    urls = []
+    position = 0
+    while match := SRCSET_URL.match(value, position):
+        url = match.group(1)
+        position = match.end()
+        if url.endswith(','):
+            url = url.rstrip(',')
+        else:
+            comma = value.find(',', position)
+            position = len(value) if comma < 0 else comma + 1
+        if url:
+            urls.append(url)
+    return urls
+
+
+def asset_reference(tag: str, attrs: dict[str, str]) -> AssetRecord | None:
+    """The asset an <img>, <source>, <script> or <link> element loads, if any"""
+    if tag == 'link':
+        rels = attrs.get('rel', '').lower().split()
+        if 'href' not in attrs or not ASSET_LINK_RELS.intersection(rels):
+            return None
+        return AssetRecord(kind=tag, url=attrs['href'])
+
+    if tag == 'script':
+        return AssetRecord(kind=tag, url=attrs['src']) if 'src' in attrs else None
+
+    if 'src' not in attrs and 'srcset' not in attrs:
+        return None
+    return AssetRecord(kind=tag, url=attrs.get('src', ''), srcset=srcset_urls(attrs.get('srcset', '')))
+
+
+class LinkExtractor:
+    """Interface for anchor link extraction backends"""
+
+    name = ''
+
+    def parse_page(self, content: str) -> tuple[list[LinkRecord], list[AssetRecord]]:
+        """Extract all <a href> links and asset references from HTML content, in document order"""
+        raise NotImplementedError
+
+    def parse_links(self, content: str) -> list[LinkRecord]:
+        """Extract all <a href> links from HTML content, in document order"""
+        return self.parse_page(content)[0]
+
+
+class SoupExtractor(LinkExtractor):
+    """Reference backend: builds a BeautifulSoup tree and walks its anchors"""
+
+    name = 'soup'
+
+    def parse_page(self, content: str) -> tuple[list[LinkRecord], list[AssetRecord]]:
+        soup = BeautifulSoup(content, 'html.parser')
+        links = []
+
+        for a_tag in soup.find_all('a', href=True):
+            href = a_tag['href']
+            rel = a_tag.get('rel', '')
+            if isinstance(rel, list):
+                rel = ' '.join(rel)
+
+            links.append(LinkRecord(
+                href=href,
+                rel=rel,
+                text=a_tag.get_text(' ', strip=True),
+                kind=classify_href(href)
+            ))
+
+        assets = []
+        for element in soup.find_all(ASSET_TAGS):
+            attrs = {
+                key: ' '.join(value) if isinstance(value, list) else value
+                for key, value in element.attrs.items()
+            }
+            asset = asset_reference(element.name, attrs)
+            if asset:
+                assets.append(asset)
+
+        return links, assets
+
+
+# Elements BeautifulSoup closes as soon as they open
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'
+])
+
+# Elements whose strings BeautifulSoup leaves out of get_text()
+STRING_CONTAINERS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+NAMED_ENTITIES = {name.rstrip(';'): char for name, char in html5.items()}
+
+WHITESPACE_RUN = re.compile(r'\S+')
+NUMERIC_REFERENCE = {
+    10: re.compile(r'^([0-9]+)(.*)'),
+    16: re.compile(r'^([0-9a-f]+)(.*)')
+}
+
+
+def numeric_reference(number: int) -> str:
+    """Resolve a numeric character reference the way the HTML spec (and BeautifulSoup) does"""
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd'
+
+    if 0x80 <= number <= 0x9f:
+        try:
+            # References written using their Windows-1252 encoding
+            return bytes([number]).decode('cp1252')
+        except UnicodeDecodeError:
+            pass
+
+    return chr(number)
+
+
+class AnchorEventParser(HTMLParser):
+    """Event-based parser that follows open anchors without building a tree
+
+    Only anchor and asset element start tags are inspected. The parser keeps a stack of open
+    element names and applies BeautifulSoup's html.parser tree-building rules
+    (pop-to-matching-end-tag, void elements, string containers, entity
+    handling) so href, rel and anchor text match the reference backend,
+    including on malformed markup.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.links: list[LinkRecord] = []
+        self.assets: list[AssetRecord] = []
+        self.texts: list[list[str]] = []
+        self.stack: list[tuple[str, int]] = []
+        self.open_counts: dict[str, int] = {}
+        self.open_anchors: list[int] = []
+        self.container_depth = 0
+        self.closed_voids: dict[str, int] = {}
+        self.pending: list[str] = []
+
+    def flush(self, always: bool = False) -> None:
+        """End the current text run and attach it to every open anchor"""
+        if not self.pending:
+            return
+
+        text = ''.join(self.pending).strip()
+        self.pending = []
+
+        if text and self.open_anchors and (always or not self.container_depth):
+            for index in self.open_anchors:
+                self.texts[index].append(text)
+
+    def push(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.flush()
+
+        index = -1
+        if tag == 'a':
+            values = {key: '' if value is None else value for key, value in attrs}
+            if 'href' in values:
+                href = values['href']
+                index = len(self.links)
+                self.links.append(LinkRecord(
+                    href=href,
+                    rel=' '.join(WHITESPACE_RUN.findall(values.get('rel', ''))),
+                    text='',
+                    kind=classify_href(href)
+                ))
+                self.texts.append([])
+                self.open_anchors.append(index)
+        elif tag in ASSET_TAGS:
+            asset = asset_reference(tag, {key: '' if value is None else value for key, value in attrs})
+            if asset:
+                self.assets.append(asset)
+
+        self.stack.append((tag, index))
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+        if tag in STRING_CONTAINERS:
+            self.container_depth += 1
+
+    def pop_to(self, tag: str) -> None:
+        self.flush()
+
+        if not self.open_counts.get(tag):
+            return
+
+        while self.stack:
+            name, index = self.stack.pop()
+            self.open_counts[name] -= 1
+            if name in STRING_CONTAINERS:
+                self.container_depth -= 1
+            if index >= 0:
+                self.open_anchors.remove(index)
+            if name == tag:
+                break
+
+    def handle_starttag(self, tag, attrs):
+        self.push(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.pop_to(tag)
+            self.closed_voids[tag] = self.closed_voids.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.push(tag, attrs)
+        self.pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if self.closed_voids.get(tag):
+            # Redundant end tag for a void element that is already closed
+            self.closed_voids[tag] -= 1
+        else:
+            self.pop_to(tag)
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        base = 10
+        if name.startswith(('x', 'X')):
+            name = name[1:]
+            base = 16
+
+        try:
+            self.pending.append(numeric_reference(int(name, base)))
+        except ValueError:
+            match = NUMERIC_REFERENCE[base].search(name)
+            if match:
+                self.pending.append(numeric_reference(int(match.group(1), base)))
+                self.pending.append(match.group(2))
+            else:
+                self.pending.append(name)
+
+    def handle_entityref(self, name):
+        self.pending.append(NAMED_ENTITIES.get(name, f"&{name}"))
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith('CDATA['):
+            # CDATA sections always count as text, even inside containers
+            self.pending.append(data[len('CDATA['):])
+            self.flush(always=True)
+
+    def close(self):
+        super().close()
+        self.flush()
+        for link, texts in zip(self.links, self.texts):
+            link.text = ' '.join(texts)
+
+
+class StreamExtractor(LinkExtractor):
+    """Streaming backend: reacts to parser events and never builds a tree"""
+
+    name = 'stream'
+
+    def parse_page(self, content: str) -> tuple[list[LinkRecord], list[AssetRecord]]:
+        parser = AnchorEventParser()
+        parser.feed(content)
+        parser.close()
+        return parser.links, parser.assets
+
+
+EXTRACTORS: dict[str, LinkExtractor] = {
+    extractor.name: extractor for extractor in (StreamExtractor(), SoupExtractor())
+}
+
+
+def get_extractor(name: str) -> LinkExtractor:
+    """Look up an extraction backend by name"""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}' (choose from: {', '.join(EXTRACTORS)})")
+    return EXTRACTORS[name]
+
+
+def parse_links(content: str, extractor: str = DEFAULT_EXTRACTOR) -> list[LinkRecord]:
+    """Extract all <a href> links from HTML content, in document order"""
+    return get_extractor(extractor).parse_links(content)
+
+
+def parse_page(content: str, extractor: str = DEFAULT_EXTRACTOR) -> tuple[list[LinkRecord], list[AssetRecord]]:
+    """Extract all <a href> links and asset references from HTML content, in document order"""
+    return get_extractor(extractor).parse_page(content)
+
+
+def extract_main_text(content: str) -> str:
+    """Visible text of the page's main content, whitespace-collapsed and truncated
+
+    Takes <main>, else <article>, else <body> (minus header and footer),
+    and drops navigation, asides, forms, scripts and styles, so the text is
+    what the page is about rather than the site chrome every page shares.
+    """
+    region = content
+    for index, pattern in enumerate(MAIN_CONTENT_PATTERNS):
+        match = pattern.search(content)
+        if match:
+            region = match.group(1)
+            break
+    else:
+        index = len(MAIN_CONTENT_PATTERNS)
+
+    region = BOILERPLATE_PATTERN.sub(' ', region)
+    if index >= len(MAIN_CONTENT_PATTERNS) - 1:
+        region = PAGE_CHROME_PATTERN.sub(' ', region)
+
+    text = html.unescape(TAG_PATTERN.sub(' ', region))
+    return ' '.join(text.split())[:MAX_TEXT_CHARS]
+
+
+def decode_content(data: bytes) -> str:
+    """Decode raw page bytes the way text-mode open() does (UTF-8, universal newlines)"""
+    content = data.decode('utf-8', errors='ignore')
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def content_digest(data: bytes) -> str:
+    """Hash of raw page bytes, used to detect changed pages"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def extract_changed_page_timed(
+    file_path: Path,
+    dist_path: Path,
+    known_digest: str = None,
+    extractor: str = DEFAULT_EXTRACTOR
+) -> tuple[str | None, PageRecord | None, float, float]:
+    """extract_changed_page(), also returning the seconds spent reading and parsing"""
+    page = PageRecord(path=str(file_path.relative_to(dist_path)))
+    started = time.perf_counter()
+    read_time = 0.0
+
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+
+        digest = content_digest(data)
+        read_time = time.perf_counter() - started
+        if digest == known_digest:
+            return digest, None, read_time, 0.0
+
+        content = decode_content(data)
+        page.links, page.assets = parse_page(content, extractor)
+        page.hrefs = HREF_PATTERN.findall(content)
+        page.text = extract_main_text(content)
+
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}", file=sys.stderr)
+        page.error = str(e)
+        return None, page, read_time, time.perf_counter() - started - read_time
+
+    return digest, page, read_time, time.perf_counter() - started - read_time
+
+
+def extract_changed_page(
+    file_path: Path,
+    dist_path: Path,
+    known_digest: str = None,
+    extractor: str = DEFAULT_EXTRACTOR
+) -> tuple[str | None, PageRecord | None]:
+    """Read a single HTML file and parse it unless its content hash is known
+
+    Returns (digest, record). The record is None when the digest matches
+    known_digest, i.e. the page is unchanged and need not be parsed again.
+    """
+    return extract_changed_page_timed(file_path, dist_path, known_digest, extractor)[:2]
+
+
+def extract_page(file_path: Path, dist_path: Path, extractor: str = DEFAULT_EXTRACTOR) -> PageRecord:
+    """Read and parse a single HTML file"""
+    return extract_changed_page(file_path, dist_path, extractor=extractor)[1]
+
+
+def default_workers() -> int:
+    """Default number of extraction worker processes"""
+    return os.cpu_count() or 1
+
+
+def extract_site(
+    dist_path: Path,
+    workers: int = None,
+    cache=None,
+    extractor: str = DEFAULT_EXTRACTOR
+) -> list[PageRecord]:
+    """Extract link records from every HTML file under dist_path
+
+    With more than one worker, files are spread across a process pool.
+    Records are returned in glob order either way, so results are identical
+    to the serial path.
+
+    With an ExtractionCache, pages whose mtime/size or content hash match
+    the cached entry are loaded from the cache instead of being parsed, and
+    entries for deleted pages are dropped.
+    """
+    get_extractor(extractor)
+
+    with step('glob'):
+        html_files = list(dist_path.glob('**/*.html'))
+    print(f"Extracting links from {len(html_files)} HTML files ({extractor} extractor)...")
+
+    pages: list[PageRecord | None] = [None] * len(html_files)
+    known = cache.entries() if cache else {}
+    pending = []
+
+    with step('cache_lookup'):
+        for index, file_path in enumerate(html_files):
+            if not cache:
+                pending.append((index, file_path, None, None))
+                continue
+
+            path = str(file_path.relative_to(dist_path))
+            try:
+                stat = file_path.stat()
+            except OSError:
+                pending.append((index, file_path, None, None))
+                continue
+
+            entry = known.get(path)
+            if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                pages[index] = cache.load(path)
+                cache.hits += 1
+            else:
+                pending.append((index, file_path, stat, entry[2] if entry else None))
+
+    if cache:
+        print(f"Cache: {cache.hits} unchanged, {len(pending)} to check")
+
+    workers = workers or default_workers()
+    workers = min(workers, len(pending)) or 1
+
+    executor = None
+    if workers > 1:
+        print(f"Using {workers} worker processes...")
+        chunksize = max(1, min(64, len(pending) // (workers * 4)))
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(
+            extract_changed_page_timed,
+            [file_path for _, file_path, _, _ in pending],
+            repeat(dist_path),
+            [digest for _, _, _, digest in pending],
+            repeat(extractor),
+            chunksize=chunksize
+        )
+    else:
+        results = (
+            extract_changed_page_timed(file_path, dist_path, digest, extractor)
+            for _, file_path, _, digest in pending
+        )
+
+    # Reading and parsing happen in the workers: their times are summed across workers
+    read_time = 0.0
+    parse_time = 0.0
+    try:
+        for i, ((index, file_path, stat, _), (digest, page, read, parse)) in enumerate(zip(pending, results), 1):
+            read_time += read
+            parse_time += parse
+            if cache and page is None:
+                # Content unchanged since it was cached
+                path = str(file_path.relative_to(dist_path))
+                page = cache.load(path)
+                cache.touch(path, stat.st_mtime_ns, stat.st_size)
+                cache.revalidated += 1
+            elif cache:
+                cache.misses += 1
+                if stat and not page.error:
+                    cache.store(page, stat.st_mtime_ns, stat.st_size, digest)
+
+            pages[index] = page
+
+            if i % 100 == 0:
+                print(f"Extracted {i}/{len(pending)} files...")
+    finally:
+        if executor:
+            executor.shutdown()
+        record_step('read', read_time)
+        record_step('parse', parse_time)
+
+    if cache:
+        with step('cache_commit'):
+            cache.prune({page.path for page in pages})
+            cache.commit()
+
+    print(f"Extraction complete. {sum(len(p.links) for p in pages)} anchor links found.")
+    return pages
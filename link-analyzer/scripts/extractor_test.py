@@ -0,0 +1,212 @@
+import io
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from html.entities import html5
+from dataclasses import asdict
+from contextlib import redirect_stdout
+
+from extractor import (
+    EXTRACTORS, MAX_TEXT_CHARS, AssetRecord, LinkRecord, extract_main_text, extract_site, parse_links, parse_page,
+    srcset_urls
+)
+from synthetic_site import generate_site
+
+
+SAMPLE_SITE = Path(__file__).parent.parent / "examples" / "sample-site"
+
+# Markup the two backends must agree on, malformed cases included
+CORPUS = [
+    '<a href="/about/">About</a>',
+    '<a href="https://example.com" rel="nofollow noopener">Out</a>',
+    '<A HREF="/upper/">Upper</A>',
+    '<a href=/unquoted/>Unquoted</a>',
+    '<a href>Empty</a>',
+    '<a>No href</a>',
+    '<a href="/first/" href="/second/">Duplicate attribute</a>',
+    '<a href="/x/" rel="  no   follow ">Spaced rel</a>',
+    '<a href="/x/" rel="">Empty rel</a>',
+    '<a href="/self-closing/"/>after',
+    '<a href="/outer/">x<a href="/inner/">y</a>z</a>w',
+    '<a href="/x/">x<b>y</a>z</b>',
+    '<p><a href="/x/">x</p>y</a>',
+    '<a href="/x/">x</div>y</a>',
+    '<a href="/x/">x<table><td>y</a>z',
+    '<a href="/x/">never closed',
+    '<a href="/x/">x</a\n>y',
+    '<a href="/unterminated>t</a><a href="/next/">u</a>',
+    '<a href="/x/">a<br>b<img src="/i.png">c</img>d</a>',
+    '<br><a href="/x/">x</br>y</a>',
+    '<a href="/x/">a<script>s</script><style>t</style><!--c-->b<![CDATA[cd]]>e</a>',
+    '<a href="/x/"><template><p>hidden</p></template>shown</a>',
+    '<a href="/x/">x<ruby>k<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>y</a>',
+    '<a href="/x/"><svg><style>s</style><title>tt</title></svg>z</a>',
+    '<a href="/x/"><textarea>x<a href="/y/">y</textarea></a>',
+    '<a href="/x/">x<!DOCTYPE html>y<?pi?>z</a>',
+    '<a href="/x/">AT&T &amp; &copy &#150; &#x41;&bogus; &lt</a>',
+    '<a href="/x/">&#0;&#128;&#129;&#xD800;&#1114112;&#9731</a>',
+    '<a href="/x/">a < b > c</a>',
+    '<a href="/caf&eacute;/?a=1&amp;b=2">Entities in href</a>',
+    '<a href="/x/">\n  \n<b> </b>q\n</a>',
+    '<script>document.write(\'<a href="/in-script/">s</a>\')</script><a href="/x/">x</a>',
+    '<!-- <a href="/commented/">c</a> --><a href="/x/">x</a>',
+    '<link rel="stylesheet" href="/a.css"><link rel="Shortcut  ICON" href="/f.ico"><link rel="canonical" href="/c/">',
+    '<link href="/no-rel.css"><link rel="preload" href="/font.woff2" as="font"><link rel=icon>',
+    '<script src="/a.js"></script><script>var s = \'<img src="/in-script.png">\'</script><script src></script>',
+    '<img src="/a.png" srcset="/a-2x.png 2x, /a-3x.png 3x"><img alt="none"><img srcset="/only.png">',
+    '<picture><source srcset="/a.avif" type="image/avif"><source src="/v.mp4"><img src="/a.jpg"></picture>',
+    '<IMG SRC="/upper.png"/><img src="/x.png?w=1&amp;h=2"><img src=/unquoted.png>',
+    '<template><img src="/t.png"></template><!-- <img src="/commented.png"> --><noscript><img src="/n.png"></noscript>',
+]
+
+FUZZ_TOKENS = [
+    '<a href="/x/">', '<a href=y rel="a  b">', '<a>', '</a>', '<A HREF=z>', '<a href=q/>',
+    '<a href=w href=v>', '<a href="un', '<b>', '</b>', '<p>', '</p>', '<div', '</div>',
+    '<br>', '</br>', '<img src=1>', '</img>', '<script>', '</script>', '<style>', '</style>',
+    '<template>', '</template>', '<rt>', '</rt>', '<textarea>', '</textarea>', '<title>',
+    '</title>', '<svg>', '</svg>', '<table>', '<td>', '<!-- c -->', '<![CDATA[cd]]>',
+    '<!DOCTYPE x>', '<?pi?>', 'text', ' ', '\n', '&amp;', '&copy', '&#150;', '&#x41;',
+    '&bogus;', '&#12ab;', '&lt', '&#', '&#x', '&', '<', '>', '"', "'",
+    '<img srcset="a 1x, b 2x">', '<source src=s>', '<link rel=stylesheet href=c>', '<script src=j>',
+]
+
+
+class TestExtractorParity(unittest.TestCase):
+
+    def assertParity(self, content):
+        """Every backend returns exactly what the reference backend returns"""
+        expected = EXTRACTORS['soup'].parse_page(content)
+        for name, extractor in EXTRACTORS.items():
+            self.assertEqual(extractor.parse_page(content), expected, f"{name}: {content!r}")
+
+    def test_corpus(self):
+        """Hand-written corpus, including malformed markup"""
+        for content in CORPUS:
+            with self.subTest(content=content):
+                self.assertParity(content)
+
+    def test_sample_site(self):
+        """Every page of the example site"""
+        files = sorted(SAMPLE_SITE.glob('**/*.html'))
+        self.assertTrue(files)
+        for file_path in files:
+            with self.subTest(file=str(file_path)):
+                self.assertParity(file_path.read_text(encoding='utf-8'))
+
+    def test_named_entities(self):
+        """All HTML5 named entities, with and without semicolons"""
+        entities = ' '.join(f"&{name}" for name in html5)
+        self.assertParity(f'<a href="/x/">{entities}</a>')
+
+    def test_numeric_references(self):
+        """Numeric references, including Windows-1252 and invalid code points"""
+        references = 'x'.join(f"&#{n};" for n in range(0, 0x3000, 7))
+        self.assertParity(f'<a href="/x/">{references}</a>')
+        self.assertParity('<a href="/x/">&#x80;&#x81;&#x9f;&#xDFFF;&#x110000;&#99999999;</a>')
+
+    def test_random_markup(self):
+        """Randomly assembled tag soup"""
+        rng = random.Random(2024)
+        for _ in range(2000):
+            content = ''.join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 30)))
+            with self.subTest(content=content):
+                self.assertParity(content)
+
+    def test_link_record(self):
+        """Records carry href, normalized rel, anchor text and kind"""
+        links = parse_links('<a href="/a/" rel="nofollow  ugc">Read <b>more</b></a>'
+                            '<a href="mailto:me@example.com">Mail</a>')
+        self.assertEqual(links, [
+            LinkRecord(href='/a/', rel='nofollow ugc', text='Read more', kind='internal'),
+            LinkRecord(href='mailto:me@example.com', rel='', text='Mail', kind='email'),
+        ])
+
+    def test_asset_records(self):
+        """Images, scripts and fetched <link>s, with srcset candidates split out"""
+        _, assets = parse_page('<link rel="stylesheet" href="/a.css"><link rel="alternate" href="/feed.xml">'
+                               '<script src="/a.js"></script><script>inline()</script>'
+                               '<img src="/a.png" srcset="/a-2x.png 2x, /a-3x.png 3x" alt="">')
+        self.assertEqual(assets, [
+            AssetRecord(kind='link', url='/a.css'),
+            AssetRecord(kind='script', url='/a.js'),
+            AssetRecord(kind='img', url='/a.png', srcset=['/a-2x.png', '/a-3x.png']),
+        ])
+
+    def test_srcset_urls(self):
+        """Descriptors dropped; commas inside a URL kept"""
+        self.assertEqual(srcset_urls('a.jpg, b.jpg 2x,c.jpg 300w,, '), ['a.jpg', 'b.jpg', 'c.jpg'])
+        self.assertEqual(srcset_urls('/img/w_100,h_50/a.jpg 1x,data:image/gif;base64,R0lG 2x'),
+                         ['/img/w_100,h_50/a.jpg', 'data:image/gif;base64,R0lG'])
+        self.assertEqual(srcset_urls(''), [])
+
+
+
+class TestMainText(unittest.TestCase):
+
+    def test_main_content_only(self):
+        """<main> is preferred; navigation, scripts and comments are dropped"""
+        content = (
+            '<html><head><title>T</title><style>p {}</style></head><body>'
+            '<header>Site name</header><nav><a href="/">Home</a></nav>'
+            '<main><h1>Title &amp; more</h1><script>track()</script><!-- note -->'
+            '<p>First  <b>bold</b>\n paragraph.</p><aside>Related</aside></main>'
+            '<footer>Copyright</footer></body></html>'
+        )
+        self.assertEqual(extract_main_text(content), 'Title & more First bold paragraph.')
+
+    def test_fallbacks(self):
+        """<article>, then <body> without its header and footer, then the whole document"""
+        self.assertEqual(extract_main_text('<body><nav>n</nav><article>Post</article></body>'), 'Post')
+        self.assertEqual(extract_main_text('<body><header>h</header><p>Text</p><footer>f</footer></body>'), 'Text')
+        self.assertEqual(extract_main_text('Plain <i>text</i>'), 'Plain text')
+
+    def test_custom_elements(self):
+        """Custom elements named like containers or boilerplate are neither picked out nor dropped"""
+        content = (
+            '<body><main-nav>Menu</main-nav><nav-menu><a href="/">Home</a></nav-menu>'
+            '<header-bar>Banner</header-bar><main><p>Body text</p><aside-note>Kept</aside-note></main>'
+            '<nav>Links</nav></body>'
+        )
+        self.assertEqual(extract_main_text(content), 'Body text Kept')
+        self.assertEqual(extract_main_text('<body><main-nav>Menu</main-nav><p>Text</p><nav>x</nav></body>'),
+                         'Menu Text')
+        self.assertEqual(extract_main_text('<body><article-card>Card</article-card><p>Text</p></body>'),
+                         'Card Text')
+
+    def test_truncated(self):
+        self.assertEqual(len(extract_main_text('<main>' + 'word ' * 5000 + '</main>')), MAX_TEXT_CHARS)
+
+
+
+class TestExtractSite(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dist = Path(cls.tmp.name)
+        generate_site(cls.dist, pages=600, seed=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def extract(self, workers: int, extractor: str) -> list:
+        with redirect_stdout(io.StringIO()):
+            return extract_site(self.dist, workers=workers, extractor=extractor)
+
+    def test_workers_match_serial(self):
+        """A process pool returns the serial path's records, in the same order, byte for byte"""
+        for extractor in EXTRACTORS:
+            with self.subTest(extractor=extractor):
+                serial = self.extract(1, extractor)
+                self.assertGreaterEqual(len(serial), 600)
+                parallel = self.extract(4, extractor)
+                self.assertEqual(parallel, serial)
+                self.assertEqual(json.dumps([asdict(page) for page in parallel]),
+                                 json.dumps([asdict(page) for page in serial]))
+
+
+if __name__ == '__main__':
+    unittest.main()
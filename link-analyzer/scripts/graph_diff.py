@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Link Graph Diff
+Compares two saved link graphs (or a saved graph and the current build):
+internal links added and removed, pages added and removed, pages that
+became orphans, and pages that lost inbound links.
+
+Neither graph is held in memory as URLs. Each is streamed once to a sorted
+array of 64-bit edge hashes, the arrays are diffed, and a second pass over
+each graph picks out only the changed edges, so beyond 8 bytes per edge
+memory grows with the size of the change, not the size of the site. Graphs
+saved as one JSON document are parsed once and spilled to temporary NDJSON
+files that the passes stream from.
+
+Pages added and removed are pages that were built (or crawled), not link
+targets: a deleted page that other pages still link to counts as removed.
+"""
+
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import numpy as np
+
+# Add shared modules to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+from config_loader import load_json_config
+from utils import save_json, timestamp
+from extractor import DEFAULT_EXTRACTOR, EXTRACTORS
+from graph_output import iter_edges, iter_page_metrics, read_ndjson, write_ndjson
+from link_graph import LinkGraphAnalyzer
+
+# Most sources listed per page that lost inbound links
+MAX_LOST_SOURCES = 10
+
+
+@dataclass
+class GraphSource:
+    """A link graph that can be streamed more than once"""
+    name: str
+    edges: Callable[[], Iterator[tuple[str, str]]]
+    # (url, inbound link count, built or crawled) for every page, link targets included
+    pages: Callable[[], Iterator[tuple[str, int, bool]]]
+    orphans: list[str]
+
+
+def page_entry(metrics: dict) -> tuple[str, int, bool]:
+    """(url, inbound, crawled) of a page metrics record
+
+    Sidecar graphs saved before page metrics had a crawled flag count pages
+    with outbound links as crawled.
+    """
+    crawled = metrics.get('crawled')
+    if crawled is None:
+        crawled = metrics['outbound'] > 0
+    return metrics['url'], metrics['inbound'], crawled
+
+
+def saved_graph(path: Path, spill_dir: Path) -> GraphSource:
+    """A link graph saved by link_graph.py or analyze.py (any graph format)
+
+    Sidecar formats are streamed from their files. A single-document json
+    graph is parsed once and its edges and pages are spilled to NDJSON
+    files in spill_dir, which every later pass streams instead.
+    """
+    with open(path, encoding='utf-8') as f:
+        analysis = json.load(f)
+    orphans = analysis.get('orphan_pages', [])
+
+    if analysis.get('graph_files'):
+        return GraphSource(
+            name=str(path),
+            edges=lambda: iter_edges(path),
+            pages=lambda: map(page_entry, iter_page_metrics(path)),
+            orphans=orphans
+        )
+
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    edges_path = spill_dir / "edges.ndjson"
+    pages_path = spill_dir / "pages.ndjson"
+    link_graph = analysis.get('link_graph', {})
+    write_ndjson(
+        ({'source': source, 'target': target} for source, targets in link_graph.items() for target in targets),
+        edges_path
+    )
+    # Every built page has a link graph entry, links or not
+    write_ndjson(
+        (
+            {'url': url, 'inbound': metrics['inbound'], 'crawled': metrics.get('crawled', url in link_graph)}
+            for url, metrics in analysis.get('page_metrics', {}).items()
+        ),
+        pages_path
+    )
+    return GraphSource(
+        name=str(path),
+        edges=lambda: ((edge['source'], edge['target']) for edge in read_ndjson(edges_path)),
+        pages=lambda: ((page['url'], page['inbound'], page['crawled']) for page in read_ndjson(pages_path)),
+        orphans=orphans
+    )
+
+
+def built_graph(analyzer: LinkGraphAnalyzer) -> GraphSource:
+    """The link graph of an analyzer that has built its graph and metrics"""
+    return GraphSource(
+        name=str(analyzer.dist_path),
+        edges=analyzer.iter_edges,
+        pages=lambda: zip(analyzer.urls, analyzer.inbound.tolist(), analyzer.crawled.tolist()),
+        orphans=analyzer.find_orphans()
+    )
+
+
+def sorted_hashes(items: Iterator) -> np.ndarray:
+    """Sorted, distinct 64-bit hashes of a stream of hashable items
+
+    Python's string hashes are salted per process, which is fine here: both
+    graphs are hashed in the same process. A collision (about one in 10^7
+    at 10^6 changed edges) would hide a change, never invent one.
+    """
+    return np.unique(np.fromiter(map(hash, items), dtype=np.int64))
+
+
+def changed_hashes(old: np.ndarray, new: np.ndarray) -> tuple[set[int], set[int]]:
+    """(hashes only in old, hashes only in new) of two sorted hash arrays"""
+    return (
+        set(np.setdiff1d(old, new, assume_unique=True).tolist()),
+        set(np.setdiff1d(new, old, assume_unique=True).tolist())
+    )
+
+
+def diff_graphs(old: GraphSource, new: GraphSource) -> dict:
+    """Compare two link graphs"""
+    print(f"Hashing edges of {old.name}...")
+    old_edges = sorted_hashes(old.edges())
+    print(f"Hashing edges of {new.name}...")
+    new_edges = sorted_hashes(new.edges())
+    removed_hashes, added_hashes = changed_hashes(old_edges, new_edges)
+    old_link_count, new_link_count = len(old_edges), len(new_edges)
+    del old_edges, new_edges
+
+    removed_links = sorted(edge for edge in old.edges() if hash(edge) in removed_hashes)
+    added_links = sorted(edge for edge in new.edges() if hash(edge) in added_hashes)
+
+    # Built pages only: a removed page that is still linked to stays in the graph as a target
+    old_urls = sorted_hashes(url for url, _, crawled in old.pages() if crawled)
+    new_urls = sorted_hashes(url for url, _, crawled in new.pages() if crawled)
+    removed_url_hashes, added_url_hashes = changed_hashes(old_urls, new_urls)
+    old_page_count, new_page_count = len(old_urls), len(new_urls)
+    del old_urls, new_urls
+
+    # Inbound counts before and after, for the targets of changed links only
+    touched = {target for _, target in removed_links} | {target for _, target in added_links}
+    before: dict[str, int] = {}
+    removed_pages = []
+    for url, inbound, crawled in old.pages():
+        if url in touched:
+            before[url] = inbound
+        if crawled and hash(url) in removed_url_hashes:
+            removed_pages.append(url)
+    after: dict[str, int] = {}
+    added_pages = []
+    for url, inbound, crawled in new.pages():
+        if url in touched:
+            after[url] = inbound
+        if crawled and hash(url) in added_url_hashes:
+            added_pages.append(url)
+
+    removed_from: dict[str, list[str]] = {}
+    for source, target in removed_links:
+        removed_from.setdefault(target, []).append(source)
+    lost_inbound = sorted(
+        (
+            {
+                'url': url,
+                'before': before.get(url, 0),
+                'after': after[url],
+                'removed_from': sources[:MAX_LOST_SOURCES]
+            }
+            for url, sources in removed_from.items()
+            if url in after and after[url] < before.get(url, 0)
+        ),
+        key=lambda page: (page['after'] - page['before'], page['url'])
+    )
+
+    old_orphans = set(old.orphans)
+    new_orphans = set(new.orphans)
+
+    return {
+        "metadata": {
+            "compared_at": timestamp(),
+            "old": old.name,
+            "new": new.name,
+            "old_pages": old_page_count,
+            "new_pages": new_page_count,
+            "old_links": old_link_count,
+            "new_links": new_link_count
+        },
+        "summary": {
+            "links_added": len(added_links),
+            "links_removed": len(removed_links),
+            "pages_added": len(added_pages),
+            "pages_removed": len(removed_pages),
+            "new_orphans": len(new_orphans - old_orphans),
+            "resolved_orphans": len(old_orphans - new_orphans),
+            "pages_losing_inbound": len(lost_inbound)
+        },
+        "links_added": [{'source': source, 'target': target} for source, target in added_links],
+        "links_removed": [{'source': source, 'target': target} for source, target in removed_links],
+        "pages_added": sorted(added_pages),
+        "pages_removed": sorted(removed_pages),
+        "new_orphans": sorted(new_orphans - old_orphans),
+        "resolved_orphans": sorted(old_orphans - new_orphans),
+        "lost_inbound": lost_inbound
+    }
+
+
+def generate_markdown_report(diff: dict, limit: int = 20) -> str:
+    """Generate a markdown change report"""
+    meta = diff['metadata']
+    summary = diff['summary']
+    lines = [
+        "# Link Graph Changes",
+        "",
+        f"**Compared:** {meta['compared_at']}",
+        f"**Old:** `{meta['old']}` ({meta['old_pages']} pages, {meta['old_links']} links)",
+        f"**New:** `{meta['new']}` ({meta['new_pages']} pages, {meta['new_links']} links)",
+        "",
+        "| Change | Count |",
+        "|--------|-------|",
+        f"| Links added | {summary['links_added']} |",
+        f"| Links removed | {summary['links_removed']} |",
+        f"| Pages added | {summary['pages_added']} |",
+        f"| Pages removed | {summary['pages_removed']} |",
+        f"| New orphan pages | {summary['new_orphans']} |",
+        f"| Orphans now linked | {summary['resolved_orphans']} |",
+        f"| Pages that lost inbound links | {summary['pages_losing_inbound']} |",
+        "",
+    ]
+
+    def more(items: list) -> None:
+        if len(items) > limit:
+            lines.append(f"\n*... and {len(items) - limit} more*")
+        lines.append("")
+
+    if diff['new_orphans']:
+        lines.extend([
+            "## New Orphan Pages",
+            "",
+            "Nothing links to these pages any more.",
+            "",
+        ])
+        lines.extend(f"- `{url}`" for url in diff['new_orphans'][:limit])
+        more(diff['new_orphans'])
+
+    if diff['lost_inbound']:
+        lines.extend([
+            "## Pages That Lost Inbound Links",
+            "",
+            "| Page | Before | After | No Longer Linked From |",
+            "|------|--------|-------|-----------------------|",
+        ])
+        for page in diff['lost_inbound'][:limit]:
+            sources = ", ".join(f"`{source}`" for source in page['removed_from'][:3])
+            lines.append(f"| `{page['url']}` | {page['before']} | {page['after']} | {sources} |")
+        more(diff['lost_inbound'])
+
+    for key, title in (('links_removed', "Links Removed"), ('links_added', "Links Added")):
+        if diff[key]:
+            lines.extend([
+                f"## {title}",
+                "",
+                "| Source | Target |",
+                "|--------|--------|",
+            ])
+            lines.extend(f"| `{link['source']}` | `{link['target']}` |" for link in diff[key][:limit])
+            more(diff[key])
+
+    for key, title in (('pages_removed', "Pages Removed"), ('pages_added', "Pages Added"),
+                       ('resolved_orphans', "Orphans Now Linked")):
+        if diff[key]:
+            lines.extend([f"## {title}", ""])
+            lines.extend(f"- `{url}`" for url in diff[key][:limit])
+            more(diff[key])
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link Graph Diff")
+    parser.add_argument("old", help="Saved link graph (link_graph.json) to compare against")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("new", nargs="?", help="Saved link graph to compare")
+    target.add_argument("--dist", "-d", help="Compare against the current build in this dist directory instead")
+    parser.add_argument("--config", help="Path to config.json (exclusions for --dist)")
+    parser.add_argument("--output", "-o", help="Output JSON file path")
+    parser.add_argument("--report", "-r", help="Output markdown report path")
+    parser.add_argument("--exclude", nargs="+", help="Paths to exclude (--dist)")
+    parser.add_argument("--workers", "-w", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--extractor", choices=list(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help="Link extraction backend")
+
+    args = parser.parse_args()
+
+    old_path = Path(args.old)
+    if not old_path.exists():
+        print(f"Error: File not found: {old_path}", file=sys.stderr)
+        sys.exit(1)
+
+    analyzer = None
+    if args.dist:
+        config = {}
+        if args.config:
+            config = load_json_config(Path(args.config))
+
+        dist_path = Path(args.dist)
+        if not dist_path.exists():
+            print(f"Error: Directory not found: {dist_path}", file=sys.stderr)
+            sys.exit(1)
+
+        analyzer = LinkGraphAnalyzer(
+            dist_path,
+            excluded_paths=args.exclude or config.get("excluded_paths", []),
+            workers=args.workers,
+            extractor=args.extractor
+        )
+        analyzer.build_graph()
+        analyzer.calculate_metrics()
+    else:
+        new_path = Path(args.new)
+        if not new_path.exists():
+            print(f"Error: File not found: {new_path}", file=sys.stderr)
+            sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="graph-diff-") as spill_dir:
+        old = saved_graph(old_path, Path(spill_dir) / "old")
+        new = built_graph(analyzer) if analyzer else saved_graph(new_path, Path(spill_dir) / "new")
+        diff = diff_graphs(old, new)
+
+    if args.output:
+        output_path = Path(args.output)
+        save_json(diff, output_path)
+        print(f"\nJSON results saved to: {output_path}")
+
+    if args.report:
+        report_path = Path(args.report)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(generate_markdown_report(diff))
+        print(f"Markdown report saved to: {report_path}")
+
+    # Print summary
+    summary = diff["summary"]
+    print(f"\n{'=' * 60}")
+    print("LINK GRAPH CHANGES")
+    print(f"{'=' * 60}")
+    print(f"Links: +{summary['links_added']} / -{summary['links_removed']}")
+    print(f"Pages: +{summary['pages_added']} / -{summary['pages_removed']}")
+    print(f"New orphan pages: {summary['new_orphans']}")
+    print(f"Orphans now linked: {summary['resolved_orphans']}")
+    print(f"Pages that lost inbound links: {summary['pages_losing_inbound']}")
+
+    if diff['new_orphans']:
+        print(f"\nNEW ORPHAN PAGES (first 10):")
+        for url in diff['new_orphans'][:10]:
+            print(f"  - {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from contextlib import redirect_stdout
+
+from extractor import LinkRecord, PageRecord
+from graph_diff import built_graph, diff_graphs, saved_graph
+from graph_output import PYARROW_AVAILABLE, save_analysis
+from link_graph import LinkGraphAnalyzer
+
+
+OLD = {
+    '/': ['/a/', '/b/', '/c/'],
+    '/a/': ['/b/', '/c/'],
+    '/b/': ['/a/'],
+    '/c/': [],
+    '/d/': ['/a/'],
+}
+
+# /b/ deleted but still linked from /a/; / stops linking /c/; /d/ loses its only link out; new /e/ links /d/
+NEW = {
+    '/': ['/a/', '/e/'],
+    '/a/': ['/b/', '/c/'],
+    '/c/': [],
+    '/d/': [],
+    '/e/': ['/c/', '/d/'],
+}
+
+
+def build(graph: dict[str, list[str]]) -> LinkGraphAnalyzer:
+    """Analyzer over pages given as URL -> linked URLs, with every metric calculated"""
+    pages = [
+        PageRecord(
+            path=url.strip('/') + '/index.html' if url != '/' else 'index.html',
+            links=[LinkRecord(href=target, rel='', text='', kind='internal') for target in targets]
+        )
+        for url, targets in graph.items()
+    ]
+    analyzer = LinkGraphAnalyzer(Path("dist"))
+    with redirect_stdout(io.StringIO()):
+        analyzer.build_graph(pages)
+    analyzer.calculate_metrics()
+    analyzer.calculate_pagerank()
+    analyzer.calculate_click_depth()
+    return analyzer
+
+
+class TestGraphDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def save(self, analyzer: LinkGraphAnalyzer, name: str, graph_format: str) -> Path:
+        path = self.root / f"{name}.json"
+        save_analysis(analyzer, {'orphan_pages': analyzer.find_orphans()}, path, graph_format)
+        return path
+
+    def diff(self, old, new) -> dict:
+        with redirect_stdout(io.StringIO()):
+            return diff_graphs(old, new)
+
+    def check(self, diff: dict) -> None:
+        self.assertEqual(diff['links_removed'], [
+            {'source': '/', 'target': '/b/'},
+            {'source': '/', 'target': '/c/'},
+            {'source': '/b/', 'target': '/a/'},
+            {'source': '/d/', 'target': '/a/'},
+        ])
+        self.assertEqual(diff['links_added'], [
+            {'source': '/', 'target': '/e/'}, {'source': '/e/', 'target': '/c/'}, {'source': '/e/', 'target': '/d/'}
+        ])
+        self.assertEqual((diff['pages_removed'], diff['pages_added']), (['/b/'], ['/e/']))
+        self.assertEqual((diff['new_orphans'], diff['resolved_orphans']), ([], ['/d/']))
+        self.assertEqual(diff['lost_inbound'], [
+            {'url': '/a/', 'before': 3, 'after': 1, 'removed_from': ['/b/', '/d/']},
+            {'url': '/b/', 'before': 2, 'after': 1, 'removed_from': ['/']},
+        ])
+        self.assertEqual({key: diff['metadata'][key] for key in ('old_pages', 'new_pages', 'old_links', 'new_links')},
+                         {'old_pages': 5, 'new_pages': 5, 'old_links': 7, 'new_links': 6})
+
+    def test_saved_against_built(self):
+        """Every saved format compares the same against the current build"""
+        formats = ['json', 'ndjson'] + (['parquet'] if PYARROW_AVAILABLE else [])
+        for graph_format in formats:
+            with self.subTest(graph_format=graph_format):
+                old = saved_graph(self.save(build(OLD), graph_format, graph_format), self.root / graph_format)
+                self.check(self.diff(old, built_graph(build(NEW))))
+
+    def test_saved_against_saved(self):
+        old = saved_graph(self.save(build(OLD), "old", "json"), self.root / "old")
+        new = saved_graph(self.save(build(NEW), "new", "ndjson"), self.root / "new")
+        self.check(self.diff(old, new))
+
+    def test_json_graph_parsed_once(self):
+        """A single-document graph is read once; every pass streams the spilled copy"""
+        old = saved_graph(self.save(build(OLD), "old", "json"), self.root / "old")
+        new = saved_graph(self.save(build(NEW), "new", "json"), self.root / "new")
+        with mock.patch('json.load', side_effect=AssertionError("graph parsed again")):
+            self.check(self.diff(old, new))
+
+    def test_graphs_without_crawled_flag(self):
+        """Graphs saved before page metrics recorded crawled pages still diff built pages only"""
+        path = self.save(build(OLD), "old", "json")
+        analysis = json.loads(path.read_text(encoding='utf-8'))
+        for metrics in analysis['page_metrics'].values():
+            del metrics['crawled']
+        path.write_text(json.dumps(analysis), encoding='utf-8')
+        self.check(self.diff(saved_graph(path, self.root / "old"), built_graph(build(NEW))))
+
+
+if __name__ == '__main__':
+    unittest.main()
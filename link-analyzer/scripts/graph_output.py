@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Link Graph Output
+Writes link graph analyses either as one JSON document (the default) or as
+a small summary JSON plus the edge list and per-page metrics streamed to
+sidecar files (NDJSON, or Parquet when pyarrow is installed). Summaries
+can be loaded back without reading the edge set.
+"""
+
+import sys
+import json
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+# Add shared modules to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+from utils import save_json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+GRAPH_FORMATS = ['json', 'ndjson', 'parquet']
+
+# Rows per Parquet row group / NDJSON write batch
+BATCH_SIZE = 65536
+
+SIDECAR_SUFFIXES = {
+    'ndjson': ('.edges.ndjson', '.pages.ndjson'),
+    'parquet': ('.edges.parquet', '.pages.parquet'),
+}
+
+
+def sidecar_paths(output_path: Path, graph_format: str) -> tuple[Path, Path]:
+    """Edge list and page metrics paths next to a summary file"""
+    edges_suffix, pages_suffix = SIDECAR_SUFFIXES[graph_format]
+    return (
+        output_path.with_name(output_path.stem + edges_suffix),
+        output_path.with_name(output_path.stem + pages_suffix)
+    )
+
+
+def write_ndjson(rows: Iterator[dict], path: Path) -> int:
+    """Write rows as newline-delimited JSON, one batch at a time"""
+    count = 0
+    batch = []
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            batch.append(json.dumps(row, ensure_ascii=False))
+            if len(batch) == BATCH_SIZE:
+                f.write("\n".join(batch) + "\n")
+                count += len(batch)
+                batch = []
+        if batch:
+            f.write("\n".join(batch) + "\n")
+            count += len(batch)
+    return count
+
+
+def read_ndjson(path: Path) -> Iterator[dict]:
+    """Stream the rows of a newline-delimited JSON file"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def write_ndjson_edges(analyzer, path: Path) -> int:
+    """Write the edge list as NDJSON, encoding each URL once"""
+    encoded = [json.dumps(url, ensure_ascii=False) for url in analyzer.urls]
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for source_id in analyzer.sources:
+            source = encoded[source_id]
+            lines = [
+                f'{{"source": {source}, "target": {encoded[target_id]}}}\n'
+                for target_id in analyzer.targets_of(source_id).tolist()
+            ]
+            f.write(''.join(lines))
+            count += len(lines)
+    return count
+
+
+def write_parquet(rows: Iterator[dict], path: Path, schema: "pa.Schema") -> int:
+    """Write rows to Parquet, one row group per batch"""
+    count = 0
+    batch = []
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def edge_schema() -> "pa.Schema":
+    return pa.schema([
+        ('source', pa.dictionary(pa.int32(), pa.string())),
+        ('target', pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+
+def page_schema() -> "pa.Schema":
+    return pa.schema([
+        ('url', pa.string()),
+        ('inbound', pa.int64()),
+        ('outbound', pa.int64()),
+        ('ratio', pa.float64()),
+        ('inbound_from', pa.list_(pa.string())),
+        ('outbound_to', pa.list_(pa.string())),
+        ('pagerank', pa.float64()),
+        ('depth', pa.int64()),
+        ('crawled', pa.bool_()),
+    ])
+
+
+def write_parquet_edges(analyzer, path: Path) -> int:
+    """Write the edge list straight from the CSR arrays, dictionary-encoded by page ID
+
+    Edges follow analyzer.sources order, as in the json and ndjson output.
+    """
+    urls = pa.array(analyzer.urls, type=pa.string())
+    order = np.asarray(analyzer.sources, dtype=np.int32)
+    counts = np.diff(analyzer.indptr)[order]
+    sources = np.repeat(order, counts)
+    # Position in indices of each edge, taking the sources' CSR slices in turn
+    offsets = np.repeat(analyzer.indptr[order] - (np.cumsum(counts) - counts), counts)
+    targets = analyzer.indices[offsets + np.arange(len(sources))].astype(np.int32)
+
+    with pq.ParquetWriter(str(path), edge_schema()) as writer:
+        for start in range(0, len(targets), BATCH_SIZE):
+            stop = start + BATCH_SIZE
+            writer.write_table(pa.Table.from_arrays([
+                pa.DictionaryArray.from_arrays(pa.array(sources[start:stop]), urls),
+                pa.DictionaryArray.from_arrays(pa.array(targets[start:stop]), urls),
+            ], schema=edge_schema()))
+    return len(targets)
+
+
+def save_analysis(analyzer, analysis: dict, output_path: Path, graph_format: str = 'json') -> None:
+    """Save an analysis in the requested format
+
+    'json' writes the full analysis (link_graph and page_metrics included) as
+    one document. 'ndjson' and 'parquet' write the analysis without them and
+    stream the edge list and page metrics from the analyzer to sidecar files,
+    recorded under "graph_files" in the summary.
+    """
+    if graph_format == 'json':
+        if 'link_graph' not in analysis:
+            analysis = dict(analysis, link_graph=analyzer.link_graph_dict(),
+                            page_metrics=analyzer.page_metrics_dict())
+        save_json(analysis, output_path)
+        return
+
+    if graph_format not in SIDECAR_SUFFIXES:
+        raise ValueError(f"Unknown graph format: {graph_format} (choose from {', '.join(GRAPH_FORMATS)})")
+    if graph_format == 'parquet' and not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+    edges_path, pages_path = sidecar_paths(output_path, graph_format)
+    if graph_format == 'ndjson':
+        edge_count = write_ndjson_edges(analyzer, edges_path)
+        page_count = write_ndjson(analyzer.iter_page_metrics(), pages_path)
+    else:
+        edge_count = write_parquet_edges(analyzer, edges_path)
+        page_count = write_parquet(analyzer.iter_page_metrics(), pages_path, page_schema())
+
+    summary = {key: value for key, value in analysis.items() if key not in ('link_graph', 'page_metrics')}
+    summary['graph_files'] = {
+        'format': graph_format,
+        'edges': edges_path.name,
+        'edge_count': edge_count,
+        'page_metrics': pages_path.name,
+        'page_count': page_count
+    }
+    save_json(summary, output_path)
+
+
+def load_summary(path: Path) -> dict:
+    """Load an analysis without its edge set
+
+    For summaries written with a sidecar format this reads only the small
+    summary file. Full JSON analyses are read whole and trimmed.
+    """
+    with open(path, encoding='utf-8') as f:
+        analysis = json.load(f)
+    analysis.pop('link_graph', None)
+    analysis.pop('page_metrics', None)
+    return analysis
+
+
+def iter_edges(path: Path) -> Iterator[tuple[str, str]]:
+    """Stream (source, target) URL pairs from a saved analysis"""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        analysis = json.load(f)
+
+    graph_files = analysis.get('graph_files')
+    if not graph_files:
+        for source, targets in analysis.get('link_graph', {}).items():
+            for target in targets:
+                yield source, target
+        return
+
+    edges_path = path.with_name(graph_files['edges'])
+    if graph_files['format'] == 'ndjson':
+        for edge in read_ndjson(edges_path):
+            yield edge['source'], edge['target']
+    else:
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Reading Parquet output requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(str(edges_path)).iter_batches(batch_size=BATCH_SIZE):
+            yield from zip(batch.column('source').to_pylist(), batch.column('target').to_pylist())
+
+
+def iter_page_metrics(path: Path) -> Iterator[dict]:
+    """Stream per-page metrics records from a saved analysis"""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        analysis = json.load(f)
+
+    graph_files = analysis.get('graph_files')
+    if not graph_files:
+        yield from analysis.get('page_metrics', {}).values()
+        return
+
+    pages_path = path.with_name(graph_files['page_metrics'])
+    if graph_files['format'] == 'ndjson':
+        yield from read_ndjson(pages_path)
+    else:
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Reading Parquet output requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(str(pages_path)).iter_batches(batch_size=BATCH_SIZE):
+            yield from batch.to_pylist()
@@ -0,0 +1,81 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from contextlib import redirect_stdout
+
+from extractor import LinkRecord, PageRecord
+from graph_output import PYARROW_AVAILABLE, iter_edges, iter_page_metrics, load_summary, save_analysis
+from link_graph import LinkGraphAnalyzer
+
+
+# / links /z/ before /z/ is crawled, so link graph order differs from page ID order
+GRAPH = {
+    '/': ['/z/', '/a/', '/missing/'],
+    '/a/': ['/', '/z/'],
+    '/z/': ['/a/'],
+    '/b/': [],
+}
+
+
+def build() -> LinkGraphAnalyzer:
+    pages = [
+        PageRecord(
+            path=url.strip('/') + '/index.html' if url != '/' else 'index.html',
+            links=[LinkRecord(href=target, rel='', text='', kind='internal') for target in targets]
+        )
+        for url, targets in GRAPH.items()
+    ]
+    analyzer = LinkGraphAnalyzer(Path("dist"))
+    with redirect_stdout(io.StringIO()):
+        analyzer.build_graph(pages)
+    analyzer.calculate_metrics()
+    analyzer.calculate_pagerank()
+    analyzer.calculate_click_depth()
+    return analyzer
+
+
+class TestRoundTrip(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = build()
+        cls.analysis = {
+            'metadata': {'total_pages': cls.analyzer.total_pages, 'total_links': cls.analyzer.total_links},
+            'orphan_pages': cls.analyzer.find_orphans(),
+        }
+
+    def test_formats(self):
+        """Every format loads back the same edges, in the same order, page metrics and summary"""
+        edges = list(self.analyzer.iter_edges())
+        self.assertEqual(edges[:3], [('/', '/z/'), ('/', '/a/'), ('/', '/missing/')])
+        page_metrics = list(self.analyzer.iter_page_metrics())
+
+        formats = ['json', 'ndjson'] + (['parquet'] if PYARROW_AVAILABLE else [])
+        for graph_format in formats:
+            with self.subTest(graph_format=graph_format), tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / "link_graph.json"
+                save_analysis(self.analyzer, self.analysis, path, graph_format)
+
+                self.assertEqual(list(iter_edges(path)), edges)
+                self.assertEqual(list(iter_page_metrics(path)), page_metrics)
+
+                summary = load_summary(path)
+                graph_files = summary.pop('graph_files', None)
+                self.assertEqual(summary, self.analysis)
+                if graph_format != 'json':
+                    self.assertEqual((graph_files['format'], graph_files['edge_count'], graph_files['page_count']),
+                                     (graph_format, len(edges), len(page_metrics)))
+
+    @unittest.skipIf(PYARROW_AVAILABLE, "pyarrow is installed")
+    def test_parquet_requires_pyarrow(self):
+        with tempfile.TemporaryDirectory() as tmp, self.assertRaises(RuntimeError):
+            save_analysis(self.analyzer, self.analysis, Path(tmp) / "link_graph.json", 'parquet')
+
+    def test_unknown_format(self):
+        with tempfile.TemporaryDirectory() as tmp, self.assertRaises(ValueError):
+            save_analysis(self.analyzer, self.analysis, Path(tmp) / "link_graph.json", 'csv')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+HTTP Result Cache
+Persists HTTP check results in SQLite so URLs verified recently are not
+re-checked on the next run. Entries expire after a TTL that depends on the
+status class; expired entries with an ETag or Last-Modified validator are
+revalidated with a conditional request instead of a full check.
+"""
+
+import time
+import sqlite3
+from pathlib import Path
+
+from http_common import build_result
+from url_canonical import canonicalize
+
+
+HTTP_CACHE_FILENAME = "http_cache.sqlite"
+
+# Bump whenever the stored result shape changes
+CACHE_VERSION = "1"
+
+DAY = 86400
+
+# Days a result stays fresh, by status class
+DEFAULT_TTL_DAYS = {
+    "ok": 7,
+    "client_error": 1,
+    "server_error": 0.25,
+    "error": 0.25
+}
+
+
+def status_class(status_code: int | None, is_broken: bool) -> str:
+    """Which TTL applies to a result"""
+    if status_code is None:
+        return "error"
+    if not is_broken:
+        return "ok"
+    if status_code >= 500:
+        return "server_error"
+    return "client_error"
+
+
+def cache_key(url: str) -> str:
+    """Normalize a URL for cache lookups: case-fold scheme/host, drop default port and fragment"""
+    return canonicalize(url)
+
+
+def validators_from(headers) -> dict:
+    """ETag/Last-Modified validators from response headers"""
+    return {
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified')
+    }
+
+
+class HTTPResultCache:
+    """SQLite-backed cache of HTTP check results"""
+
+    def __init__(self, db_path: Path, ttl_days: dict[str, float] = None):
+        self.db_path = db_path
+        self.ttls = {
+            name: days * DAY
+            for name, days in {**DEFAULT_TTL_DAYS, **(ttl_days or {})}.items()
+        }
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, status_code INTEGER, status_message TEXT, "
+            "is_broken INTEGER, checked_at REAL, etag TEXT, last_modified TEXT)"
+        )
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if not row or row[0] != CACHE_VERSION:
+            self.conn.execute("DELETE FROM results")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                (CACHE_VERSION,)
+            )
+        self.conn.commit()
+
+        # Cached entries for URLs sent out for a conditional check this run
+        self.pending: dict[str, tuple] = {}
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def lookup(self, url: str) -> tuple | None:
+        """Return (status_code, status_message, is_broken, checked_at, etag, last_modified)"""
+        row = self.conn.execute(
+            "SELECT status_code, status_message, is_broken, checked_at, etag, last_modified "
+            "FROM results WHERE key = ?",
+            (cache_key(url),)
+        ).fetchone()
+        if not row:
+            return None
+        status_code, status_message, is_broken, checked_at, etag, last_modified = row
+        return status_code, status_message, bool(is_broken), checked_at, etag, last_modified
+
+    def is_fresh(self, entry: tuple, now: float) -> bool:
+        status_code, _, is_broken, checked_at, _, _ = entry
+        return now - checked_at < self.ttls[status_class(status_code, is_broken)]
+
+    def partition(self, urls_with_info: dict[str, dict]) -> tuple[list[dict], dict[str, dict], dict[str, dict]]:
+        """Split URLs into fresh cached results, URLs to check, and conditional headers
+
+        Returns (cached, to_check, conditional): cached holds result records
+        for fresh entries; conditional maps URLs in to_check whose expired
+        entry can be revalidated to the If-None-Match/If-Modified-Since
+        headers to send.
+        """
+        now = time.time()
+        cached = []
+        to_check = {}
+        conditional = {}
+
+        for url, info in urls_with_info.items():
+            entry = self.lookup(url)
+            if entry and self.is_fresh(entry, now):
+                cached.append(build_result(url, info, *entry[:3]))
+                self.hits += 1
+                continue
+
+            to_check[url] = info
+            if entry and not entry[2] and (entry[4] or entry[5]):
+                headers = {}
+                if entry[4]:
+                    headers['If-None-Match'] = entry[4]
+                if entry[5]:
+                    headers['If-Modified-Since'] = entry[5]
+                conditional[url] = headers
+                self.pending[url] = entry
+
+        return cached, to_check, conditional
+
+    def record(self, result: dict, validators: dict = None) -> dict:
+        """Store a fresh check, resolving 304 answers to conditional requests
+
+        When the server confirmed an entry has not changed, the result is
+        updated in place with the cached status.
+        """
+        url = result['url']
+        status = (result['status_code'], result['status_message'], result['is_broken'])
+        entry = self.pending.pop(url, None)
+        validators = validators or {}
+
+        if entry and status[0] == 304:
+            self.revalidated += 1
+            status = entry[:3]
+            etag = validators.get('etag') or entry[4]
+            last_modified = validators.get('last_modified') or entry[5]
+        else:
+            self.misses += 1
+            etag = validators.get('etag')
+            last_modified = validators.get('last_modified')
+
+        status_code, status_message, is_broken = status
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results "
+            "(key, status_code, status_message, is_broken, checked_at, etag, last_modified) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (cache_key(url), status_code, status_message, int(is_broken), time.time(), etag, last_modified)
+        )
+        if (self.revalidated + self.misses) % 1000 == 0:
+            self.conn.commit()
+
+        result.update(status_code=status_code, status_message=status_message, is_broken=is_broken)
+        return result
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def stats(self) -> dict:
+        """Cache hit statistics for the current run"""
+        total = self.hits + self.revalidated + self.misses
+        return {
+            "enabled": True,
+            "path": str(self.db_path),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.revalidated) / total, 4) if total else 0.0
+        }
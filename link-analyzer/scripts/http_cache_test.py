@@ -0,0 +1,217 @@
+import time
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from async_checker import AIOHTTP_AVAILABLE, AsyncHTTPLinkChecker
+from http_cache import DAY, HTTPResultCache, cache_key, status_class
+from http_common import build_result
+
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 01 Oct 2025 00:00:00 GMT'
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class ValidatorHandler(BaseHTTPRequestHandler):
+    """Answers conditional requests with 304 when the validator still matches"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        path = urlparse(self.path).path
+        self.server.requests.append((path, self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')))
+
+        if path == '/etag':
+            headers = {'ETag': ETAG}
+            not_modified = self.headers.get('If-None-Match') == ETAG
+        elif path == '/last-modified':
+            headers = {'Last-Modified': LAST_MODIFIED}
+            not_modified = self.headers.get('If-Modified-Since') == LAST_MODIFIED
+        elif path == '/changed':
+            headers = {'ETag': '"v2"'}
+            not_modified = False
+        else:
+            headers = {}
+            not_modified = False
+
+        self.send_response(304 if not_modified else self.server.status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HTTPResultCache(Path(self.tmp.name) / "http_cache.sqlite")
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def age(self, url: str, days: float) -> None:
+        """Pretend the cached entry for url was checked days ago"""
+        self.cache.conn.execute(
+            "UPDATE results SET checked_at = ? WHERE key = ?",
+            (time.time() - days * DAY, cache_key(url))
+        )
+
+
+class TestHTTPResultCache(CacheTestCase):
+
+    def test_status_class(self):
+        self.assertEqual(status_class(200, False), 'ok')
+        self.assertEqual(status_class(404, True), 'client_error')
+        self.assertEqual(status_class(503, True), 'server_error')
+        self.assertEqual(status_class(None, True), 'error')
+
+    def test_ttl_per_status_class(self):
+        """OK results stay fresh for a week, client errors a day, the rest six hours"""
+        statuses = {
+            'https://example.com/ok': (200, 'OK', False),
+            'https://example.com/missing': (404, 'Not Found', True),
+            'https://example.com/down': (503, 'Service Unavailable', True),
+            'https://example.com/timeout': (None, 'Timeout', True),
+        }
+        for url, status in statuses.items():
+            self.cache.record(build_result(url, {}, *status))
+
+        fresh_after = {
+            0.2: set(statuses),
+            0.5: {'https://example.com/ok', 'https://example.com/missing'},
+            2: {'https://example.com/ok'},
+            8: set(),
+        }
+        for days, fresh in fresh_after.items():
+            with self.subTest(days=days):
+                for url in statuses:
+                    self.age(url, days)
+                cached, to_check, _ = self.cache.partition({url: {} for url in statuses})
+                self.assertEqual({result['url'] for result in cached}, fresh)
+                self.assertEqual(set(to_check), set(statuses) - fresh)
+
+    def test_configured_ttl(self):
+        self.cache.ttls['ok'] = 0.5 * DAY
+        self.cache.record(build_result('https://example.com/', {}, 200, 'OK', False))
+        self.age('https://example.com/', 1)
+        cached, _, _ = self.cache.partition({'https://example.com/': {}})
+        self.assertEqual(cached, [])
+
+    def test_lookup_uses_canonical_key(self):
+        self.cache.record(build_result('HTTPS://Example.com:443/page#top', {}, 200, 'OK', False))
+        cached, _, _ = self.cache.partition({'https://example.com/page': {'count': 3, 'pages': ['/a/']}})
+        self.assertEqual(cached, [build_result('https://example.com/page', {'count': 3, 'pages': ['/a/']}, 200, 'OK', False)])
+
+    def test_conditional_headers(self):
+        """Expired OK entries with validators are revalidated; broken ones are re-checked"""
+        self.cache.record(build_result('https://example.com/etag', {}, 200, 'OK', False), {'etag': ETAG})
+        self.cache.record(build_result('https://example.com/both', {}, 200, 'OK', False),
+                          {'etag': ETAG, 'last_modified': LAST_MODIFIED})
+        self.cache.record(build_result('https://example.com/plain', {}, 200, 'OK', False))
+        self.cache.record(build_result('https://example.com/broken', {}, 404, 'Not Found', True), {'etag': ETAG})
+        urls = ['https://example.com/etag', 'https://example.com/both', 'https://example.com/plain',
+                'https://example.com/broken']
+        for url in urls:
+            self.age(url, 30)
+
+        _, to_check, conditional = self.cache.partition({url: {} for url in urls})
+        self.assertEqual(list(to_check), urls)
+        self.assertEqual(conditional, {
+            'https://example.com/etag': {'If-None-Match': ETAG},
+            'https://example.com/both': {'If-None-Match': ETAG, 'If-Modified-Since': LAST_MODIFIED},
+        })
+
+    def test_not_modified_keeps_cached_status(self):
+        url = 'https://example.com/etag'
+        self.cache.record(build_result(url, {}, 200, 'OK', False), {'etag': ETAG})
+        self.age(url, 30)
+        self.cache.partition({url: {}})
+
+        result = self.cache.record(build_result(url, {}, 304, 'Not Modified', False), {})
+        self.assertEqual((result['status_code'], result['status_message'], result['is_broken']), (200, 'OK', False))
+        self.assertEqual((self.cache.revalidated, self.cache.misses), (1, 1))
+
+        # The entry is fresh again and keeps its validator
+        cached, _, _ = self.cache.partition({url: {}})
+        self.assertEqual(len(cached), 1)
+        self.assertEqual(self.cache.lookup(url)[4], ETAG)
+
+    def test_unsolicited_not_modified_is_stored_as_is(self):
+        """A 304 for a URL that was not revalidated is a plain result"""
+        result = self.cache.record(build_result('https://example.com/', {}, 304, 'Not Modified', False))
+        self.assertEqual(result['status_code'], 304)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_version_change_clears_entries(self):
+        self.cache.record(build_result('https://example.com/', {}, 200, 'OK', False))
+        self.cache.conn.execute("UPDATE meta SET value = 'old' WHERE key = 'version'")
+        self.cache.close()
+        self.cache = HTTPResultCache(self.cache.db_path)
+        self.assertIsNone(self.cache.lookup('https://example.com/'))
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+class TestRevalidation(CacheTestCase):
+    """Conditional requests against a stand-in server"""
+
+    def setUp(self):
+        super().setUp()
+        self.server = StandInServer(('127.0.0.1', 0), ValidatorHandler)
+        self.server.requests = []
+        self.server.status = 200
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def check(self, paths: list[str]) -> dict[str, dict]:
+        checker = AsyncHTTPLinkChecker(timeout=0.5, cache=self.cache)
+        results = checker.check_urls({f"{self.base}{path}": {} for path in paths})
+        return {result['url'][len(self.base):]: result for result in results}
+
+    def test_revalidates_expired_entries(self):
+        paths = ['/etag', '/last-modified', '/changed', '/plain']
+        self.check(paths)
+        self.assertEqual(self.cache.misses, 4)
+        self.assertEqual(self.cache.lookup(f"{self.base}/etag")[4], ETAG)
+        self.assertEqual(self.cache.lookup(f"{self.base}/last-modified")[5], LAST_MODIFIED)
+
+        # Fresh: nothing is requested
+        self.server.requests.clear()
+        self.check(paths)
+        self.assertEqual((self.server.requests, self.cache.hits), ([], 4))
+
+        # Expired: validators are sent back and unchanged pages answer 304
+        for path in paths:
+            self.age(f"{self.base}{path}", 30)
+        self.server.status = 404
+        results = self.check(paths)
+        self.assertEqual(sorted(self.server.requests), [
+            ('/changed', '"v2"', None),
+            ('/etag', ETAG, None),
+            ('/last-modified', None, LAST_MODIFIED),
+            ('/plain', None, None),
+        ])
+        self.assertEqual({path: result['status_code'] for path, result in results.items()}, {
+            '/etag': 200, '/last-modified': 200, '/changed': 404, '/plain': 404
+        })
+        self.assertEqual(self.cache.revalidated, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import sys
 import json
 import time
 import argparse
+import threading
 from pathlib import Path
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -18,7 +19,17 @@ import requests
 # Add shared modules to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
 from config_loader import load_json_config
-from utils import save_json, load_json, timestamp
+from utils import load_json, timestamp
+from http_common import DEFAULT_USER_AGENT, HEAD_FALLBACK_STATUS_CODES, build_result, host_of, print_progress
+from http_cache import HTTP_CACHE_FILENAME, HTTPResultCache, validators_from
+from domain_scheduler import DomainScheduler, interleave_by_domain
+from domain_probe import DomainProbe
+from check_journal import JOURNAL_FILENAME, JOURNAL_SUFFIX, CheckJournal, save_report
+from url_canonical import DEFAULT_TRACKING_PARAMS, group_by_canonical, fan_out
+from async_checker import AIOHTTP_AVAILABLE, AsyncHTTPLinkChecker
+
+
+ENGINES = ['async', 'threads']
 
 
 class HTTPLinkChecker:
@@ -29,22 +40,48 @@ class HTTPLinkChecker:
         timeout: int = 5,
         max_workers: int = 20,
         retry_count: int = 1,
-        user_agent: str = "Mozilla/5.0 (compatible; LinkChecker/1.0)"
+        user_agent: str = DEFAULT_USER_AGENT,
+        cache: HTTPResultCache = None,
+        scheduler: DomainScheduler = None,
+        throttle_retries: int = 2,
+        probe: DomainProbe = None,
+        journal: CheckJournal = None
     ):
         self.timeout = timeout
         self.max_workers = max_workers
         self.retry_count = retry_count
         self.user_agent = user_agent
+        self.cache = cache
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+        self.probe = probe
+        self.journal = journal
+        # Results stay in memory only when there is no journal to append them to
         self.results: list[dict] = []
+        # Conditional request headers per URL, and final response headers seen
+        self.conditional: dict[str, dict] = {}
+        self.response_headers: dict[str, dict] = {}
+        # Per-thread sessions resolving through the probe
+        self.local = threading.local()
+        self.sessions: list[requests.Session] = []
+
+    def http(self):
+        """requests itself, or this thread's session resolving through the probe"""
+        if not self.probe:
+            return requests
+        if not hasattr(self.local, 'session'):
+            self.local.session = self.probe.session()
+            self.sessions.append(self.local.session)
+        return self.local.session
 
     def check_url(self, url: str) -> tuple[int | None, str, bool]:
         """Check if URL is accessible"""
-        headers = {'User-Agent': self.user_agent}
+        headers = {'User-Agent': self.user_agent, **self.conditional.get(url, {})}
 
         for attempt in range(self.retry_count):
             try:
                 # Try HEAD first (faster)
-                response = requests.head(
+                response = self.http().head(
                     url,
                     timeout=self.timeout,
                     headers=headers,
@@ -52,8 +89,8 @@ class HTTPLinkChecker:
                 )
 
                 # Some sites block HEAD, fallback to GET
-                if response.status_code in [405, 403]:
-                    response = requests.get(
+                if response.status_code in HEAD_FALLBACK_STATUS_CODES:
+                    response = self.http().get(
                         url,
                         timeout=self.timeout,
                         headers=headers,
@@ -64,13 +101,14 @@ class HTTPLinkChecker:
                     next(response.iter_content(1024), None)
                     response.close()
 
+                self.response_headers[url] = response.headers
                 is_broken = response.status_code >= 400
                 return response.status_code, response.reason, is_broken
 
             except requests.exceptions.Timeout:
                 if attempt == self.retry_count - 1:
                     return None, "Timeout", True
-                time.sleep(1)
+                time.sleep(self.retry_delay(url))
 
             except requests.exceptions.ConnectionError:
                 return None, "Connection Error (Domain may not exist)", True
@@ -86,21 +124,60 @@ class HTTPLinkChecker:
 
         return None, "Unknown Error", True
 
+    def retry_delay(self, url: str) -> float:
+        """Seconds to wait before retrying a timed-out request; also slows its domain down"""
+        if self.scheduler:
+            self.scheduler.penalize(host_of(url))
+        return 1
+
+    def check_scheduled(self, url: str) -> tuple[int | None, str, bool]:
+        """Check a URL within its domain's rate limit, retrying throttled requests"""
+        if not self.scheduler:
+            return self.check_url(url)
+
+        domain = host_of(url)
+        for attempt in range(self.throttle_retries + 1):
+            self.response_headers.pop(url, None)
+            while (delay := self.scheduler.acquire(domain)) > 0:
+                time.sleep(delay)
+            started = time.monotonic()
+            status = self.check_url(url)
+            retry_after = self.response_headers.get(url, {}).get('Retry-After')
+            throttled = self.scheduler.record(domain, status[0], time.monotonic() - started, retry_after)
+            if not throttled:
+                break
+        return status
+
+    def store(self, result: dict) -> None:
+        """Keep a finished result (appended to the journal as soon as it completes)"""
+        if self.journal:
+            self.journal.append(result)
+        else:
+            self.results.append(result)
+
     def check_urls(self, urls_with_info: dict[str, dict]) -> list[dict]:
         """Check multiple URLs in parallel"""
+        if self.cache:
+            cached, urls_with_info, self.conditional = self.cache.partition(urls_with_info)
+            for result in cached:
+                self.store(result)
+            print(f"{len(cached)} URLs fresh in cache, {len(self.conditional)} to revalidate")
+
+        if self.probe:
+            failed, urls_with_info = self.probe.short_circuit(urls_with_info)
+            for result in failed:
+                if self.cache:
+                    self.cache.record(result)
+                self.store(result)
+
         total = len(urls_with_info)
         completed = 0
 
+        if self.scheduler:
+            urls_with_info = interleave_by_domain(urls_with_info)
+
         def check_single(url: str, info: dict) -> dict:
-            status_code, status_msg, is_broken = self.check_url(url)
-            return {
-                'url': url,
-                'status_code': status_code,
-                'status_message': status_msg,
-                'is_broken': is_broken,
-                'occurrences': info.get('count', 1),
-                'sample_pages': info.get('pages', [])[:5]
-            }
+            return build_result(url, info, *self.check_scheduled(url))
 
         print(f"Checking {total} URLs in parallel (max {self.max_workers} workers)...")
 
@@ -113,12 +190,14 @@ class HTTPLinkChecker:
             for future in as_completed(future_to_url):
                 completed += 1
                 result = future.result()
-                self.results.append(result)
-
-                status = "OK" if not result['is_broken'] else "BROKEN"
-                url_display = result['url'][:60] + "..." if len(result['url']) > 60 else result['url']
-                print(f"[{completed}/{total}] [{status}] {url_display}")
-
+                headers = self.response_headers.pop(result['url'], {})
+                if self.cache:
+                    self.cache.record(result, validators_from(headers))
+                self.store(result)
+                print_progress(completed, total, result)
+
+        for session in self.sessions:
+            session.close()
         return self.results
 
 
@@ -173,8 +252,24 @@ def main():
     parser.add_argument("--config", help="Path to config.json")
     parser.add_argument("--output", "-o", help="Output file path")
     parser.add_argument("--timeout", type=int, default=5, help="Request timeout")
-    parser.add_argument("--workers", type=int, default=20, help="Max parallel workers")
+    parser.add_argument("--workers", type=int, default=20, help="Max parallel workers (threads engine)")
+    parser.add_argument("--engine", choices=ENGINES,
+                        help="HTTP engine (default: async when aiohttp is installed, else threads)")
+    parser.add_argument("--concurrency", type=int, help="Max concurrent checks (async engine, default: 100)")
+    parser.add_argument("--max-per-host", type=int, help="Max concurrent checks per host (async engine, default: 8)")
+    parser.add_argument("--rate", type=float,
+                        help="Requests per second per domain (default: 5, 0 disables rate limiting)")
+    parser.add_argument("--no-dns-prepass", action="store_true",
+                        help="Skip DNS pre-resolution and dead-domain short-circuiting")
+    parser.add_argument("--no-canonicalize", action="store_true",
+                        help="Check every raw URL instead of once per canonical URL")
+    parser.add_argument("--collapse-trailing-slash", action="store_true",
+                        help="Treat /path and /path/ as the same URL")
+    parser.add_argument("--journal", help=f"Checkpoint journal path (default: next to --output, or {JOURNAL_FILENAME} next to --input)")
+    parser.add_argument("--resume", action="store_true", help="Skip URLs already in the journal of an interrupted run")
     parser.add_argument("--filter", action="store_true", help="Filter false positives")
+    parser.add_argument("--cache", help=f"Result cache path (default: {HTTP_CACHE_FILENAME} next to --input)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every URL instead of using the result cache")
 
     args = parser.parse_args()
 
@@ -187,7 +282,11 @@ def main():
     timeout = args.timeout or http_config.get("timeout", 5)
     max_workers = args.workers or http_config.get("max_workers", 20)
     retry_count = http_config.get("retry_count", 1)
-    user_agent = http_config.get("user_agent", "Mozilla/5.0 (compatible; LinkChecker/1.0)")
+    user_agent = http_config.get("user_agent", DEFAULT_USER_AGENT)
+    engine = args.engine or http_config.get("engine", "async" if AIOHTTP_AVAILABLE else "threads")
+    max_concurrency = args.concurrency or http_config.get("max_concurrency", 100)
+    max_per_host = args.max_per_host or http_config.get("max_per_host", 8)
+    rate = args.rate if args.rate is not None else http_config.get("rate_per_domain", 5)
 
     # Load outbound links data
     input_path = Path(args.input)
@@ -206,18 +305,102 @@ def main():
             'pages': pages
         }
 
+    # Check each canonical URL once (host case, default ports, fragments,
+    # tracking parameters), then report the verdict for every original URL
+    canonical_config = config.get("canonicalization", {})
+    canonicalize = not args.no_canonicalize and canonical_config.get("enabled", True)
+    urls_to_check = urls_with_info
+    variants = {}
+    if canonicalize:
+        urls_to_check, variants = group_by_canonical(
+            urls_with_info,
+            tracking_params=canonical_config.get("tracking_params", DEFAULT_TRACKING_PARAMS),
+            collapse_trailing_slash=args.collapse_trailing_slash or canonical_config.get("collapse_trailing_slash", False)
+        )
+        print(f"{len(urls_with_info)} URLs canonicalize to {len(urls_to_check)} to check")
+
+    # Result cache (fresh results are reused, expired ones revalidated)
+    cache = None
+    if not args.no_cache:
+        cache_path = Path(args.cache) if args.cache else input_path.parent / HTTP_CACHE_FILENAME
+        cache = HTTPResultCache(cache_path, ttl_days=http_config.get("cache_ttl_days"))
+
+    # Per-domain rate limiting with adaptive backoff
+    scheduler = None
+    if rate:
+        scheduler = DomainScheduler(rate=rate, burst=http_config.get("burst", 10))
+
+    # Resolve every host once; URLs on dead domains fail fast
+    probe = None
+    if not args.no_dns_prepass and http_config.get("dns_prepass", True):
+        probe = DomainProbe(timeout=timeout)
+
+    # Checkpoint journal: every result is appended as it completes
+    if args.journal:
+        journal_path = Path(args.journal)
+    elif args.output:
+        journal_path = Path(args.output).with_suffix(JOURNAL_SUFFIX)
+    else:
+        journal_path = input_path.parent / JOURNAL_FILENAME
+    journal = CheckJournal(journal_path, resume=args.resume)
+    remaining = journal.pending(urls_to_check)
+    if args.resume:
+        print(f"Resuming from {journal_path}: {len(urls_to_check) - len(remaining)} URLs already checked")
+
     # Run checker
-    checker = HTTPLinkChecker(
-        timeout=timeout,
-        max_workers=max_workers,
-        retry_count=retry_count,
-        user_agent=user_agent
-    )
-    results = checker.check_urls(urls_with_info)
-
-    # Separate broken and working
-    broken = [r for r in results if r['is_broken']]
-    working = [r for r in results if not r['is_broken']]
+    if engine == "async":
+        checker = AsyncHTTPLinkChecker(
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            max_per_host=max_per_host,
+            retry_count=retry_count,
+            user_agent=user_agent,
+            cache=cache,
+            scheduler=scheduler,
+            probe=probe,
+            journal=journal
+        )
+    else:
+        checker = HTTPLinkChecker(
+            timeout=timeout,
+            max_workers=max_workers,
+            retry_count=retry_count,
+            user_agent=user_agent,
+            cache=cache,
+            scheduler=scheduler,
+            probe=probe,
+            journal=journal
+        )
+    try:
+        checker.check_urls(remaining)
+    finally:
+        journal.close()
+
+    # The report is assembled from the journal, never held in memory whole
+    def journal_results():
+        # A resumed journal may hold URLs that are no longer linked
+        results = (result for result in journal if result['url'] in urls_to_check)
+        if canonicalize:
+            return fan_out(results, variants, urls_with_info)
+        return results
+
+    domain_stats = scheduler.stats() if scheduler else []
+
+    cache_stats = {"enabled": False}
+    if cache:
+        cache.close()
+        cache_stats = cache.stats()
+
+    # Separate broken and working (only broken links are kept in memory)
+    total_checked = 0
+    working_count = 0
+    broken = []
+    for result in journal_results():
+        total_checked += 1
+        if result['is_broken']:
+            broken.append(result)
+        else:
+            working_count += 1
 
     # Filter false positives if requested
     if args.filter:
@@ -235,21 +418,34 @@ def main():
     output_data = {
         "metadata": {
             "checked_at": timestamp(),
-            "total_checked": len(results),
-            "working": len(working),
+            "total_checked": total_checked,
+            "working": working_count,
             "broken": len(broken),
             "real_broken": len(real_broken),
-            "false_positives": len(false_positives)
+            "false_positives": len(false_positives),
+            "http_cache": cache_stats,
+            "canonicalization": {
+                "enabled": bool(canonicalize),
+                "original_urls": len(urls_with_info),
+                "canonical_urls": len(urls_to_check)
+            },
+            "dns_prepass": probe.stats() if probe else {"enabled": False},
+            "rate_limit": {
+                "enabled": scheduler is not None,
+                "rate_per_domain": rate,
+                "throttled": sum(row["throttled"] for row in domain_stats)
+            }
         },
         "broken_links": sorted(real_broken, key=lambda x: x['occurrences'], reverse=True),
         "false_positives": false_positives,
-        "working_links": working
+        "working_links": (result for result in journal_results() if not result['is_broken']),
+        "domain_stats": domain_stats
     }
 
     # Output
     if args.output:
         output_path = Path(args.output)
-        save_json(output_data, output_path)
+        save_report(output_data, output_path)
         print(f"\nResults saved to: {output_path}")
     else:
         # Just print summary, not full JSON
@@ -263,6 +459,14 @@ def main():
     print(f"Total checked: {meta['total_checked']}")
     print(f"Working: {meta['working']}")
     print(f"Broken: {meta['broken']}")
+    if cache:
+        print(f"Cache: {cache_stats['hits']} fresh, {cache_stats['revalidated']} revalidated, "
+              f"{cache_stats['misses']} checked ({cache_stats['hit_rate']:.0%} hit rate)")
+    if probe:
+        print(f"Dead domains: {len(meta['dns_prepass']['dead_domains'])} "
+              f"({meta['dns_prepass']['short_circuited']} URLs failed fast)")
+    if scheduler:
+        print(f"Throttled responses (429/503): {meta['rate_limit']['throttled']}")
     if args.filter:
         print(f"Real broken: {meta['real_broken']}")
         print(f"False positives filtered: {meta['false_positives']}")
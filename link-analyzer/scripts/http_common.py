@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+HTTP Check Common
+Result schema and progress output shared by the HTTP checking engines
+"""
+
+from urllib.parse import urlparse
+
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; LinkChecker/1.0)"
+
+# Status codes that make us retry a HEAD request as GET (some sites block HEAD)
+HEAD_FALLBACK_STATUS_CODES = [405, 403]
+
+
+def build_result(url: str, info: dict, status_code: int | None, status_message: str, is_broken: bool) -> dict:
+    """Build the result record for one checked URL"""
+    return {
+        'url': url,
+        'status_code': status_code,
+        'status_message': status_message,
+        'is_broken': is_broken,
+        'occurrences': info.get('count', 1),
+        'sample_pages': info.get('pages', [])[:5]
+    }
+
+
+def print_progress(completed: int, total: int, result: dict) -> None:
+    """Print one progress line for a finished check"""
+    status = "OK" if not result['is_broken'] else "BROKEN"
+    url_display = result['url'][:60] + "..." if len(result['url']) > 60 else result['url']
+    print(f"[{completed}/{total}] [{status}] {url_display}")
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def host_of(url: str) -> str:
+    """Lowercased host name of a URL ('' when it has none)"""
+    try:
+        return urlparse(url).hostname or ''
+    except ValueError:
+        return ''
+
+
+def origin_of(url: str) -> str:
+    """host:port a URL connects to, the unit connections are pooled by"""
+    try:
+        parsed = urlparse(url)
+        return f"{parsed.hostname or ''}:{parsed.port or DEFAULT_PORTS.get(parsed.scheme, '')}"
+    except ValueError:
+        return ''
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Instrumentation
+Lightweight per-phase measurements for run_full_analysis: wall time, CPU
+time (including worker processes), peak RSS growth, files processed and
+links/sec per phase, plus named sub-steps recorded from anywhere in the
+pipeline. Each phase can optionally be profiled with cProfile.
+"""
+
+import io
+import sys
+import time
+import pstats
+import cProfile
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+# Phases being measured, innermost last (sub-steps record into the innermost)
+active_phases: list["Phase"] = []
+
+# Directory (inside the output directory) that --profile writes to
+PROFILE_DIRNAME = "profiles"
+
+# Functions listed per phase in the text profile
+PROFILE_TOP_FUNCTIONS = 30
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    if not RESOURCE_AVAILABLE:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def cpu_seconds() -> float:
+    """CPU time of this process plus its finished child processes"""
+    if not RESOURCE_AVAILABLE:
+        return time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+class Phase:
+    """Measurements for one phase"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # Set by the caller once known
+        self.files: int | None = None
+        self.links: int | None = None
+        self.steps: dict[str, dict] = {}
+        self.metrics: dict = {}
+
+    def as_dict(self) -> dict:
+        wall = self.metrics.get("wall_s", 0)
+        return {
+            **self.metrics,
+            "files": self.files,
+            "links": self.links,
+            "files_per_sec": round(self.files / wall, 1) if self.files and wall else None,
+            "links_per_sec": round(self.links / wall, 1) if self.links and wall else None,
+            "steps": self.steps
+        }
+
+
+@contextmanager
+def step(name: str):
+    """Time a sub-step of the current phase (a no-op outside run_full_analysis)"""
+    if not active_phases:
+        yield
+        return
+
+    phase = active_phases[-1]
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        yield
+    finally:
+        entry = phase.steps.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+        entry["wall_s"] = round(entry["wall_s"] + time.perf_counter() - started, 4)
+        entry["cpu_s"] = round(entry["cpu_s"] + time.process_time() - cpu_started, 4)
+
+
+def record_step(name: str, seconds: float) -> None:
+    """Add time measured elsewhere (e.g. summed over worker processes) to a sub-step"""
+    if active_phases:
+        entry = active_phases[-1].steps.setdefault(name, {"summed_s": 0.0})
+        entry["summed_s"] = round(entry["summed_s"] + seconds, 4)
+
+
+class Instrumentation:
+    """Collects phase measurements, optionally with a cProfile dump per phase"""
+
+    def __init__(self, profile_dir: Path = None):
+        self.profile_dir = profile_dir
+        self.phases: dict[str, Phase] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        phase = Phase(name)
+        self.phases[name] = phase
+        profiler = cProfile.Profile() if self.profile_dir else None
+
+        rss_started = peak_rss_mb()
+        cpu_started = cpu_seconds()
+        started = time.perf_counter()
+        active_phases.append(phase)
+        if profiler:
+            profiler.enable()
+        try:
+            yield phase
+        finally:
+            if profiler:
+                profiler.disable()
+            active_phases.pop()
+            phase.metrics = {
+                "wall_s": round(time.perf_counter() - started, 4),
+                "cpu_s": round(cpu_seconds() - cpu_started, 4),
+                "peak_rss_delta_mb": round(peak_rss_mb() - rss_started, 1)
+            }
+            if profiler:
+                self.save_profile(name, profiler)
+
+    def save_profile(self, name: str, profiler: cProfile.Profile) -> None:
+        """Write <phase>.prof (for pstats/snakeviz) and a <phase>.txt top-functions summary"""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(self.profile_dir / f"{name}.prof"))
+
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text)
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        with open(self.profile_dir / f"{name}.txt", 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+
+    def as_dict(self) -> dict:
+        return {name: phase.as_dict() for name, phase in self.phases.items()}
@@ -4,20 +4,72 @@ Internal Links Checker
 Validates all internal links in static site point to existing pages
 """
 
+import os
 import sys
-import re
 import json
 import argparse
 import urllib.parse
 from pathlib import Path
 from collections import defaultdict
 
-from bs4 import BeautifulSoup
-
 # Add shared modules to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
 from config_loader import load_json_config
 from utils import save_json, timestamp
+from extractor import DEFAULT_EXTRACTOR, EXTRACTORS, HREF_PATTERN, PageRecord, extract_site
+from extract_cache import ExtractionCache
+from instrumentation import step
+from trigram_index import TrigramIndex
+
+
+def page_url(path: str) -> str:
+    """Root-relative URL a page is linked by ('blog/index.html' -> '/blog/')"""
+    if path == 'index.html':
+        return '/'
+    if path.endswith('/index.html'):
+        return '/' + path[:-len('index.html')]
+    return '/' + path
+
+
+def scan_tree(dist_path: Path) -> tuple[dict[str, tuple[int, int]], set[str]]:
+    """Stat everything under dist_path in one walk
+
+    Returns (files, directories): relative POSIX path -> (mtime_ns, size) for
+    every file, and the relative path of every directory. Symlinked
+    directories are listed but not descended into (links into them are
+    confirmed on disk).
+    """
+    files = {}
+    directories = set()
+    pending = [(dist_path, '')]
+
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                relative = prefix + entry.name
+                try:
+                    if entry.is_dir():
+                        directories.add(relative)
+                        if not entry.is_symlink():
+                            pending.append((entry.path, relative + '/'))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[relative] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+
+    return files, directories
+
+
+def tree_index(files: dict[str, tuple[int, int]], directories: set[str]) -> set[str]:
+    """InternalLinksChecker.file_index of a scan_tree() result ('.' is dist_path itself)"""
+    return {'.'} | directories | files.keys()
 
 
 class InternalLinksChecker:
@@ -27,9 +79,16 @@ class InternalLinksChecker:
         self,
         dist_path: Path,
         excluded_paths: list[str] = None,
-        excluded_extensions: list[str] = None
+        excluded_extensions: list[str] = None,
+        workers: int = None,
+        cache: ExtractionCache = None,
+        extractor: str = DEFAULT_EXTRACTOR,
+        file_index: set[str] = None
     ):
         self.dist_path = dist_path
+        self.workers = workers
+        self.cache = cache
+        self.extractor = extractor
         self.excluded_paths = excluded_paths or []
         self.excluded_extensions = excluded_extensions or [
             '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg',
@@ -37,12 +96,19 @@ class InternalLinksChecker:
         ]
         self.broken_links: list[dict] = []
         self.valid_links: int = 0
+        # Relative POSIX paths of every file and directory under dist_path
+        # (given up front for a crawled site, which has nothing on disk to fall back to)
+        self.file_index: set[str] | None = file_index
+        self.on_disk = file_index is None
+        # Memoized check_link_exists verdicts per unique link
+        self.verdicts: dict[str, tuple[bool, str | None]] = {}
 
     def extract_internal_links(self, content: str) -> list[str]:
         """Extract all internal links from HTML content"""
-        pattern = r'href=["\']([^"\']*)["\']'
-        links = re.findall(pattern, content, re.IGNORECASE)
+        return self.filter_internal_links(HREF_PATTERN.findall(content))
 
+    def filter_internal_links(self, links: list[str]) -> list[str]:
+        """Select and clean the internal links from raw href values"""
         internal_links = []
         for link in links:
             # Only internal links (starting with /)
@@ -78,8 +144,32 @@ class InternalLinksChecker:
 
         return False
 
+    def build_file_index(self) -> None:
+        """Walk dist_path once, recording every file and directory that exists"""
+        with step('index'):
+            self.file_index = tree_index(*scan_tree(self.dist_path))
+        print(f"Indexed {len(self.file_index)} files and directories.")
+
+    def is_indexed(self, path: Path) -> bool:
+        """Check a candidate path against the file index"""
+        try:
+            relative = path.relative_to(self.dist_path)
+        except ValueError:
+            return False
+
+        if '..' in relative.parts:
+            return False
+
+        return relative.as_posix() in self.file_index
+
     def check_link_exists(self, link: str) -> tuple[bool, str | None]:
         """Check if a link target exists"""
+        if link in self.verdicts:
+            return self.verdicts[link]
+
+        if self.file_index is None:
+            self.build_file_index()
+
         relative_path = link.lstrip('/')
 
         # Try different path variations
@@ -90,27 +180,52 @@ class InternalLinksChecker:
             self.dist_path / relative_path.rstrip('/') / 'index.html',
         ]
 
+        verdict = (False, None)
         for path in possible_paths:
-            if path.exists():
-                return True, str(path)
-
-        return False, None
-
-    def analyze(self) -> dict:
-        """Analyze all HTML files for broken internal links"""
-        html_files = list(self.dist_path.glob('**/*.html'))
-        print(f"Found {len(html_files)} HTML files to check...")
+            if self.is_indexed(path):
+                verdict = (True, str(path))
+                break
+        else:
+            # Not in the index: confirm on disk (symlinks, '..' segments,
+            # case-insensitive filesystems)
+            if self.on_disk:
+                for path in possible_paths:
+                    if path.exists():
+                        verdict = (True, str(path))
+                        break
+
+        self.verdicts[link] = verdict
+        return verdict
+
+    def suggest_fixes(self, pages: list[PageRecord]) -> int:
+        """Attach the closest existing pages to each broken link; returns how many got any"""
+        with step('suggest'):
+            index = TrigramIndex([page_url(page.path) for page in pages])
+            suggestions: dict[str, list[dict]] = {}
+            for entry in self.broken_links:
+                link = entry['broken_link']
+                if link not in suggestions:
+                    suggestions[link] = index.closest(link)
+                entry['suggestions'] = suggestions[link]
+
+        return sum(bool(entry['suggestions']) for entry in self.broken_links)
+
+    def analyze(self, pages: list[PageRecord] = None) -> dict:
+        """Analyze all HTML files (or pre-extracted page records) for broken internal links"""
+        if pages is None:
+            pages = extract_site(self.dist_path, self.workers, self.cache, self.extractor)
+        print(f"Found {len(pages)} HTML files to check...")
 
         total_links_checked = 0
         broken_by_source: dict[str, list[str]] = defaultdict(list)
 
-        for i, file_path in enumerate(html_files, 1):
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+        for page in pages:
+            if page.error:
+                continue
 
-                relative_file = str(file_path.relative_to(self.dist_path))
-                internal_links = self.extract_internal_links(content)
+            try:
+                relative_file = page.path
+                internal_links = self.filter_internal_links(page.hrefs)
 
                 for link in internal_links:
                     if self.is_excluded(link):
@@ -129,20 +244,20 @@ class InternalLinksChecker:
                         self.valid_links += 1
 
             except Exception as e:
-                print(f"Error processing {file_path}: {e}", file=sys.stderr)
-
-            if i % 100 == 0:
-                print(f"Checked {i}/{len(html_files)} files...")
+                print(f"Error processing {page.path}: {e}", file=sys.stderr)
 
         print(f"Analysis complete. Checked {total_links_checked} internal links.")
 
+        with_suggestions = self.suggest_fixes(pages) if self.broken_links else 0
+
         return {
             "metadata": {
                 "analyzed_at": timestamp(),
-                "files_analyzed": len(html_files),
+                "files_analyzed": len(pages),
                 "total_links_checked": total_links_checked,
                 "valid_links": self.valid_links,
-                "broken_links": len(self.broken_links)
+                "broken_links": len(self.broken_links),
+                "with_suggestions": with_suggestions
             },
             "broken_links": self.broken_links,
             "broken_by_source": dict(broken_by_source)
@@ -155,6 +270,9 @@ def main():
     parser.add_argument("--config", help="Path to config.json")
     parser.add_argument("--output", "-o", help="Output file path")
     parser.add_argument("--exclude", nargs="+", help="Paths to exclude")
+    parser.add_argument("--workers", "-w", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--extractor", choices=list(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help="Link extraction backend")
 
     args = parser.parse_args()
 
@@ -176,7 +294,9 @@ def main():
     checker = InternalLinksChecker(
         dist_path,
         excluded_paths=excluded_paths,
-        excluded_extensions=excluded_extensions
+        excluded_extensions=excluded_extensions,
+        workers=args.workers,
+        extractor=args.extractor
     )
     results = checker.analyze()
 
@@ -202,6 +322,8 @@ def main():
         print(f"\nBROKEN LINKS:")
         print("-" * 60)
 
+        suggestions = {entry['broken_link']: entry['suggestions'] for entry in results["broken_links"]}
+
         # Group by source and show first 20
         shown = 0
         for source, links in results["broken_by_source"].items():
@@ -213,6 +335,8 @@ def main():
             print(f"\n{source}:")
             for link in links[:5]:
                 print(f"  - {link}")
+                if suggestions.get(link):
+                    print(f"    did you mean {', '.join(s['url'] for s in suggestions[link])}?")
             if len(links) > 5:
                 print(f"  ... and {len(links) - 5} more")
             shown += 1
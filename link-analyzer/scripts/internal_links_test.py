@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from internal_links import InternalLinksChecker
+
+
+def baseline_exists(dist_path: Path, link: str) -> tuple[bool, str | None]:
+    """The original rules: the first candidate path that exists on disk"""
+    relative_path = link.lstrip('/')
+    possible_paths = [
+        dist_path / relative_path,
+        dist_path / relative_path / 'index.html',
+        dist_path / (relative_path + '.html'),
+        dist_path / relative_path.rstrip('/') / 'index.html',
+    ]
+    for path in possible_paths:
+        if path.exists():
+            return True, str(path)
+    return False, None
+
+
+FILES = [
+    'index.html',
+    'about/index.html',
+    'blog.html',
+    'blog/2024/post.html',
+    'docs/guide.html',
+    'docs/guide/index.html',
+    'assets/app.css',
+    'real/page/index.html',
+    'real/notes.html',
+    'name with spaces/index.html',
+]
+
+LINKS = [
+    # Trailing slash and index.html
+    '/about/', '/about', '/about/index.html', '/about/index', '/about//',
+    # .html appended
+    '/blog', '/blog/', '/blog.html', '/blog/2024/post', '/blog/2024/post/', '/blog/2024/post.html',
+    # A page and a directory of the same name
+    '/docs/guide', '/docs/guide/', '/docs/guide.html',
+    # Directories without an index.html
+    '/docs', '/docs/', '/blog/2024', '/blog/2024/', '/empty/', '/empty',
+    # Plain files
+    '/assets/app.css', '/assets/', '/assets/app', '/index.html', '/index',
+    # Through a symlinked directory
+    '/linked/', '/linked', '/linked/page/', '/linked/page', '/linked/notes', '/linked/missing/',
+    # '..' and '.' segments, including above the root
+    '/about/../blog', '/docs/../about/', '/blog/2024/../../about', '/../about/', '/./about/',
+    '/about/./', '/about/..', '/missing/../blog', '/real/page/../notes',
+    # Missing pages
+    '/missing/', '/missing', '/about/team/', '/blog.html/', '/ABOUT/',
+    '/name with spaces/', '/name with spaces',
+]
+
+
+class TestCheckLinkExists(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dist = Path(self.tmp.name) / "dist"
+        for relative in FILES:
+            path = self.dist / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("<html></html>", encoding='utf-8')
+        (self.dist / "empty").mkdir()
+        os.symlink(self.dist / "real", self.dist / "linked", target_is_directory=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_path_exists(self):
+        """The file index gives the verdict (and matched path) of the original Path.exists() rules"""
+        checker = InternalLinksChecker(self.dist)
+        for link in LINKS:
+            with self.subTest(link=link):
+                self.assertEqual(checker.check_link_exists(link), baseline_exists(self.dist, link))
+
+    def test_index_only(self):
+        """A given index (as for a crawled site) matches too, bar '..' and symlinked paths, which need the disk"""
+        reference = InternalLinksChecker(self.dist)
+        reference.build_file_index()
+        checker = InternalLinksChecker(self.dist, file_index=reference.file_index)
+        for link in LINKS:
+            if '..' in link or link.startswith('/linked/'):
+                continue
+            with self.subTest(link=link):
+                self.assertEqual(checker.check_link_exists(link), baseline_exists(self.dist, link))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,23 +6,34 @@ Builds internal link graph and calculates link metrics:
 - Under-linked pages (below threshold)
 - Over-linked pages (above threshold)
 - Link sinks (receive but don't pass)
+- Internal PageRank (link equity)
+- Click depth and reachability from the homepage
+- Suggested link sources for orphan and under-linked pages (content similarity)
+- Near-duplicate page clusters (MinHash LSH)
 """
 
 import sys
-import re
 import json
 import argparse
+import heapq
 import urllib.parse
+from array import array
 from pathlib import Path
-from collections import defaultdict
-from dataclasses import dataclass, asdict
+from typing import Iterator
+from dataclasses import dataclass
 
-from bs4 import BeautifulSoup
+import numpy as np
 
 # Add shared modules to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
 from config_loader import load_json_config
-from utils import save_json, timestamp
+from utils import timestamp
+from extractor import DEFAULT_EXTRACTOR, EXTRACTORS, LinkRecord, PageRecord, extract_site, parse_links
+from extract_cache import ExtractionCache
+from graph_output import GRAPH_FORMATS, load_summary, save_analysis
+from instrumentation import step
+from link_recommender import TfidfMatrix
+from near_duplicates import DEFAULT_THRESHOLD as DEFAULT_DUPLICATE_THRESHOLD, MinHashIndex
 
 
 @dataclass
@@ -34,6 +45,10 @@ class PageMetrics:
     ratio: float
     inbound_from: list[str]
     outbound_to: list[str]
+    pagerank: float
+    depth: int | None
+    # Read from a file or crawled, not only linked to
+    crawled: bool
 
 
 class LinkGraphAnalyzer:
@@ -43,21 +58,50 @@ class LinkGraphAnalyzer:
         self,
         dist_path: Path,
         excluded_paths: list[str] = None,
-        excluded_extensions: list[str] = None
+        excluded_extensions: list[str] = None,
+        workers: int = None,
+        cache: ExtractionCache = None,
+        extractor: str = DEFAULT_EXTRACTOR
     ):
         self.dist_path = dist_path
+        self.workers = workers
+        self.cache = cache
+        self.extractor = extractor
         self.excluded_paths = excluded_paths or []
         self.excluded_extensions = excluded_extensions or [
             '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg',
             '.ico', '.pdf', '.xml', '.txt', '.woff', '.woff2', '.json'
         ]
 
-        # Link graph: source -> list of targets
-        self.link_graph: dict[str, list[str]] = defaultdict(list)
-        # All pages found
-        self.all_pages: set[str] = set()
-        # Metrics per page
-        self.metrics: dict[str, PageMetrics] = {}
+        # Every page URL, interned to an integer ID (its index in this list)
+        self.urls: list[str] = []
+        self.url_ids: dict[str, int] = {}
+        # Raw internal href -> normalized URL (None when excluded)
+        self.normalized_hrefs: dict[str, str | None] = {}
+
+        # Unique targets per crawled source page, in page order (until CSR is built)
+        self.outlinks: dict[int, array] = {}
+        # Source page IDs that have an entry in the link graph, in page order
+        self.sources: list[int] = []
+        # Main-content text per page ID (until the content analyses have run)
+        self.texts: dict[int, str] = {}
+
+        # Forward (source -> targets) and reverse (target -> sources) adjacency in CSR form
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.rev_indptr = np.zeros(1, dtype=np.int64)
+        self.rev_indices = np.zeros(0, dtype=np.int32)
+        # Per page ID: whether it has an entry in the link graph
+        self.crawled = np.zeros(0, dtype=bool)
+
+        # Per-page counts, indexed by page ID
+        self.inbound = np.zeros(0, dtype=np.int64)
+        self.outbound = np.zeros(0, dtype=np.int64)
+        self.pagerank = np.zeros(0, dtype=np.float64)
+        self.pagerank_info: dict = {}
+        # Clicks from the nearest entry point (-1 when unreachable)
+        self.depth = np.zeros(0, dtype=np.int64)
+        self.entry_ids = np.zeros(0, dtype=np.int64)
 
     def normalize_url(self, url: str) -> str:
         """Normalize URL to consistent format"""
@@ -87,10 +131,12 @@ class LinkGraphAnalyzer:
 
     def file_path_to_url(self, file_path: Path) -> str:
         """Convert file path to URL"""
-        relative = file_path.relative_to(self.dist_path)
+        return self.relative_path_to_url(str(file_path.relative_to(self.dist_path)))
 
+    def relative_path_to_url(self, relative: str) -> str:
+        """Convert a file path relative to dist_path to URL"""
         # Convert to URL format
-        url = '/' + str(relative).replace('\\', '/')
+        url = '/' + relative.replace('\\', '/')
 
         # Remove index.html
         if url.endswith('/index.html'):
@@ -102,199 +148,523 @@ class LinkGraphAnalyzer:
 
     def is_excluded(self, url: str) -> bool:
         """Check if URL should be excluded"""
-        for pattern in self.excluded_paths:
-            if url.startswith(pattern):
-                return True
-
-        for ext in self.excluded_extensions:
-            if url.lower().endswith(ext):
-                return True
-
-        return False
+        return (
+            url.startswith(tuple(self.excluded_paths))
+            or url.lower().endswith(tuple(self.excluded_extensions))
+        )
 
     def extract_internal_links(self, content: str) -> list[str]:
         """Extract internal links from HTML"""
-        soup = BeautifulSoup(content, 'html.parser')
-        links = []
+        return self.internal_links_from(parse_links(content, self.extractor))
 
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
+    def internal_links_from(self, links: list[LinkRecord]) -> list[str]:
+        """Select and normalize internal links from extracted anchor records"""
+        internal_links = []
 
+        for link in links:
             # Only internal links
-            if href.startswith('/'):
-                normalized = self.normalize_url(href)
-                if not self.is_excluded(normalized):
-                    links.append(normalized)
-
-        return links
-
-    def build_graph(self) -> None:
-        """Build the complete link graph"""
-        html_files = list(self.dist_path.glob('**/*.html'))
-        print(f"Building link graph from {len(html_files)} HTML files...")
-
-        for i, file_path in enumerate(html_files, 1):
-            source_url = self.file_path_to_url(file_path)
+            if link.href.startswith('/'):
+                if link.href not in self.normalized_hrefs:
+                    normalized = self.normalize_url(link.href)
+                    self.normalized_hrefs[link.href] = None if self.is_excluded(normalized) else normalized
+
+                normalized = self.normalized_hrefs[link.href]
+                if normalized is not None:
+                    internal_links.append(normalized)
+
+        return internal_links
+
+    def intern(self, url: str) -> int:
+        """Return the integer ID for a page URL, assigning one if new"""
+        page_id = self.url_ids.get(url)
+        if page_id is None:
+            page_id = len(self.urls)
+            self.url_ids[url] = page_id
+            self.urls.append(url)
+        return page_id
+
+    @property
+    def total_pages(self) -> int:
+        return len(self.urls)
+
+    @property
+    def total_links(self) -> int:
+        return len(self.indices)
+
+    def build_graph(self, pages: list[PageRecord] = None) -> None:
+        """Build the complete link graph from all HTML files (or pre-extracted page records)"""
+        if pages is None:
+            pages = extract_site(self.dist_path, self.workers, self.cache, self.extractor)
+        print(f"Building link graph from {len(pages)} HTML files...")
+
+        for page in pages:
+            source_url = self.file_path_to_url(self.dist_path / page.path)
 
             if self.is_excluded(source_url):
                 continue
 
-            self.all_pages.add(source_url)
+            source_id = self.intern(source_url)
 
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                links = self.extract_internal_links(content)
+            if page.error:
+                continue
 
-                # Store unique links only
-                unique_links = list(set(links))
-                self.link_graph[source_url] = unique_links
+            try:
+                links = self.internal_links_from(page.links)
 
-                # Also track target pages
-                for link in unique_links:
-                    self.all_pages.add(link)
+                # Store unique links only (first occurrence order)
+                targets = array('i', (self.intern(link) for link in dict.fromkeys(links)))
+                if source_id not in self.outlinks:
+                    self.sources.append(source_id)
+                self.outlinks[source_id] = targets
+                if page.text:
+                    self.texts[source_id] = page.text
 
             except Exception as e:
-                print(f"Error processing {file_path}: {e}", file=sys.stderr)
+                print(f"Error processing {page.path}: {e}", file=sys.stderr)
+
+        self.build_adjacency()
+        print(f"Graph built. {self.total_pages} pages, {self.total_links} links.")
+
+    def build_adjacency(self) -> None:
+        """Pack the collected links into forward and reverse CSR arrays"""
+        n = len(self.urls)
+
+        out_degree = np.zeros(n, dtype=np.int64)
+        for source_id, targets in self.outlinks.items():
+            out_degree[source_id] = len(targets)
+        self.crawled = np.zeros(n, dtype=bool)
+        self.crawled[self.sources] = True
+
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(out_degree, out=self.indptr[1:])
+        self.indices = np.zeros(self.indptr[-1], dtype=np.int32)
+        for source_id, targets in self.outlinks.items():
+            self.indices[self.indptr[source_id]:self.indptr[source_id + 1]] = np.frombuffer(targets, dtype=np.int32)
+        self.outlinks = {}
+
+        # Reverse adjacency: edges grouped by target, sources in ascending ID order
+        edge_sources = np.repeat(np.arange(n, dtype=np.int32), out_degree)
+        order = np.argsort(self.indices, kind='stable')
+        self.rev_indices = edge_sources[order]
+        self.rev_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=n), out=self.rev_indptr[1:])
+
+    def targets_of(self, page_id: int) -> np.ndarray:
+        """Page IDs linked from a page"""
+        return self.indices[self.indptr[page_id]:self.indptr[page_id + 1]]
+
+    def sources_of(self, page_id: int) -> np.ndarray:
+        """Page IDs linking to a page"""
+        return self.rev_indices[self.rev_indptr[page_id]:self.rev_indptr[page_id + 1]]
 
-            if i % 100 == 0:
-                print(f"Processed {i}/{len(html_files)} files...")
+    def calculate_metrics(self) -> None:
+        """Calculate inbound/outbound counts for every page"""
+        self.outbound = np.diff(self.indptr)
+        self.inbound = np.diff(self.rev_indptr)
+
+    def page_metrics(self, page_id: int) -> PageMetrics:
+        """Materialize the full metrics record for one page
+
+        Every field is freshly built, so vars() of the result is safe to
+        hand out as a plain dict (and much cheaper than asdict()).
+        """
+        inbound_count = int(self.inbound[page_id])
+        outbound_count = int(self.outbound[page_id])
+
+        # Calculate ratio
+        if outbound_count == 0:
+            ratio = float('inf') if inbound_count > 0 else 0.0
+        else:
+            ratio = inbound_count / outbound_count
+
+        return PageMetrics(
+            url=self.urls[page_id],
+            inbound=inbound_count,
+            outbound=outbound_count,
+            ratio=round(ratio, 2) if ratio != float('inf') else -1,  # -1 represents infinity
+            inbound_from=self.first_urls(self.sources_of(page_id)),  # Limit for output size
+            outbound_to=self.first_urls(self.targets_of(page_id)),
+            pagerank=float(self.pagerank[page_id]),
+            depth=int(self.depth[page_id]) if self.depth[page_id] >= 0 else None,
+            crawled=bool(self.crawled[page_id])
+        )
 
-        print(f"Graph built. {len(self.all_pages)} pages, {sum(len(v) for v in self.link_graph.values())} links.")
+    def first_urls(self, page_ids: np.ndarray, limit: int = 10) -> list[str]:
+        """The alphabetically first URLs among a set of page IDs"""
+        return heapq.nsmallest(limit, (self.urls[i] for i in page_ids))
 
-    def calculate_metrics(self) -> None:
-        """Calculate metrics for each page"""
-        # Build reverse graph (inbound links)
-        inbound_from: dict[str, list[str]] = defaultdict(list)
-
-        for source, targets in self.link_graph.items():
-            for target in targets:
-                inbound_from[target].append(source)
-
-        # Calculate metrics for each page
-        for page in self.all_pages:
-            inbound_list = inbound_from.get(page, [])
-            outbound_list = self.link_graph.get(page, [])
-
-            inbound_count = len(inbound_list)
-            outbound_count = len(outbound_list)
-
-            # Calculate ratio
-            if outbound_count == 0:
-                ratio = float('inf') if inbound_count > 0 else 0.0
-            else:
-                ratio = inbound_count / outbound_count
-
-            self.metrics[page] = PageMetrics(
-                url=page,
-                inbound=inbound_count,
-                outbound=outbound_count,
-                ratio=round(ratio, 2) if ratio != float('inf') else -1,  # -1 represents infinity
-                inbound_from=sorted(inbound_list)[:10],  # Limit for output size
-                outbound_to=sorted(outbound_list)[:10]
-            )
+    def ranked(self, mask: np.ndarray, key: np.ndarray, descending: bool = False) -> np.ndarray:
+        """IDs of pages selected by mask, sorted by key (ties in page order)"""
+        selected = np.flatnonzero(mask)
+        order = np.argsort(-key[selected] if descending else key[selected], kind='stable')
+        return selected[order]
 
     def find_orphans(self) -> list[str]:
         """Find pages with zero inbound links"""
-        orphans = []
-        for page, metrics in self.metrics.items():
-            if metrics.inbound == 0:
-                # Exclude homepage
-                if page != '/':
-                    orphans.append(page)
-        return sorted(orphans)
+        # Exclude homepage
+        return sorted(
+            self.urls[i] for i in np.flatnonzero(self.inbound == 0)
+            if self.urls[i] != '/'
+        )
 
     def find_underlinked(self, threshold: int = 3) -> list[dict]:
         """Find pages with fewer than threshold inbound links"""
-        underlinked = []
-        for page, metrics in self.metrics.items():
-            if 0 < metrics.inbound < threshold:
-                underlinked.append({
-                    'url': page,
-                    'inbound': metrics.inbound,
-                    'inbound_from': metrics.inbound_from
-                })
-        return sorted(underlinked, key=lambda x: x['inbound'])
+        mask = (self.inbound > 0) & (self.inbound < threshold)
+        return [
+            {
+                'url': self.urls[i],
+                'inbound': int(self.inbound[i]),
+                'inbound_from': self.first_urls(self.sources_of(i))
+            }
+            for i in self.ranked(mask, self.inbound)
+        ]
 
     def find_overlinked(self, threshold: int = 50) -> list[dict]:
         """Find pages with more than threshold outbound links"""
-        overlinked = []
-        for page, metrics in self.metrics.items():
-            if metrics.outbound > threshold:
-                overlinked.append({
-                    'url': page,
-                    'outbound': metrics.outbound
-                })
-        return sorted(overlinked, key=lambda x: x['outbound'], reverse=True)
+        mask = self.outbound > threshold
+        return [
+            {'url': self.urls[i], 'outbound': int(self.outbound[i])}
+            for i in self.ranked(mask, self.outbound, descending=True)
+        ]
 
     def find_link_sinks(self, min_inbound: int = 5, max_outbound: int = 2) -> list[dict]:
         """Find pages that receive links but don't pass them"""
-        sinks = []
-        for page, metrics in self.metrics.items():
-            if metrics.inbound >= min_inbound and metrics.outbound <= max_outbound:
-                sinks.append({
-                    'url': page,
-                    'inbound': metrics.inbound,
-                    'outbound': metrics.outbound
+        mask = (self.inbound >= min_inbound) & (self.outbound <= max_outbound)
+        return [
+            {'url': self.urls[i], 'inbound': int(self.inbound[i]), 'outbound': int(self.outbound[i])}
+            for i in self.ranked(mask, self.inbound, descending=True)
+        ]
+
+    def recommend_sources(self, target_urls: list[str], limit: int = 5) -> list[dict]:
+        """Pages whose content is closest to each target and that do not link to it yet
+
+        Targets without any text of their own get no suggestions. The
+        TF-IDF matrix is only built when some target has text.
+        """
+        targets = [url for url in target_urls if self.url_ids[url] in self.texts]
+        if not targets:
+            return []
+
+        page_ids = np.array(sorted(self.texts), dtype=np.int64)
+        matrix = TfidfMatrix([self.texts[i] for i in page_ids.tolist()])
+        print(f"Indexed {len(matrix)} page texts ({len(matrix.vocabulary)} terms, {matrix.nnz} weights).")
+
+        # Page ID -> matrix row
+        rows = np.full(len(self.urls), -1, dtype=np.int64)
+        rows[page_ids] = np.arange(len(page_ids))
+
+        suggestions = []
+        for url in targets:
+            target_id = self.url_ids[url]
+            linking = rows[self.sources_of(target_id)]
+            nearest = matrix.nearest(int(rows[target_id]), limit, exclude=linking[linking >= 0])
+            if nearest:
+                suggestions.append({
+                    'url': url,
+                    'inbound': int(self.inbound[target_id]),
+                    'sources': [
+                        {'url': self.urls[page_ids[row]], 'similarity': round(similarity, 3)}
+                        for row, similarity in nearest
+                    ]
                 })
-        return sorted(sinks, key=lambda x: x['inbound'], reverse=True)
+        return suggestions
+
+    def find_near_duplicates(self, threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> list[dict]:
+        """Clusters of pages with nearly the same main-content text, largest first
+
+        Each cluster is named after its alphabetically first page; the
+        others carry their estimated similarity (Jaccard index of word
+        shingles) to the page they matched most closely, which is at least
+        threshold but may be another member than the first.
+        """
+        page_ids = sorted(self.texts, key=self.urls.__getitem__)
+        index = MinHashIndex([self.texts[i] for i in page_ids])
+
+        clusters = []
+        for cluster in index.clusters(threshold):
+            (first, _), *others = cluster
+            clusters.append({
+                'url': self.urls[page_ids[first]],
+                'size': len(cluster),
+                'duplicates': [
+                    {'url': self.urls[page_ids[row]], 'similarity': round(similarity, 3)}
+                    for row, similarity in sorted(others, key=lambda other: (-other[1], other[0]))
+                ]
+            })
+        return clusters
+
+    def calculate_pagerank(
+        self,
+        damping: float = 0.85,
+        tolerance: float = 1e-6,
+        max_iterations: int = 100
+    ) -> None:
+        """Calculate internal PageRank by sparse power iteration
+
+        Each iteration spreads every page's score evenly over its outbound
+        links (one weighted bincount over the CSR edge list). The score of
+        dangling pages (no outbound links) is spread over all pages.
+        Stops when the L1 change between iterations drops below tolerance.
+        """
+        n = self.total_pages
+        self.pagerank = np.zeros(n, dtype=np.float64)
+        self.pagerank_info = {
+            "damping": damping,
+            "tolerance": tolerance,
+            "iterations": 0,
+            "converged": n == 0
+        }
+        if n == 0:
+            return
+
+        outbound = self.outbound.astype(np.float64)
+        dangling = outbound == 0
+        inverse_outbound = np.divide(1.0, outbound, out=np.zeros(n), where=~dangling)
+        edge_sources = np.repeat(np.arange(n), self.outbound)
+
+        rank = np.full(n, 1.0 / n)
+        for iteration in range(1, max_iterations + 1):
+            share = rank * inverse_outbound
+            spread = np.bincount(self.indices, weights=share[edge_sources], minlength=n)
+            new_rank = damping * (spread + rank[dangling].sum() / n) + (1.0 - damping) / n
+
+            delta = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            self.pagerank_info["iterations"] = iteration
+            if delta < tolerance:
+                self.pagerank_info["converged"] = True
+                break
+
+        self.pagerank = rank
+
+    def get_pages_by_pagerank(self, limit: int = 20, lowest: bool = False) -> list[dict]:
+        """Get pages with the most (or least) internal link equity"""
+        order = np.argsort(self.pagerank if lowest else -self.pagerank, kind='stable')[:limit]
+        return [
+            {
+                'url': self.urls[i],
+                'pagerank': float(self.pagerank[i]),
+                'inbound': int(self.inbound[i]),
+                'outbound': int(self.outbound[i])
+            }
+            for i in order
+        ]
+
+    def calculate_click_depth(self, entry_points: list[str] = None) -> None:
+        """Calculate click depth from the homepage and entry points
+
+        Level-synchronous BFS over the CSR adjacency: each level gathers the
+        outbound edges of the whole frontier at once, so every page and edge
+        is visited once.
+        """
+        n = self.total_pages
+        self.depth = np.full(n, -1, dtype=np.int64)
+
+        entry_urls = ['/'] + [self.normalize_url(url) for url in entry_points or []]
+        entry_ids = [self.url_ids[url] for url in dict.fromkeys(entry_urls) if url in self.url_ids]
+        self.entry_ids = np.array(entry_ids, dtype=np.int64)
+
+        # claim[i] is the position of page i in the candidate list that won it
+        claim = np.zeros(n, dtype=np.int64)
+        frontier = self.entry_ids
+        self.depth[frontier] = 0
+        level = 0
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            offsets = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            targets = self.indices[offsets]
+
+            candidates = targets[self.depth[targets] < 0]
+            positions = np.arange(candidates.size)
+            claim[candidates] = positions
+            frontier = candidates[claim[candidates] == positions]
+
+            level += 1
+            self.depth[frontier] = level
+
+    def depth_distribution(self) -> dict[str, int]:
+        """Number of pages at each click depth, plus unreachable pages"""
+        reachable = self.depth[self.depth >= 0]
+        counts = np.bincount(reachable) if reachable.size else np.zeros(0, dtype=np.int64)
+        distribution = {str(depth): int(count) for depth, count in enumerate(counts) if count}
+        distribution['unreachable'] = int(self.depth.size - reachable.size)
+        return distribution
+
+    def find_unreachable(self) -> list[str]:
+        """Find pages that cannot be reached from any entry point"""
+        return sorted(self.urls[i] for i in np.flatnonzero(self.depth < 0))
+
+    def find_deep_pages(self, max_depth: int = 3) -> list[dict]:
+        """Find pages more than max_depth clicks from the nearest entry point"""
+        mask = self.depth > max_depth
+        return [
+            {'url': self.urls[i], 'depth': int(self.depth[i]), 'inbound': int(self.inbound[i])}
+            for i in self.ranked(mask, self.depth, descending=True)
+        ]
+
+    def find_single_parent_pages(self) -> list[dict]:
+        """Find reachable pages linked from exactly one reachable page
+
+        Removing or changing that one link would cut the page off.
+        """
+        n = self.total_pages
+        edge_sources = np.repeat(np.arange(n), self.outbound)
+        parent_edges = (self.depth[edge_sources] >= 0) & (edge_sources != self.indices)
+        children = self.indices[parent_edges]
+        parents = edge_sources[parent_edges]
+
+        parent_counts = np.bincount(children, minlength=n)
+        parent_of = np.full(n, -1, dtype=np.int64)
+        parent_of[children] = parents
+
+        mask = (parent_counts == 1) & (self.depth > 0)
+        return [
+            {'url': self.urls[i], 'depth': int(self.depth[i]), 'parent': self.urls[parent_of[i]]}
+            for i in self.ranked(mask, self.depth)
+        ]
 
     def get_top_pages_by_inbound(self, limit: int = 20) -> list[dict]:
         """Get pages with most inbound links"""
-        sorted_pages = sorted(
-            self.metrics.values(),
-            key=lambda x: x.inbound,
-            reverse=True
-        )
+        top = np.argsort(-self.inbound, kind='stable')[:limit]
         return [
-            {'url': p.url, 'inbound': p.inbound, 'outbound': p.outbound}
-            for p in sorted_pages[:limit]
+            {'url': self.urls[i], 'inbound': int(self.inbound[i]), 'outbound': int(self.outbound[i])}
+            for i in top
         ]
 
+    def link_graph_dict(self) -> dict[str, list[str]]:
+        """The link graph as source URL -> target URLs"""
+        return {
+            self.urls[source_id]: [self.urls[i] for i in self.targets_of(source_id)]
+            for source_id in self.sources
+        }
+
+    def page_metrics_dict(self) -> dict[str, dict]:
+        """Metrics for every page, keyed by URL"""
+        return {url: vars(self.page_metrics(page_id)) for page_id, url in enumerate(self.urls)}
+
+    def iter_edges(self) -> Iterator[tuple[str, str]]:
+        """Stream (source, target) URL pairs in link graph order"""
+        for source_id in self.sources:
+            source = self.urls[source_id]
+            for target_id in self.targets_of(source_id).tolist():
+                yield source, self.urls[target_id]
+
+    def iter_page_metrics(self) -> Iterator[dict]:
+        """Stream the metrics record of every page"""
+        for page_id in range(self.total_pages):
+            yield vars(self.page_metrics(page_id))
+
     def analyze(
         self,
         underlinked_threshold: int = 3,
         overlinked_threshold: int = 50,
         sink_min_inbound: int = 5,
-        sink_max_outbound: int = 2
+        sink_max_outbound: int = 2,
+        pages: list[PageRecord] = None,
+        pagerank_damping: float = 0.85,
+        pagerank_tolerance: float = 1e-6,
+        pagerank_max_iterations: int = 100,
+        max_depth: int = 3,
+        entry_points: list[str] = None,
+        include_graph: bool = True,
+        suggested_sources: int = 5,
+        duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD
     ) -> dict:
-        """Run full analysis"""
-        self.build_graph()
-        self.calculate_metrics()
-
-        orphans = self.find_orphans()
-        underlinked = self.find_underlinked(underlinked_threshold)
-        overlinked = self.find_overlinked(overlinked_threshold)
-        link_sinks = self.find_link_sinks(sink_min_inbound, sink_max_outbound)
-        top_pages = self.get_top_pages_by_inbound()
-
-        return {
+        """Run full analysis
+
+        suggested_sources is how many linking pages to propose per orphan
+        and under-linked page (0 skips the recommender). Pages at least
+        duplicate_threshold alike are reported as near-duplicates (0 skips
+        the check).
+
+        With include_graph=False the (potentially huge) link_graph and
+        page_metrics are left out; stream them with iter_edges() and
+        iter_page_metrics(), or save_analysis() in graph_output.
+        """
+        with step('build'):
+            self.build_graph(pages)
+        with step('metrics'):
+            self.calculate_metrics()
+        with step('pagerank'):
+            self.calculate_pagerank(pagerank_damping, pagerank_tolerance, pagerank_max_iterations)
+        with step('click_depth'):
+            self.calculate_click_depth(entry_points)
+
+        with step('findings'):
+            orphans = self.find_orphans()
+            underlinked = self.find_underlinked(underlinked_threshold)
+            overlinked = self.find_overlinked(overlinked_threshold)
+            link_sinks = self.find_link_sinks(sink_min_inbound, sink_max_outbound)
+            top_pages = self.get_top_pages_by_inbound()
+            top_pagerank = self.get_pages_by_pagerank()
+            bottom_pagerank = self.get_pages_by_pagerank(lowest=True)
+            unreachable = self.find_unreachable()
+            deep_pages = self.find_deep_pages(max_depth)
+            single_parent = self.find_single_parent_pages()
+
+        link_suggestions = []
+        if suggested_sources > 0:
+            with step('recommend'):
+                link_suggestions = self.recommend_sources(
+                    orphans + [page['url'] for page in underlinked], suggested_sources
+                )
+
+        near_duplicates = []
+        if duplicate_threshold > 0:
+            with step('near_duplicates'):
+                near_duplicates = self.find_near_duplicates(duplicate_threshold)
+        self.texts = {}
+
+        analysis = {
             "metadata": {
                 "analyzed_at": timestamp(),
-                "total_pages": len(self.all_pages),
-                "total_links": sum(len(v) for v in self.link_graph.values()),
+                "total_pages": self.total_pages,
+                "total_links": self.total_links,
                 "thresholds": {
                     "underlinked": underlinked_threshold,
                     "overlinked": overlinked_threshold,
                     "sink_min_inbound": sink_min_inbound,
-                    "sink_max_outbound": sink_max_outbound
-                }
+                    "sink_max_outbound": sink_max_outbound,
+                    "max_depth": max_depth,
+                    "suggested_sources": suggested_sources,
+                    "near_duplicate": duplicate_threshold
+                },
+                "entry_points": [self.urls[i] for i in self.entry_ids],
+                "pagerank": self.pagerank_info
             },
             "summary": {
                 "orphan_pages": len(orphans),
                 "underlinked_pages": len(underlinked),
                 "overlinked_pages": len(overlinked),
-                "link_sinks": len(link_sinks)
+                "link_sinks": len(link_sinks),
+                "unreachable_pages": len(unreachable),
+                "deep_pages": len(deep_pages),
+                "single_parent_pages": len(single_parent),
+                "pages_with_link_suggestions": len(link_suggestions),
+                "near_duplicate_clusters": len(near_duplicates),
+                "near_duplicate_pages": sum(cluster['size'] for cluster in near_duplicates),
+                "max_click_depth": int(self.depth.max()) if self.depth.size else 0
             },
             "orphan_pages": orphans,
             "underlinked_pages": underlinked,
             "overlinked_pages": overlinked,
             "link_sinks": link_sinks,
             "top_pages_by_inbound": top_pages,
-            "link_graph": {k: v for k, v in self.link_graph.items()},
-            "page_metrics": {k: asdict(v) for k, v in self.metrics.items()}
+            "top_pages_by_pagerank": top_pagerank,
+            "bottom_pages_by_pagerank": bottom_pagerank,
+            "depth_distribution": self.depth_distribution(),
+            "unreachable_pages": unreachable,
+            "deep_pages": deep_pages,
+            "single_parent_pages": single_parent,
+            "link_suggestions": link_suggestions,
+            "near_duplicates": near_duplicates,
         }
+        if include_graph:
+            analysis["link_graph"] = self.link_graph_dict()
+            analysis["page_metrics"] = self.page_metrics_dict()
+
+        return analysis
 
 
 def generate_markdown_report(analysis: dict) -> str:
@@ -314,6 +684,10 @@ def generate_markdown_report(analysis: dict) -> str:
         f"| Under-linked Pages | {analysis['summary']['underlinked_pages']} |",
         f"| Over-linked Pages | {analysis['summary']['overlinked_pages']} |",
         f"| Link Sinks | {analysis['summary']['link_sinks']} |",
+        f"| Unreachable Pages | {analysis['summary']['unreachable_pages']} |",
+        f"| Pages Deeper Than {analysis['metadata']['thresholds']['max_depth']} Clicks | {analysis['summary']['deep_pages']} |",
+        f"| Single-Parent Pages | {analysis['summary']['single_parent_pages']} |",
+        f"| Near-Duplicate Pages | {analysis['summary'].get('near_duplicate_pages', 0)} |",
         "",
     ]
 
@@ -348,6 +722,48 @@ def generate_markdown_report(analysis: dict) -> str:
             lines.append(f"\n*... and {len(analysis['underlinked_pages']) - 20} more*")
         lines.append("")
 
+    # Suggested link sources
+    if analysis.get('link_suggestions'):
+        lines.extend([
+            "## Suggested Links",
+            "",
+            "Pages with the most similar content that do not link to these orphan and under-linked pages yet.",
+            "",
+            "| Page | Inbound | Link From (similarity) |",
+            "|------|---------|------------------------|",
+        ])
+        for page in analysis['link_suggestions'][:20]:
+            sources = ", ".join(f"`{source['url']}` ({source['similarity']:.2f})" for source in page['sources'])
+            lines.append(f"| `{page['url']}` | {page['inbound']} | {sources} |")
+        if len(analysis['link_suggestions']) > 20:
+            lines.append(f"\n*... and {len(analysis['link_suggestions']) - 20} more*")
+        lines.append("")
+
+    # Near-duplicates
+    if analysis.get('near_duplicates'):
+        threshold = analysis['metadata']['thresholds']['near_duplicate']
+        lines.extend([
+            f"## Near-Duplicate Pages ({threshold:.0%}+ similar)",
+            "",
+            "These groups of pages have nearly the same main content. Consolidate them, "
+            "or mark all but one canonical or noindex, so crawlers spend their budget on distinct pages. "
+            "Each page is at least this similar to its closest match in the group, "
+            "which is not always the page the group is listed under.",
+            "",
+            "| Page | Pages in Group | Near-Duplicates (similarity to closest match) |",
+            "|------|----------------|-----------------------------------------------|",
+        ])
+        for cluster in analysis['near_duplicates'][:20]:
+            duplicates = ", ".join(
+                f"`{duplicate['url']}` ({duplicate['similarity']:.2f})" for duplicate in cluster['duplicates'][:5]
+            )
+            if len(cluster['duplicates']) > 5:
+                duplicates += f", ... {len(cluster['duplicates']) - 5} more"
+            lines.append(f"| `{cluster['url']}` | {cluster['size']} | {duplicates} |")
+        if len(analysis['near_duplicates']) > 20:
+            lines.append(f"\n*... and {len(analysis['near_duplicates']) - 20} more groups*")
+        lines.append("")
+
     # Over-linked
     if analysis['overlinked_pages']:
         threshold = analysis['metadata']['thresholds']['overlinked']
@@ -379,6 +795,51 @@ def generate_markdown_report(analysis: dict) -> str:
             lines.append(f"\n*... and {len(analysis['link_sinks']) - 20} more*")
         lines.append("")
 
+    # Click depth
+    entry_points = ", ".join(f"`{url}`" for url in analysis['metadata']['entry_points']) or "none found"
+    lines.extend([
+        "## Click Depth",
+        "",
+        f"Clicks needed to reach each page from the nearest entry point ({entry_points}).",
+        "",
+        "| Depth | Pages |",
+        "|-------|-------|",
+    ])
+    for depth, count in analysis['depth_distribution'].items():
+        lines.append(f"| {depth.capitalize()} | {count} |")
+    lines.append("")
+
+    if analysis['deep_pages']:
+        max_depth = analysis['metadata']['thresholds']['max_depth']
+        lines.extend([
+            f"### Deep Pages (>{max_depth} clicks)",
+            "",
+            "These pages are buried deep in the site structure and are crawled less often.",
+            "",
+            "| Page | Depth | Inbound |",
+            "|------|-------|---------|",
+        ])
+        for page in analysis['deep_pages'][:20]:
+            lines.append(f"| `{page['url']}` | {page['depth']} | {page['inbound']} |")
+        if len(analysis['deep_pages']) > 20:
+            lines.append(f"\n*... and {len(analysis['deep_pages']) - 20} more*")
+        lines.append("")
+
+    if analysis['single_parent_pages']:
+        lines.extend([
+            "### Single-Parent Pages",
+            "",
+            "These pages are reachable through only one linking page. Removing that link cuts them off.",
+            "",
+            "| Page | Depth | Only Linked From |",
+            "|------|-------|------------------|",
+        ])
+        for page in analysis['single_parent_pages'][:20]:
+            lines.append(f"| `{page['url']}` | {page['depth']} | `{page['parent']}` |")
+        if len(analysis['single_parent_pages']) > 20:
+            lines.append(f"\n*... and {len(analysis['single_parent_pages']) - 20} more*")
+        lines.append("")
+
     # Top pages
     lines.extend([
         "## Top Pages by Inbound Links",
@@ -388,34 +849,98 @@ def generate_markdown_report(analysis: dict) -> str:
     ])
     for page in analysis['top_pages_by_inbound']:
         lines.append(f"| `{page['url']}` | {page['inbound']} | {page['outbound']} |")
+    lines.append("")
+
+    # Link equity
+    if analysis.get('top_pages_by_pagerank'):
+        total_pages = analysis['metadata']['total_pages']
+        lines.extend([
+            "## Link Equity (Internal PageRank)",
+            "",
+            "Equity is the page's internal PageRank relative to the site average (1.00 = average).",
+            "",
+            "### Highest Link Equity",
+            "",
+            "| Page | Equity | Inbound | Outbound |",
+            "|------|--------|---------|----------|",
+        ])
+        for page in analysis['top_pages_by_pagerank']:
+            lines.append(f"| `{page['url']}` | {page['pagerank'] * total_pages:.2f} | {page['inbound']} | {page['outbound']} |")
+        lines.extend([
+            "",
+            "### Lowest Link Equity",
+            "",
+            "These pages receive the least link equity from the rest of the site.",
+            "",
+            "| Page | Equity | Inbound | Outbound |",
+            "|------|--------|---------|----------|",
+        ])
+        for page in analysis['bottom_pages_by_pagerank']:
+            lines.append(f"| `{page['url']}` | {page['pagerank'] * total_pages:.2f} | {page['inbound']} | {page['outbound']} |")
+        lines.append("")
 
     return "\n".join(lines)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Link Graph Analyzer")
-    parser.add_argument("--dist", "-d", required=True, help="Path to dist directory")
+    parser.add_argument("--dist", "-d", help="Path to dist directory")
     parser.add_argument("--config", help="Path to config.json")
     parser.add_argument("--output", "-o", help="Output JSON file path")
     parser.add_argument("--report", "-r", help="Output markdown report path")
+    parser.add_argument("--graph-format", choices=GRAPH_FORMATS,
+                        help="link_graph/page_metrics output: one JSON document (default) or "
+                             "streamed NDJSON/Parquet sidecar files next to --output")
+    parser.add_argument("--from-summary", help="Regenerate --report from a saved analysis instead of analyzing")
     parser.add_argument("--underlinked", type=int, default=3, help="Under-linked threshold")
     parser.add_argument("--overlinked", type=int, default=50, help="Over-linked threshold")
+    parser.add_argument("--max-depth", type=int, help="Flag pages deeper than this many clicks (default: 3)")
+    parser.add_argument("--suggest-sources", type=int,
+                        help="Linking pages to propose per orphan/under-linked page (default: 5, 0 to skip)")
+    parser.add_argument("--duplicate-threshold", type=float,
+                        help="Report pages at least this similar as near-duplicates (default: 0.8, 0 to skip)")
+    parser.add_argument("--entry", nargs="+", help="Extra entry points for click depth (besides /)")
     parser.add_argument("--exclude", nargs="+", help="Paths to exclude")
+    parser.add_argument("--workers", "-w", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--extractor", choices=list(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help="Link extraction backend")
 
     args = parser.parse_args()
 
+    if args.from_summary:
+        if not args.report:
+            parser.error("--from-summary requires --report")
+        report_path = Path(args.report)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(generate_markdown_report(load_summary(Path(args.from_summary))))
+        print(f"Markdown report saved to: {report_path}")
+        return
+    if not args.dist:
+        parser.error("--dist is required")
+
     # Load config
     config = {}
     if args.config:
         config = load_json_config(Path(args.config))
 
+    graph_format = args.graph_format or config.get("output", {}).get("graph_format", "json")
+
     thresholds = config.get("thresholds", {})
     underlinked_threshold = args.underlinked or thresholds.get("underlinked_min_inbound", 3)
     overlinked_threshold = args.overlinked or thresholds.get("overlinked_max_outbound", 50)
     sink_min_inbound = thresholds.get("link_sink_min_inbound", 5)
     sink_max_outbound = thresholds.get("link_sink_max_outbound", 2)
+    max_depth = args.max_depth or thresholds.get("max_click_depth", 3)
+    pagerank = config.get("pagerank", {})
+    suggested_sources = args.suggest_sources
+    if suggested_sources is None:
+        suggested_sources = config.get("recommendations", {}).get("sources_per_page", 5)
+    duplicate_threshold = args.duplicate_threshold
+    if duplicate_threshold is None:
+        duplicate_threshold = config.get("near_duplicates", {}).get("threshold", DEFAULT_DUPLICATE_THRESHOLD)
 
     excluded_paths = args.exclude or config.get("excluded_paths", [])
+    entry_points = args.entry or config.get("entry_points", [])
 
     dist_path = Path(args.dist)
     if not dist_path.exists():
@@ -423,18 +948,31 @@ def main():
         sys.exit(1)
 
     # Run analysis
-    analyzer = LinkGraphAnalyzer(dist_path, excluded_paths=excluded_paths)
+    analyzer = LinkGraphAnalyzer(
+        dist_path,
+        excluded_paths=excluded_paths,
+        workers=args.workers,
+        extractor=args.extractor
+    )
     analysis = analyzer.analyze(
         underlinked_threshold=underlinked_threshold,
         overlinked_threshold=overlinked_threshold,
         sink_min_inbound=sink_min_inbound,
-        sink_max_outbound=sink_max_outbound
+        sink_max_outbound=sink_max_outbound,
+        pagerank_damping=pagerank.get("damping", 0.85),
+        pagerank_tolerance=pagerank.get("tolerance", 1e-6),
+        pagerank_max_iterations=pagerank.get("max_iterations", 100),
+        max_depth=max_depth,
+        entry_points=entry_points,
+        include_graph=False,
+        suggested_sources=suggested_sources,
+        duplicate_threshold=duplicate_threshold
     )
 
     # Output JSON
     if args.output:
         output_path = Path(args.output)
-        save_json(analysis, output_path)
+        save_analysis(analyzer, analysis, output_path, graph_format)
         print(f"\nJSON results saved to: {output_path}")
 
     # Output markdown report
@@ -457,6 +995,8 @@ def main():
     print(f"Under-linked (<{underlinked_threshold} inbound): {summary['underlinked_pages']}")
     print(f"Over-linked (>{overlinked_threshold} outbound): {summary['overlinked_pages']}")
     print(f"Link sinks: {summary['link_sinks']}")
+    print(f"Pages with suggested links: {summary['pages_with_link_suggestions']}")
+    print(f"Near-duplicate pages: {summary['near_duplicate_pages']} in {summary['near_duplicate_clusters']} groups")
 
     if analysis['orphan_pages']:
         print(f"\nORPHAN PAGES (first 10):")
@@ -0,0 +1,201 @@
+import random
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from extractor import LinkRecord, PageRecord
+from link_graph import LinkGraphAnalyzer
+
+
+DIST = Path("dist")
+
+
+def build(graph: dict[str, list[str]], texts: dict[str, str] = None) -> LinkGraphAnalyzer:
+    """Analyzer over pages given as URL -> linked URLs (and optionally URL -> main text)"""
+    texts = texts or {}
+    pages = [
+        PageRecord(
+            path=url.strip('/') + '/index.html' if url != '/' else 'index.html',
+            links=[LinkRecord(href=target, rel='', text='', kind='internal') for target in targets],
+            text=texts.get(url, '')
+        )
+        for url, targets in graph.items()
+    ]
+    analyzer = LinkGraphAnalyzer(DIST)
+    analyzer.build_graph(pages)
+    analyzer.calculate_metrics()
+    return analyzer
+
+
+def pagerank_of(analyzer: LinkGraphAnalyzer) -> dict[str, float]:
+    return dict(zip(analyzer.urls, analyzer.pagerank.tolist()))
+
+
+class TestPageRank(unittest.TestCase):
+
+    def test_cycle_is_uniform(self):
+        analyzer = build({'/': ['/a/'], '/a/': ['/b/'], '/b/': ['/']})
+        analyzer.calculate_pagerank()
+        for value in pagerank_of(analyzer).values():
+            self.assertAlmostEqual(value, 1 / 3, places=6)
+        self.assertTrue(analyzer.pagerank_info['converged'])
+
+    def test_dangling_page(self):
+        """A page without outbound links spreads its score over every page
+
+        With damping d, '/' gets d * r(/a/) / 2 + (1 - d) / 2 and the
+        scores sum to 1, so r(/) = 0.5 / (1 + d / 2).
+        """
+        analyzer = build({'/': ['/a/'], '/a/': []})
+        analyzer.calculate_pagerank(damping=0.85, tolerance=1e-12)
+        ranks = pagerank_of(analyzer)
+        self.assertAlmostEqual(ranks['/'], 0.5 / 1.425, places=9)
+        self.assertAlmostEqual(ranks['/a/'], 1 - 0.5 / 1.425, places=9)
+
+    def test_link_targets_without_pages_are_dangling(self):
+        """Link targets that were never crawled still hold (and return) equity"""
+        analyzer = build({'/': ['/missing/']})
+        analyzer.calculate_pagerank(tolerance=1e-12)
+        self.assertAlmostEqual(sum(pagerank_of(analyzer).values()), 1.0, places=9)
+
+    def test_matches_dense_solution(self):
+        """Scores sum to 1 and match the dense Google-matrix fixed point"""
+        rng = random.Random(7)
+        urls = ['/'] + [f'/p{i}/' for i in range(40)]
+        graph = {
+            url: rng.sample(urls, rng.choice([0, 0, 1, 3, 8]))
+            for url in urls
+        }
+        analyzer = build(graph)
+        analyzer.calculate_pagerank(damping=0.85, tolerance=1e-12, max_iterations=500)
+        self.assertTrue(analyzer.pagerank_info['converged'])
+        self.assertAlmostEqual(analyzer.pagerank.sum(), 1.0, places=9)
+
+        n = analyzer.total_pages
+        transition = np.zeros((n, n))
+        for source in range(n):
+            targets = analyzer.targets_of(source)
+            if targets.size:
+                transition[targets, source] = 1 / targets.size
+            else:
+                transition[:, source] = 1 / n
+        google = 0.85 * transition + 0.15 / n
+        expected = np.linalg.solve(np.eye(n) - 0.85 * transition, np.full(n, 0.15 / n))
+        np.testing.assert_allclose(google @ expected, expected, atol=1e-12)
+        np.testing.assert_allclose(analyzer.pagerank, expected, atol=1e-9)
+
+    def test_empty_graph(self):
+        analyzer = build({})
+        analyzer.calculate_pagerank()
+        self.assertEqual(analyzer.pagerank.size, 0)
+        self.assertTrue(analyzer.pagerank_info['converged'])
+
+
+class TestClickDepth(unittest.TestCase):
+
+    GRAPH = {
+        '/': ['/a/', '/b/'],
+        '/a/': ['/a/', '/c/'],
+        '/b/': ['/c/'],
+        '/c/': ['/d/'],
+        '/e/': ['/d/'],
+        '/f/': [],
+    }
+
+    def depths(self, analyzer: LinkGraphAnalyzer) -> dict[str, int | None]:
+        return {
+            url: int(depth) if depth >= 0 else None
+            for url, depth in zip(analyzer.urls, analyzer.depth)
+        }
+
+    def test_depth_from_homepage(self):
+        analyzer = build(self.GRAPH)
+        analyzer.calculate_click_depth()
+        self.assertEqual(self.depths(analyzer), {
+            '/': 0, '/a/': 1, '/b/': 1, '/c/': 2, '/d/': 3, '/e/': None, '/f/': None
+        })
+        self.assertEqual(analyzer.depth_distribution(), {'0': 1, '1': 2, '2': 1, '3': 1, 'unreachable': 2})
+        self.assertEqual(analyzer.find_unreachable(), ['/e/', '/f/'])
+        self.assertEqual(analyzer.find_deep_pages(max_depth=2), [{'url': '/d/', 'depth': 3, 'inbound': 2}])
+
+    def test_extra_entry_points(self):
+        """Entry points are normalized; unknown ones are ignored"""
+        analyzer = build(self.GRAPH)
+        analyzer.calculate_click_depth(entry_points=['/e', '/nowhere/'])
+        depths = self.depths(analyzer)
+        self.assertEqual((depths['/e/'], depths['/d/'], depths['/f/']), (0, 1, None))
+        self.assertEqual(sorted(analyzer.urls[i] for i in analyzer.entry_ids), ['/', '/e/'])
+
+    def test_single_parent_pages(self):
+        """Self-links and links from unreachable pages are not parents"""
+        analyzer = build(self.GRAPH)
+        analyzer.calculate_click_depth()
+        self.assertEqual(analyzer.find_single_parent_pages(), [
+            {'url': '/a/', 'depth': 1, 'parent': '/'},
+            {'url': '/b/', 'depth': 1, 'parent': '/'},
+            {'url': '/d/', 'depth': 3, 'parent': '/c/'},
+        ])
+
+        # Once /e/ is an entry point, /d/ has two reachable parents
+        analyzer.calculate_click_depth(entry_points=['/e/'])
+        self.assertNotIn('/d/', [page['url'] for page in analyzer.find_single_parent_pages()])
+
+    def test_matches_reference_bfs(self):
+        rng = random.Random(11)
+        urls = ['/'] + [f'/p{i}/' for i in range(300)]
+        graph = {url: rng.sample(urls, rng.choice([0, 1, 1, 2, 4])) for url in urls}
+        analyzer = build(graph)
+        analyzer.calculate_click_depth()
+
+        expected = {'/': 0}
+        frontier = ['/']
+        while frontier:
+            next_frontier = []
+            for url in frontier:
+                for target in graph.get(url, []):
+                    if target not in expected:
+                        expected[target] = expected[url] + 1
+                        next_frontier.append(target)
+            frontier = next_frontier
+        self.assertEqual(
+            {url: depth for url, depth in self.depths(analyzer).items() if depth is not None},
+            expected
+        )
+
+
+class TestRecommendSources(unittest.TestCase):
+
+    TEXTS = {
+        '/': 'welcome home',
+        '/a/': 'sourdough starter with rye flour',
+        '/b/': 'feeding a sourdough starter with rye',
+        '/c/': 'rye sourdough starter hydration',
+        '/d/': 'garden tomatoes summer watering',
+        '/e/': 'pruning garden roses',
+        '/f/': 'winter tomatoes indoors',
+    }
+
+    def setUp(self):
+        graph = {'/': ['/b/', '/d/'], '/a/': [], '/b/': [], '/c/': ['/a/'], '/d/': [], '/e/': [], '/f/': []}
+        self.analyzer = build(graph, self.TEXTS)
+
+    def test_suggests_similar_pages_not_linking_yet(self):
+        suggestions = self.analyzer.recommend_sources(['/a/'], limit=2)
+        self.assertEqual([suggestion['url'] for suggestion in suggestions], ['/a/'])
+        sources = [source['url'] for source in suggestions[0]['sources']]
+        self.assertIn('/b/', sources)
+        self.assertNotIn('/c/', sources)  # Already links to /a/
+
+    def test_no_targets_skips_indexing(self):
+        """Without targets (or targets with text) no TF-IDF matrix is built"""
+        with mock.patch('link_graph.TfidfMatrix') as matrix:
+            self.assertEqual(self.analyzer.recommend_sources([]), [])
+            analyzer = build({'/': ['/a/'], '/a/': []}, {'/': 'home'})
+            self.assertEqual(analyzer.recommend_sources(['/a/']), [])
+        matrix.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
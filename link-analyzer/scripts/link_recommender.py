@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Link Recommender
+Finds the pages whose main-content text is closest to a given page, to
+propose where links to orphan and under-linked pages should come from.
+Pages are sparse TF-IDF vectors (CSR arrays). Nearest neighbours are
+approximate: candidates come from an inverted index over only the page's
+most distinctive terms, then are re-ranked by exact cosine similarity.
+"""
+
+import re
+from collections import Counter
+from itertools import filterfalse
+
+import numpy as np
+
+
+# Words of two or more characters (scikit-learn's default token pattern)
+TOKEN_PATTERN = re.compile(r"\w\w+")
+
+STOP_WORDS = frozenset("""
+    about above after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further had
+    has have having he her here hers herself him himself his how if in into is it its itself just me
+    more most my myself no nor not now of off on once only or other our ours ourselves out over own
+    same she should so some such than that the their theirs them themselves then there these they
+    this those through to too under until up very was we were what when where which while who whom
+    why will with would you your yours yourself yourselves
+""".split())
+
+# Terms on fewer pages than this cannot connect two pages
+MIN_DOCUMENT_FREQUENCY = 2
+
+# Terms on more than this share of pages (site chrome, the site's own topic) say little
+MAX_DOCUMENT_RATIO = 0.5
+
+# Highest-weighted terms of a page that candidates are looked up by
+QUERY_TERMS = 32
+
+# Candidates re-ranked by exact similarity, per suggestion asked for
+CANDIDATE_FACTOR = 10
+
+# Suggestions less similar than this are not worth a link
+MIN_SIMILARITY = 0.05
+
+
+def tokenize(text: str) -> Counter:
+    """Term counts of a text: lowercased words, stop words dropped"""
+    counts = Counter(TOKEN_PATTERN.findall(text.lower()))
+    for word in STOP_WORDS.intersection(counts):
+        del counts[word]
+    return counts
+
+
+class TfidfMatrix:
+    """L2-normalized TF-IDF vectors of a set of texts, in CSR and CSC form
+
+    Weights are sublinear term frequency times smoothed inverse document
+    frequency, so a term repeated ten times counts about three times as
+    much as one used once. Row i is texts[i]; rows without any usable term
+    are empty and match nothing.
+    """
+
+    def __init__(self, texts: list[str]):
+        self.vocabulary: dict[str, int] = {}
+        term_ids = []
+        term_counts = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+
+        for row, text in enumerate(texts):
+            counts = tokenize(text)
+            for term in filterfalse(self.vocabulary.__contains__, counts):
+                self.vocabulary[term] = len(self.vocabulary)
+            term_ids.extend(map(self.vocabulary.__getitem__, counts))
+            term_counts.extend(counts.values())
+            lengths[row] = len(counts)
+
+        rows = np.repeat(np.arange(len(texts), dtype=np.int32), lengths)
+        terms = np.array(term_ids, dtype=np.int32)
+        tf = np.array(term_counts, dtype=np.float64)
+
+        n = len(texts)
+        df = np.bincount(terms, minlength=len(self.vocabulary))
+        keep = (df[terms] >= MIN_DOCUMENT_FREQUENCY) & (df[terms] <= max(MIN_DOCUMENT_FREQUENCY, MAX_DOCUMENT_RATIO * n))
+        rows, terms, tf = rows[keep], terms[keep], tf[keep]
+
+        idf = np.log((1 + n) / (1 + df)) + 1
+        weights = (1 + np.log(tf)) * idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+        weights /= norms[rows]
+
+        # Rows: the terms of each text (rows are already grouped, in order)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+        self.indices = terms
+        self.data = weights
+
+        # Columns: the texts containing each term, in row order
+        order = np.argsort(terms, kind='stable')
+        self.col_indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(self.vocabulary)), out=self.col_indptr[1:])
+        self.col_rows = rows[order]
+        self.col_data = weights[order]
+
+        # Dense copy of one row at a time, for exact similarities
+        self.scratch = np.zeros(len(self.vocabulary), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    def similarities(self, row: int, candidates: np.ndarray) -> np.ndarray:
+        """Exact cosine similarity between one row and each candidate row"""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        starts = self.indptr[candidates]
+        lengths = self.indptr[candidates + 1] - starts
+        nonempty = lengths > 0
+        result = np.zeros(len(candidates), dtype=np.float64)
+        if start == end or not nonempty.any():
+            return result
+
+        starts, lengths = starts[nonempty], lengths[nonempty]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)
+
+        self.scratch[self.indices[start:end]] = self.data[start:end]
+        products = self.data[positions] * self.scratch[self.indices[positions]]
+        self.scratch[self.indices[start:end]] = 0.0
+
+        result[nonempty] = np.add.reduceat(products, offsets)
+        return result
+
+    def nearest(
+        self,
+        row: int,
+        limit: int,
+        exclude: np.ndarray = None,
+        min_similarity: float = MIN_SIMILARITY
+    ) -> list[tuple[int, float]]:
+        """Up to `limit` other rows most similar to a row, as (row, similarity), best first
+
+        Only rows sharing one of the row's QUERY_TERMS highest-weighted terms
+        are considered. Their partial dot products over those terms pick the
+        limit * CANDIDATE_FACTOR best, which are then scored exactly. Rows in
+        exclude are never returned.
+        """
+        start, end = self.indptr[row], self.indptr[row + 1]
+        if start == end:
+            return []
+
+        weights = self.data[start:end]
+        top = np.argsort(-weights, kind='stable')[:QUERY_TERMS]
+        query_terms = self.indices[start:end][top]
+        query_weights = weights[top]
+
+        spans = [(self.col_indptr[term], self.col_indptr[term + 1]) for term in query_terms.tolist()]
+        matched = np.concatenate([self.col_rows[a:b] for a, b in spans])
+        contributions = np.concatenate([
+            self.col_data[a:b] * weight for (a, b), weight in zip(spans, query_weights.tolist())
+        ])
+
+        candidates, inverse = np.unique(matched, return_inverse=True)
+        partial = np.bincount(inverse, weights=contributions)
+        partial[candidates == row] = -1.0
+        if exclude is not None and len(exclude):
+            partial[np.isin(candidates, exclude)] = -1.0
+
+        count = min(len(candidates), limit * CANDIDATE_FACTOR)
+        best = np.argpartition(-partial, count - 1)[:count]
+        best = best[partial[best] > 0]
+        scores = self.similarities(row, candidates[best])
+
+        ranked = sorted(
+            (-score, candidate)
+            for candidate, score in zip(candidates[best].tolist(), scores.tolist())
+            if score >= min_similarity
+        )
+        return [(candidate, -score) for score, candidate in ranked[:limit]]
@@ -0,0 +1,85 @@
+import random
+import unittest
+
+import numpy as np
+
+from link_recommender import TfidfMatrix, tokenize
+
+
+TOPICS = [
+    ['python', 'interpreter', 'bytecode', 'generator', 'decorator', 'asyncio'],
+    ['sourdough', 'starter', 'flour', 'hydration', 'crumb', 'oven'],
+    ['marathon', 'tempo', 'interval', 'cadence', 'taper', 'mileage'],
+]
+SHARED = ['guide', 'notes', 'review', 'update', 'example']
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_terms(self):
+        self.assertEqual(tokenize("The link's 3 links, and LINKS 42 x"), {'link': 1, 'links': 2, '42': 1})
+
+
+class TestTfidfMatrix(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(5)
+        cls.texts = [
+            ' '.join(rng.choice(TOPICS[i % 3] + SHARED) for _ in range(rng.randint(20, 60)))
+            for i in range(300)
+        ] + ['', 'unique words nowhere else']
+        cls.matrix = TfidfMatrix(cls.texts)
+
+    def dense(self) -> np.ndarray:
+        rows = np.zeros((len(self.matrix), len(self.matrix.vocabulary)))
+        for row in range(len(self.matrix)):
+            start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+            rows[row, self.matrix.indices[start:end]] = self.matrix.data[start:end]
+        return rows
+
+    def test_normalized_rows(self):
+        norms = np.linalg.norm(self.dense(), axis=1)
+        np.testing.assert_allclose(norms[:300], 1.0)
+        # Rows with no term shared by another text stay empty
+        self.assertEqual(norms[300:].tolist(), [0.0, 0.0])
+
+    def test_columns_match_rows(self):
+        dense = self.dense()
+        for term in range(len(self.matrix.vocabulary)):
+            start, end = self.matrix.col_indptr[term], self.matrix.col_indptr[term + 1]
+            rows = self.matrix.col_rows[start:end]
+            self.assertEqual(rows.tolist(), np.flatnonzero(dense[:, term]).tolist())
+            np.testing.assert_allclose(self.matrix.col_data[start:end], dense[rows, term])
+
+    def test_exact_similarities(self):
+        dense = self.dense()
+        candidates = np.arange(len(self.matrix))
+        for row in (0, 1, 150, 300):
+            with self.subTest(row=row):
+                np.testing.assert_allclose(self.matrix.similarities(row, candidates), dense @ dense[row])
+
+    def test_nearest_same_topic(self):
+        """Neighbours are the most similar other rows, on the same topic, best first"""
+        dense = self.dense()
+        for row in range(0, 300, 7):
+            with self.subTest(row=row):
+                nearest = self.matrix.nearest(row, 5)
+                self.assertEqual(len(nearest), 5)
+                self.assertTrue(all(other % 3 == row % 3 and other != row for other, _ in nearest))
+                scores = [score for _, score in nearest]
+                self.assertEqual(scores, sorted(scores, reverse=True))
+                np.testing.assert_allclose(scores, [dense[row] @ dense[other] for other, _ in nearest])
+
+    def test_exclude(self):
+        first = [other for other, _ in self.matrix.nearest(0, 3)]
+        again = [other for other, _ in self.matrix.nearest(0, 3, exclude=np.array(first))]
+        self.assertFalse(set(first) & set(again))
+
+    def test_empty_rows(self):
+        self.assertEqual(self.matrix.nearest(300, 5), [])
+        self.assertEqual(self.matrix.nearest(301, 5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
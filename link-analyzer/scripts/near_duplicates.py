@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection
+Finds clusters of pages whose main-content text is nearly the same (tag
+archives, paginated lists, syndicated posts). Each text becomes a set of
+word shingles, summarized by a MinHash signature; LSH banding pairs up only
+the signatures likely to be similar, so the work grows with the number of
+pages rather than the number of page pairs.
+"""
+
+from itertools import filterfalse
+
+import numpy as np
+
+
+# Words per shingle
+SHINGLE_WORDS = 5
+
+# Hash functions per signature
+NUM_PERMUTATIONS = 128
+
+# Estimated Jaccard similarity at or above which two pages are near-duplicates
+DEFAULT_THRESHOLD = 0.8
+
+# Chance a pair exactly at the threshold must have of sharing a band
+BAND_RECALL = 0.99
+
+# Shingles hashed per batch: 512 shingles x 128 hashes is 512 KB, small enough to
+# stay in cache (larger batches are slower, not faster)
+BATCH_SHINGLES = 512
+
+# Members of an LSH bucket every other member is compared with: buckets up to this
+# size are compared pairwise, larger ones (runs of identical pages) against their
+# first BUCKET_ANCHORS rows only, which keeps the work linear in the bucket size
+BUCKET_ANCHORS = 64
+
+# Bucket members compared per batch (members x anchors x permutations booleans)
+COMPARE_ROWS = 1024
+
+SEED = 1
+
+
+def lsh_bands(threshold: float, num_permutations: int = NUM_PERMUTATIONS) -> tuple[int, int]:
+    """(bands, rows per band) for a similarity threshold
+
+    Uses the most rows per band (fewest dissimilar candidates) that still
+    makes a pair at the threshold share at least one band with probability
+    BAND_RECALL.
+    """
+    for rows in range(num_permutations, 0, -1):
+        bands = num_permutations // rows
+        if 1 - (1 - threshold ** rows) ** bands >= BAND_RECALL:
+            return bands, rows
+    return num_permutations, 1
+
+
+class MinHashIndex:
+    """MinHash signatures of a set of texts, one row per text
+
+    Texts shorter than SHINGLE_WORDS are one shingle; empty texts get no
+    signature and are never reported.
+    """
+
+    def __init__(self, texts: list[str], num_permutations: int = NUM_PERMUTATIONS, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash functions: high 32 bits of (a * x + b) mod 2**64, a odd
+        self.multipliers = rng.integers(1, 2 ** 63, size=num_permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.increments = rng.integers(0, 2 ** 63, size=num_permutations, dtype=np.uint64)
+
+        self.vocabulary: dict[str, int] = {}
+        self.signatures = np.zeros((len(texts), num_permutations), dtype=np.uint32)
+        self.has_signature = np.zeros(len(texts), dtype=bool)
+
+        batch_rows: list[int] = []
+        batch: list[np.ndarray] = []
+        batch_size = 0
+        for row, text in enumerate(texts):
+            shingles = self.shingles(text)
+            if not len(shingles):
+                continue
+            batch_rows.append(row)
+            batch.append(shingles)
+            batch_size += len(shingles)
+            if batch_size >= BATCH_SHINGLES:
+                self.sign(batch_rows, batch)
+                batch_rows, batch, batch_size = [], [], 0
+        if batch:
+            self.sign(batch_rows, batch)
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """64-bit hashes of every run of SHINGLE_WORDS consecutive lowercased words"""
+        words = text.lower().split()
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+
+        for word in filterfalse(self.vocabulary.__contains__, words):
+            self.vocabulary[word] = len(self.vocabulary)
+        ids = np.fromiter(map(self.vocabulary.__getitem__, words), dtype=np.uint64, count=len(words))
+
+        width = min(SHINGLE_WORDS, len(ids))
+        with np.errstate(over='ignore'):
+            hashes = ids[:len(ids) - width + 1].copy()
+            for offset in range(1, width):
+                hashes = hashes * np.uint64(0x100000001b3) + ids[offset:len(ids) - width + 1 + offset]
+            # Spread the bits (splitmix64 finalizer) so nearby IDs hash far apart
+            hashes ^= hashes >> np.uint64(30)
+            hashes *= np.uint64(0xbf58476d1ce4e5b9)
+            hashes ^= hashes >> np.uint64(27)
+        return hashes
+
+    def sign(self, rows: list[int], shingles: list[np.ndarray]) -> None:
+        """Minimum of every hash function over each text's shingles"""
+        lengths = np.array([len(s) for s in shingles])
+        hashed = np.multiply(np.concatenate(shingles)[:, None], self.multipliers)
+        np.add(hashed, self.increments, out=hashed)
+        np.right_shift(hashed, np.uint64(32), out=hashed)
+        self.signatures[rows] = np.minimum.reduceat(hashed, np.cumsum(lengths) - lengths, axis=0)
+        self.has_signature[rows] = True
+
+    def similarity(self, row: int, others: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity of one text's shingles to each of others'"""
+        return (self.signatures[others] == self.signatures[row]).mean(axis=1)
+
+    def clusters(self, threshold: float = DEFAULT_THRESHOLD) -> list[list[tuple[int, float]]]:
+        """Groups of rows whose texts are near-duplicates, largest first
+
+        Rows sharing a band are compared pairwise (with the bucket's first
+        BUCKET_ANCHORS rows in larger buckets) and linked when at least
+        threshold alike; clusters are the connected groups. Links chain (A~B and B~C puts
+        A and C together however alike they are), so each row carries its
+        best similarity over the links that placed it, which is always at
+        least threshold. Each cluster is its first row followed by the others.
+        """
+        rows = np.flatnonzero(self.has_signature)
+        bands, band_rows = lsh_bands(threshold, self.signatures.shape[1])
+        parent = list(range(len(self)))
+        best = np.zeros(len(self))
+
+        def find(row: int) -> int:
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        for band in range(bands):
+            # One 64-bit key per row for the band's values (a collision only costs a comparison)
+            keys = np.zeros(len(rows), dtype=np.uint64)
+            with np.errstate(over='ignore'):
+                for column in range(band * band_rows, (band + 1) * band_rows):
+                    keys = keys * np.uint64(0x100000001b3) + self.signatures[rows, column]
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            ends = np.r_[starts[1:], len(order)]
+            for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+                members = rows[order[start:end]]
+                anchors = members[:BUCKET_ANCHORS]
+                anchor_signatures = self.signatures[anchors]
+                for offset in range(1, len(members), COMPARE_ROWS):
+                    batch = members[offset:offset + COMPARE_ROWS]
+                    similarities = (self.signatures[batch][:, None, :] == anchor_signatures).mean(axis=2)
+                    # Each pair once: a member against the anchors before it
+                    positions = np.arange(offset, offset + len(batch))
+                    linked = (similarities >= threshold) & (np.arange(len(anchors)) < positions[:, None])
+                    member_index, anchor_index = np.nonzero(linked)
+                    if not len(member_index):
+                        continue
+                    np.maximum.at(best, batch[member_index], similarities[linked])
+                    np.maximum.at(best, anchors[anchor_index], similarities[linked])
+                    for member, anchor in zip(batch[member_index].tolist(), anchors[anchor_index].tolist()):
+                        member_root, anchor_root = find(member), find(anchor)
+                        if member_root != anchor_root:
+                            parent[member_root] = anchor_root
+
+        groups: dict[int, list[int]] = {}
+        for row in rows.tolist():
+            groups.setdefault(find(row), []).append(row)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            clusters.append([(row, float(best[row])) for row in members])
+        clusters.sort(key=lambda cluster: (-len(cluster), cluster[0][0]))
+        return clusters
@@ -0,0 +1,126 @@
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from near_duplicates import SHINGLE_WORDS, MinHashIndex, lsh_bands
+
+
+def shingle_set(text: str) -> set[tuple[str, ...]]:
+    words = text.lower().split()
+    width = min(SHINGLE_WORDS, len(words))
+    return {tuple(words[i:i + width]) for i in range(len(words) - width + 1)}
+
+
+def jaccard(a: str, b: str) -> float:
+    first, second = shingle_set(a), shingle_set(b)
+    return len(first & second) / len(first | second)
+
+
+def edit(text: str, rng: random.Random, changes: int, vocabulary: list[str]) -> str:
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return ' '.join(words)
+
+
+class TestLSHBands(unittest.TestCase):
+
+    def test_bands_fit_signature(self):
+        for threshold in (0.5, 0.8, 0.9, 0.95):
+            with self.subTest(threshold=threshold):
+                bands, rows = lsh_bands(threshold)
+                self.assertLessEqual(bands * rows, 128)
+                self.assertGreaterEqual(1 - (1 - threshold ** rows) ** bands, 0.99)
+        # Stricter thresholds need fewer, longer bands
+        self.assertGreater(lsh_bands(0.9)[1], lsh_bands(0.5)[1])
+
+
+class TestMinHashIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(11)
+        cls.vocabulary = [f"word{n}" for n in range(2000)]
+        cls.originals = [' '.join(rng.choice(cls.vocabulary) for _ in range(200)) for _ in range(200)]
+        # Pages 200-219 are lightly edited copies of pages 0-19, 220-222 exact copies of page 50
+        cls.texts = cls.originals + [
+            edit(cls.originals[i], rng, 3, cls.vocabulary) for i in range(20)
+        ] + [cls.originals[50].upper()] * 3 + ['', 'too short']
+        cls.index = MinHashIndex(cls.texts)
+
+    def test_estimates_jaccard(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            original = rng.randrange(200)
+            copy = edit(self.originals[original], rng, rng.randint(0, 40), self.vocabulary)
+            index = MinHashIndex([self.originals[original], copy])
+            with self.subTest(original=original):
+                self.assertAlmostEqual(index.similarity(0, np.array([1]))[0],
+                                       jaccard(self.originals[original], copy), delta=0.15)
+
+    def test_clusters(self):
+        clusters = self.index.clusters(0.8)
+        self.assertEqual([[row for row, _ in cluster] for cluster in clusters],
+                         [[50, 220, 221, 222]] + [[i, 200 + i] for i in range(20)])
+        self.assertEqual([similarity for _, similarity in clusters[0]], [1.0, 1.0, 1.0, 1.0])
+        for cluster in clusters[1:]:
+            self.assertGreaterEqual(cluster[1][1], 0.8)
+
+    def test_chained_matches_report_best_link(self):
+        """A~B and B~C group A with C even below the threshold; each keeps the similarity that linked it"""
+        rng = random.Random(0)
+        others = [' '.join(rng.choice(self.vocabulary) for _ in range(200)) for _ in range(5)]
+        words = ' '.join(rng.choice(self.vocabulary) for _ in range(200)).split()
+        chain = [' '.join(words)]
+        for positions in ((20, 50, 80), (120, 150, 180)):
+            for position in positions:
+                words[position] = rng.choice(self.vocabulary)
+            chain.append(' '.join(words))
+        index = MinHashIndex(chain + others)
+
+        a_b, a_c = index.similarity(0, np.array([1, 2])).tolist()
+        b_c = index.similarity(1, np.array([2]))[0]
+        self.assertLess(a_c, 0.8)
+        self.assertEqual(index.clusters(0.8), [[(0, a_b), (1, max(a_b, b_c)), (2, b_c)]])
+
+    def test_pair_behind_bucket_first_row(self):
+        """Rows 1 and 2 are near-duplicates that share a band bucket only with dissimilar row 0"""
+        bands, band_rows = lsh_bands(0.8)
+        rng = np.random.default_rng(7)
+        index = MinHashIndex(['x', 'y', 'z'])
+        index.signatures = rng.integers(0, 2 ** 32, size=(3, 128), dtype=np.uint64).astype(np.uint32)
+        index.signatures[1, :band_rows] = index.signatures[0, :band_rows]
+        index.signatures[2] = index.signatures[1]
+        # One differing value in every other band: no bucket holds rows 1 and 2 alone
+        for band in range(1, bands):
+            index.signatures[2, band * band_rows] += 1
+
+        similarity = index.similarity(1, np.array([2]))[0]
+        self.assertEqual(similarity, (128 - (bands - 1)) / 128)
+        self.assertTrue((index.similarity(0, np.array([1, 2])) < 0.8).all())
+        self.assertEqual(index.clusters(0.8), [[(1, similarity), (2, similarity)]])
+
+    def test_large_bucket(self):
+        """Buckets past BUCKET_ANCHORS rows are compared against their first rows and still cluster"""
+        texts = [self.originals[0]] * 10 + [self.originals[1]]
+        with mock.patch('near_duplicates.BUCKET_ANCHORS', 3), mock.patch('near_duplicates.COMPARE_ROWS', 4):
+            clusters = MinHashIndex(texts).clusters()
+        self.assertEqual(clusters, [[(row, 1.0) for row in range(10)]])
+
+    def test_lower_threshold_finds_looser_copies(self):
+        rng = random.Random(5)
+        texts = [self.originals[0], edit(self.originals[0], rng, 12, self.vocabulary), self.originals[1]]
+        self.assertLess(jaccard(texts[0], texts[1]), 0.8)
+        self.assertEqual(MinHashIndex(texts).clusters(0.8), [])
+        self.assertEqual([row for row, _ in MinHashIndex(texts).clusters(0.5)[0]], [0, 1])
+
+    def test_empty_and_short_texts(self):
+        self.assertFalse(self.index.has_signature[223])
+        self.assertTrue(self.index.has_signature[224])
+        self.assertEqual(MinHashIndex(['a b', 'a b', '']).clusters(), [[(0, 1.0), (1, 1.0)]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,19 +12,29 @@ from urllib.parse import urlparse
 from collections import defaultdict, Counter
 from glob import glob
 
-from bs4 import BeautifulSoup
-
 # Add shared modules to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
 from config_loader import load_json_config
 from utils import save_json, timestamp
+from extractor import DEFAULT_EXTRACTOR, EXTRACTORS, PageRecord, extract_page, extract_site
+from extract_cache import ExtractionCache
 
 
 class OutboundLinksAnalyzer:
     """Analyze outbound links in static site"""
 
-    def __init__(self, dist_path: Path, internal_domains: list[str]):
+    def __init__(
+        self,
+        dist_path: Path,
+        internal_domains: list[str],
+        workers: int = None,
+        cache: ExtractionCache = None,
+        extractor: str = DEFAULT_EXTRACTOR
+    ):
         self.dist_path = dist_path
+        self.workers = workers
+        self.cache = cache
+        self.extractor = extractor
         self.internal_domains = [d.lower() for d in internal_domains]
         self.outbound_links: dict[str, list[str]] = defaultdict(list)
         self.link_counts: Counter = Counter()
@@ -93,36 +103,25 @@ class OutboundLinksAnalyzer:
 
     def extract_links_from_file(self, file_path: Path) -> list[str]:
         """Extract all outbound links from HTML file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            soup = BeautifulSoup(content, 'html.parser')
-            links = []
+        return self.outbound_links_from_page(extract_page(file_path, self.dist_path, self.extractor))
 
-            for a_tag in soup.find_all('a', href=True):
-                href = a_tag['href']
-                if self.is_outbound_link(href):
-                    links.append(href)
-
-            return links
-
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}", file=sys.stderr)
-            return []
+    def outbound_links_from_page(self, page: PageRecord) -> list[str]:
+        """Select the outbound links from an extracted page record"""
+        return [link.href for link in page.links if self.is_outbound_link(link.href)]
 
     def get_relative_path(self, file_path: Path) -> str:
         """Get relative path from dist folder"""
         return str(file_path.relative_to(self.dist_path))
 
-    def analyze(self) -> dict:
-        """Analyze all HTML files"""
-        html_files = list(self.dist_path.glob('**/*.html'))
-        print(f"Found {len(html_files)} HTML files to analyze...")
+    def analyze(self, pages: list[PageRecord] = None) -> dict:
+        """Analyze all HTML files (or pre-extracted page records)"""
+        if pages is None:
+            pages = extract_site(self.dist_path, self.workers, self.cache, self.extractor)
+        print(f"Found {len(pages)} HTML files to analyze...")
 
-        for i, file_path in enumerate(html_files, 1):
-            links = self.extract_links_from_file(file_path)
-            relative_path = self.get_relative_path(file_path)
+        for page in pages:
+            links = self.outbound_links_from_page(page)
+            relative_path = page.path
 
             for link in links:
                 self.outbound_links[link].append(relative_path)
@@ -142,15 +141,12 @@ class OutboundLinksAnalyzer:
                         if link not in self.domains[f"{protocol}:"]:
                             self.domains[f"{protocol}:"].append(link)
 
-            if i % 100 == 0:
-                print(f"Processed {i}/{len(html_files)} files...")
-
         print(f"Analysis complete. Found {len(self.link_counts)} unique outbound links.")
 
         return {
             "metadata": {
                 "analyzed_at": timestamp(),
-                "files_analyzed": len(html_files),
+                "files_analyzed": len(pages),
                 "unique_links": len(self.link_counts),
                 "unique_domains": len(self.domains),
                 "total_link_occurrences": sum(self.link_counts.values())
@@ -168,6 +164,9 @@ def main():
     parser.add_argument("--config", help="Path to config.json")
     parser.add_argument("--output", "-o", help="Output file path")
     parser.add_argument("--domains", nargs="+", help="Internal domains to exclude")
+    parser.add_argument("--workers", "-w", type=int, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--extractor", choices=list(EXTRACTORS), default=DEFAULT_EXTRACTOR,
+                        help="Link extraction backend")
 
     args = parser.parse_args()
 
@@ -192,7 +191,12 @@ def main():
         sys.exit(1)
 
     # Run analysis
-    analyzer = OutboundLinksAnalyzer(dist_path, internal_domains)
+    analyzer = OutboundLinksAnalyzer(
+        dist_path,
+        internal_domains,
+        workers=args.workers,
+        extractor=args.extractor
+    )
     results = analyzer.analyze()
 
     # Output
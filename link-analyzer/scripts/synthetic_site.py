@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Synthetic Site Generator
+Writes a deterministic static site for benchmarking: a configurable number
+of pages whose internal links follow a power-law (a few hub pages receive
+most links), a share of outbound links to external domains, links into
+excluded paths and assets, and a few broken internal links and orphans.
+Each page's text mixes shared words with the vocabulary of one of a set of
+topics, so pages on the same topic read alike.
+"""
+
+import sys
+import json
+import random
+import argparse
+import itertools
+from bisect import bisect_left
+from pathlib import Path
+
+
+SECTIONS = ['blog', 'guides', 'docs', 'reviews', 'news']
+
+WORDS = (
+    "link graph page content static site search engine crawl index anchor "
+    "internal external audit report metric equity depth orphan hub sink "
+    "build deploy review guide example reference update archive topic"
+).split()
+
+# Topic vocabularies: made-up words built from syllables, so topics never share one
+TOPICS = 200
+TOPIC_WORDS = 20
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pu']
+
+ASSETS = ['/assets/site.css', '/assets/app.js', '/assets/logo.svg', '/assets/hero.png', '/feed.xml']
+
+SITE_CONFIG_FILENAME = "site.json"
+
+
+class PowerLaw:
+    """Draws indices 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent"""
+
+    def __init__(self, n: int, exponent: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate((rank + 1) ** -exponent for rank in range(n)))
+        self.total = self.cumulative[-1]
+
+    def draw(self) -> int:
+        return bisect_left(self.cumulative, self.rng.random() * self.total)
+
+
+def page_url(index: int) -> str:
+    """URL of page index (page 0 is the homepage)"""
+    if index == 0:
+        return '/'
+    return f"/{SECTIONS[index % len(SECTIONS)]}/page-{index}/"
+
+
+def topic_vocabulary(index: int) -> list[str]:
+    """Words page index writes with: a third shared, the rest its topic's own
+
+    Always as long as WORDS, so drawing from it consumes the random stream
+    exactly like drawing from WORDS (the link structure does not depend on it).
+    """
+    topic = index % TOPICS
+    words = []
+    for number in range(topic * TOPIC_WORDS, (topic + 1) * TOPIC_WORDS):
+        digits = f"{number:04d}"
+        words.append(''.join(SYLLABLES[int(digit)] for digit in digits))
+    return WORDS[:len(WORDS) - TOPIC_WORDS] + words
+
+
+def sentence(rng: random.Random, words: int, vocabulary: list[str] = WORDS) -> str:
+    return ' '.join(rng.choice(vocabulary) for _ in range(words)).capitalize() + '.'
+
+
+def render_page(index: int, links: list[tuple[str, str]], rng: random.Random) -> str:
+    """HTML for one page: head with assets, nav, and paragraphs carrying the links"""
+    section = SECTIONS[index % len(SECTIONS)]
+    vocabulary = topic_vocabulary(index)
+    paragraphs = []
+    for start in range(0, len(links), 3):
+        anchors = ' '.join(f'<a href="{href}">{text}</a>' for href, text in links[start:start + 3])
+        paragraphs.append(f"    <p>{sentence(rng, 12, vocabulary)} {anchors} {sentence(rng, 8, vocabulary)}</p>")
+    if not paragraphs:
+        paragraphs.append(f"    <p>{sentence(rng, 20, vocabulary)}</p>")
+
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        "<head>",
+        '  <meta charset="UTF-8">',
+        f"  <title>Page {index}</title>",
+        f'  <link rel="stylesheet" href="{ASSETS[0]}">',
+        f'  <script src="{ASSETS[1]}"></script>',
+        "</head>",
+        "<body>",
+        "  <nav>",
+        '    <a href="/">Home</a>',
+        f'    <a href="/{section}/">{section.capitalize()}</a>',
+        "  </nav>",
+        "  <main>",
+        f"    <h1>Page {index}</h1>",
+        f'    <img src="{ASSETS[3]}" alt="">',
+        *paragraphs,
+        "  </main>",
+        "</body>",
+        "</html>",
+        ""
+    ])
+
+
+def generate_site(
+    dist_path: Path,
+    pages: int = 1000,
+    seed: int = 0,
+    avg_links: int = 20,
+    exponent: float = 1.1,
+    outbound_ratio: float = 0.1,
+    external_domains: int = 200,
+    excluded_ratio: float = 0.05,
+    broken_ratio: float = 0.005,
+    orphan_ratio: float = 0.01
+) -> dict:
+    """Write a synthetic site to dist_path; the same arguments always produce the same site
+
+    Section index pages and assets are written too, so they resolve as
+    internal links. Returns the generation parameters and totals.
+    """
+    rng = random.Random(seed)
+    targets = PowerLaw(pages, exponent, rng)
+    domains = PowerLaw(external_domains, exponent, rng)
+    orphans = set(rng.sample(range(1, pages), int((pages - 1) * orphan_ratio))) if pages > 1 else set()
+
+    totals = {'internal': 0, 'outbound': 0, 'excluded': 0, 'broken': 0}
+    for index in range(pages):
+        vocabulary = topic_vocabulary(index)
+        links = []
+        for _ in range(max(0, int(rng.gauss(avg_links, avg_links / 4)))):
+            roll = rng.random()
+            if roll < outbound_ratio:
+                domain = domains.draw()
+                href = f"https://site-{domain}.example.com/article-{rng.randrange(50)}/"
+                totals['outbound'] += 1
+            elif roll < outbound_ratio + excluded_ratio:
+                href = rng.choice([f"/tag/{rng.choice(WORDS)}/", *ASSETS[2:]])
+                totals['excluded'] += 1
+            elif roll < outbound_ratio + excluded_ratio + broken_ratio:
+                href = f"/missing/page-{rng.randrange(pages)}/"
+                totals['broken'] += 1
+            else:
+                target = targets.draw()
+                if target in orphans:
+                    continue
+                href = page_url(target)
+                totals['internal'] += 1
+            links.append((href, sentence(rng, 3, vocabulary)))
+
+        file_path = dist_path / page_url(index).lstrip('/') / 'index.html'
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(render_page(index, links, rng), encoding='utf-8')
+
+    for section in SECTIONS:
+        index_path = dist_path / section / 'index.html'
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_text(render_page(0, [('/', 'Home')], rng), encoding='utf-8')
+
+    for asset in ASSETS:
+        asset_path = dist_path / asset.lstrip('/')
+        asset_path.parent.mkdir(parents=True, exist_ok=True)
+        asset_path.write_text(f"/* {asset} */\n", encoding='utf-8')
+
+    site = {
+        "pages": pages,
+        "seed": seed,
+        "avg_links": avg_links,
+        "exponent": exponent,
+        "outbound_ratio": outbound_ratio,
+        "external_domains": external_domains,
+        "excluded_ratio": excluded_ratio,
+        "broken_ratio": broken_ratio,
+        "orphan_ratio": orphan_ratio,
+        "orphans": len(orphans),
+        "links": totals
+    }
+    with open(dist_path / SITE_CONFIG_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(site, f, indent=2)
+    return site
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic Site Generator")
+    parser.add_argument("--output", "-o", required=True, help="Directory to write the site to (must be empty or absent)")
+    parser.add_argument("--pages", "-n", type=int, default=1000, help="Number of pages")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--avg-links", type=int, default=20, help="Average links per page")
+    parser.add_argument("--exponent", type=float, default=1.1, help="Power-law exponent of inbound links")
+    parser.add_argument("--outbound-ratio", type=float, default=0.1, help="Share of links to external sites")
+    parser.add_argument("--excluded-ratio", type=float, default=0.05, help="Share of links to tags and assets")
+    parser.add_argument("--broken-ratio", type=float, default=0.005, help="Share of broken internal links")
+    parser.add_argument("--orphan-ratio", type=float, default=0.01, help="Share of pages nothing links to")
+
+    args = parser.parse_args()
+
+    dist_path = Path(args.output)
+    if dist_path.exists() and any(dist_path.iterdir()):
+        print(f"Error: Directory not empty: {dist_path}", file=sys.stderr)
+        sys.exit(1)
+
+    site = generate_site(
+        dist_path,
+        pages=args.pages,
+        seed=args.seed,
+        avg_links=args.avg_links,
+        exponent=args.exponent,
+        outbound_ratio=args.outbound_ratio,
+        excluded_ratio=args.excluded_ratio,
+        broken_ratio=args.broken_ratio,
+        orphan_ratio=args.orphan_ratio
+    )
+    print(f"Generated {site['pages']} pages in {dist_path}")
+    for kind, count in site['links'].items():
+        print(f"  {kind} links: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Trigram Index
+Character-trigram index over page URLs for "did you mean" lookups: finds
+the existing URLs most similar to a broken one without comparing it against
+every page. Similarity is the Jaccard index of the two trigram sets (as in
+PostgreSQL's pg_trgm).
+"""
+
+import math
+import urllib.parse
+
+import numpy as np
+
+
+# Suggestions less similar than this are noise
+MIN_SIMILARITY = 0.3
+
+# Trigrams in at least this share of URLs also get a dense membership mask
+DENSE_FRACTION = 0.03
+
+
+def url_key(url: str) -> str:
+    """Form URLs are compared in: decoded, lowercased, no query or fragment, no index.html"""
+    url = urllib.parse.unquote(url.split('#')[0].split('?')[0]).lower()
+    if url.endswith('index.html'):
+        url = url[:-len('index.html')]
+    elif url.endswith('.html'):
+        url = url[:-len('.html')]
+    path = url.strip('/')
+    return f'/{path}/' if path else '/'
+
+
+def trigrams(key: str) -> set[str]:
+    """Every three-character substring of a key"""
+    return {key[i:i + 3] for i in range(len(key) - 2)} or {key}
+
+
+class TrigramIndex:
+    """Postings array per trigram over a fixed set of URLs"""
+
+    def __init__(self, urls: list[str]):
+        self.urls = list(dict.fromkeys(urls))
+        self.keys = [url_key(url) for url in self.urls]
+        # Trigram -> sorted IDs of the URLs containing it
+        postings: dict[str, list[int]] = {}
+        sizes = []
+        for url_id, key in enumerate(self.keys):
+            key_trigrams = trigrams(key)
+            sizes.append(len(key_trigrams))
+            for trigram in key_trigrams:
+                postings.setdefault(trigram, []).append(url_id)
+        self.postings = {trigram: np.array(ids, dtype=np.int32) for trigram, ids in postings.items()}
+        # Number of distinct trigrams per key
+        self.sizes = np.array(sizes, dtype=np.int32)
+        # Trigram -> membership mask by URL ID, for the most common trigrams
+        self.dense: dict[str, np.ndarray] = {}
+        for trigram, ids in self.postings.items():
+            if len(ids) >= max(64, DENSE_FRACTION * len(self.urls)):
+                self.dense[trigram] = np.zeros(len(self.urls), dtype=bool)
+                self.dense[trigram][ids] = True
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def closest(self, url: str, limit: int = 3, min_similarity: float = MIN_SIMILARITY) -> list[dict]:
+        """Up to `limit` indexed URLs at least min_similarity alike, best first
+
+        A URL with similarity s shares at least s * |query| trigrams with the
+        query, so it must contain one of the rarest (indexed) query trigrams
+        but ceil(s * |query|) - 1. Those postings, and every other short
+        one, are counted; the common trigrams nearly every page has (/blog/,
+        -the-) are instead looked up for the candidates alone in their
+        membership masks, so every candidate's similarity is exact.
+        """
+        query = trigrams(url_key(url))
+        indexed = sorted((t for t in query if t in self.postings), key=lambda t: len(self.postings[t]))
+        rarest = len(indexed) - math.ceil(min_similarity * len(query)) + 1
+        if rarest <= 0:
+            return []
+
+        scanned = max(rarest, sum(t not in self.dense for t in indexed))
+        candidates, shared = np.unique(
+            np.concatenate([self.postings[t] for t in indexed[:scanned]]), return_counts=True
+        )
+        for trigram in indexed[scanned:]:
+            shared += self.dense[trigram][candidates]
+
+        scores = shared / (len(query) + self.sizes[candidates] - shared)
+        if len(scores) > limit:
+            # Everything tied with the limit-th best score, so ties break by URL
+            threshold = max(min_similarity, np.partition(scores, -limit)[-limit])
+        else:
+            threshold = min_similarity
+        selected = np.flatnonzero(scores >= threshold)
+
+        ranked = sorted(
+            (-score, self.urls[url_id])
+            for url_id, score in zip(candidates[selected].tolist(), scores[selected].tolist())
+        )
+        return [{'url': candidate, 'similarity': round(-score, 3)} for score, candidate in ranked[:limit]]
@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from trigram_index import MIN_SIMILARITY, TrigramIndex, trigrams, url_key
+
+
+WORDS = ['the', 'guide', 'to', 'python', 'links', 'static', 'site', 'build', 'seo', 'how', 'fix', 'broken']
+
+
+def brute_force(urls: list[str], url: str, limit: int = 3) -> list[dict]:
+    query = trigrams(url_key(url))
+    scored = []
+    for candidate in urls:
+        other = trigrams(url_key(candidate))
+        similarity = len(query & other) / len(query | other)
+        if similarity >= MIN_SIMILARITY:
+            scored.append((-similarity, candidate))
+    return [{'url': candidate, 'similarity': round(-score, 3)} for score, candidate in sorted(scored)[:limit]]
+
+
+class TestURLKey(unittest.TestCase):
+
+    def test_equivalent_forms(self):
+        for url in ['/Blog/Post/', '/blog/post', '/blog/post/index.html', '/blog/post.html', '/blog/post/?a=1#top']:
+            with self.subTest(url=url):
+                self.assertEqual(url_key(url), '/blog/post/')
+        self.assertEqual(url_key('/'), '/')
+        self.assertEqual(url_key('/caf%C3%A9/'), '/café/')
+
+
+class TestClosest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(7)
+        cls.urls = ['/'] + [
+            f"/{rng.choice(['blog', 'docs', 'tags'])}/{'-'.join(rng.sample(WORDS, rng.randint(1, 4)))}-{n}/"
+            for n in range(3000)
+        ]
+        cls.index = TrigramIndex(cls.urls)
+        cls.rng = rng
+
+    def test_typo_finds_original(self):
+        url = self.urls[42]
+        typo = url[:8] + url[9:]
+        self.assertEqual(self.index.closest(typo)[0]['url'], url)
+        self.assertEqual(self.index.closest(url)[0], {'url': url, 'similarity': 1.0})
+
+    def test_matches_brute_force(self):
+        """Same top matches, scores and tie order as scoring every URL"""
+        for _ in range(200):
+            url = self.rng.choice(self.urls)
+            edit = self.rng.randrange(len(url))
+            query = self.rng.choice([
+                url[:edit] + url[edit + 1:],
+                url[:edit] + self.rng.choice('aeiou-/') + url[edit:],
+                url.replace('/blog/', '/posts/'),
+                '/' + url.split('/')[-2] + '/',
+            ])
+            with self.subTest(query=query):
+                self.assertEqual(self.index.closest(query), brute_force(self.urls, query))
+
+    def test_nothing_similar(self):
+        self.assertEqual(self.index.closest('/zzqqxx/'), [])
+        self.assertEqual(TrigramIndex([]).closest('/blog/'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
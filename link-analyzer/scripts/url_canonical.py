@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+URL Canonicalization
+Collapses variants of the same outbound URL (host case, default ports,
+fragments, tracking parameters, optionally trailing slashes) so each is
+checked once, then fans the verdict back out to every original URL.
+"""
+
+from fnmatch import fnmatch
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from http_common import DEFAULT_PORTS, build_result
+
+
+# Query parameters that only track the click, never change the page
+# (shell-style patterns, matched case-insensitively)
+DEFAULT_TRACKING_PARAMS = [
+    'utm_*', 'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'igshid', 'mkt_tok'
+]
+
+
+def is_tracking_param(name: str, tracking_params: list[str]) -> bool:
+    name = name.lower()
+    return any(fnmatch(name, pattern) for pattern in tracking_params)
+
+
+def canonicalize(
+    url: str,
+    tracking_params: list[str] = (),
+    collapse_trailing_slash: bool = False
+) -> str:
+    """Canonical form of a URL: case-fold scheme/host, drop default port and fragment
+
+    Optionally also drops tracking query parameters and a trailing slash.
+    Userinfo is kept as written. URLs without a host (mailto:, tel:,
+    unparsable) are returned unchanged.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+
+    # IPv6 literals keep their brackets
+    netloc = f"[{host}]" if ':' in host else host
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        netloc += f":{port}"
+    userinfo, at, _ = parts.netloc.rpartition('@')
+    if at:
+        netloc = f"{userinfo}@{netloc}"
+
+    path = parts.path or '/'
+    if collapse_trailing_slash and len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    query = parts.query
+    if tracking_params and query:
+        pairs = parse_qsl(query, keep_blank_values=True)
+        kept = [(name, value) for name, value in pairs if not is_tracking_param(name, tracking_params)]
+        if len(kept) != len(pairs):
+            query = urlencode(kept)
+
+    return urlunsplit((parts.scheme.lower(), netloc, path, query, ''))
+
+
+def group_by_canonical(
+    urls_with_info: dict[str, dict],
+    tracking_params: list[str] = (),
+    collapse_trailing_slash: bool = False
+) -> tuple[dict[str, dict], dict[str, list[str]]]:
+    """Merge URLs that share a canonical form
+
+    Returns (canonical_with_info, variants): the canonical URLs to check with
+    their occurrences and pages combined, and each canonical URL's originals.
+    """
+    canonical_with_info = {}
+    variants = {}
+    for url, info in urls_with_info.items():
+        canonical = canonicalize(url, tracking_params, collapse_trailing_slash)
+        if canonical not in canonical_with_info:
+            canonical_with_info[canonical] = {'count': 0, 'pages': []}
+            variants[canonical] = []
+        merged = canonical_with_info[canonical]
+        merged['count'] += info.get('count', 1)
+        merged['pages'].extend(info.get('pages', []))
+        variants[canonical].append(url)
+
+    for canonical, originals in variants.items():
+        if len(originals) > 1:
+            merged = canonical_with_info[canonical]
+            merged['pages'] = list(dict.fromkeys(merged['pages']))
+    return canonical_with_info, variants
+
+
+def fan_out(
+    results: Iterable[dict],
+    variants: dict[str, list[str]],
+    urls_with_info: dict[str, dict]
+) -> Iterator[dict]:
+    """One result per original URL, carrying its canonical URL's verdict"""
+    for result in results:
+        canonical = result['url']
+        for url in variants.get(canonical, [canonical]):
+            yield {
+                **build_result(url, urls_with_info.get(url, {}), result['status_code'],
+                               result['status_message'], result['is_broken']),
+                'canonical_url': canonical
+            }
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Site Watcher
+Watch mode for analyze.py: keeps the internal link graph in memory, polls
+dist_path for changed HTML files, re-extracts only those pages, patches the
+forward and reverse adjacency in place, and re-emits the orphan, under-linked
+and broken internal link summaries after every rebuild.
+"""
+
+import sys
+import time
+from pathlib import Path, PurePosixPath
+
+# Add shared modules to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "shared"))
+from utils import save_json, timestamp
+from extractor import DEFAULT_EXTRACTOR, PageRecord, extract_changed_page, extract_site
+from extract_cache import ExtractionCache
+from internal_links import InternalLinksChecker, scan_tree, tree_index
+from link_graph import LinkGraphAnalyzer
+
+
+WATCH_SUMMARY_FILENAME = "watch_summary.json"
+
+POLL_INTERVAL = 0.5
+
+
+class IncrementalLinkGraph(LinkGraphAnalyzer):
+    """Link graph whose adjacency is patched page by page instead of rebuilt"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Unique targets per crawled page (forward), and sources per page (reverse)
+        self.forward: dict[int, tuple[int, ...]] = {}
+        self.reverse: list[set[int]] = []
+        # Relative file path -> page ID of every crawled page
+        self.page_ids: dict[str, int] = {}
+
+    def intern(self, url: str) -> int:
+        page_id = super().intern(url)
+        if page_id == len(self.reverse):
+            self.reverse.append(set())
+        return page_id
+
+    def set_targets(self, source_id: int, targets: tuple[int, ...]) -> None:
+        """Replace a page's outbound links, patching the reverse adjacency"""
+        previous = self.forward.get(source_id, ())
+        for target_id in set(previous).difference(targets):
+            self.reverse[target_id].discard(source_id)
+        for target_id in set(targets).difference(previous):
+            self.reverse[target_id].add(source_id)
+        self.forward[source_id] = targets
+
+    def update_page(self, page: PageRecord) -> None:
+        """Add or re-read one crawled page"""
+        source_url = self.file_path_to_url(self.dist_path / page.path)
+        if self.is_excluded(source_url):
+            return
+
+        source_id = self.intern(source_url)
+        self.page_ids[page.path] = source_id
+        targets = ()
+        if not page.error:
+            links = self.internal_links_from(page.links)
+            targets = tuple(self.intern(link) for link in dict.fromkeys(links))
+        self.set_targets(source_id, targets)
+
+    def remove_page(self, path: str) -> None:
+        """Drop a deleted page and its outbound links"""
+        source_id = self.page_ids.pop(path, None)
+        if source_id is None:
+            return
+        self.set_targets(source_id, ())
+        del self.forward[source_id]
+
+    def find_orphans(self) -> list[str]:
+        """Crawled pages with zero inbound links (homepage excluded)"""
+        return sorted(
+            self.urls[i] for i in self.forward
+            if not self.reverse[i] and self.urls[i] != '/'
+        )
+
+    def find_underlinked(self, threshold: int = 3) -> list[dict]:
+        """Pages with fewer than threshold inbound links"""
+        selected = sorted(
+            (len(sources), page_id) for page_id, sources in enumerate(self.reverse)
+            if 0 < len(sources) < threshold
+        )
+        return [
+            {
+                'url': self.urls[page_id],
+                'inbound': inbound,
+                'inbound_from': self.first_urls(self.reverse[page_id])
+            }
+            for inbound, page_id in selected
+        ]
+
+
+class IncrementalLinksChecker(InternalLinksChecker):
+    """Broken internal links, re-checked only where pages or files changed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Checked internal links per page, the pages using each link, and broken links per page
+        self.links_by_page: dict[str, list[str]] = {}
+        self.pages_by_link: dict[str, set[str]] = {}
+        self.broken_by_source: dict[str, list[str]] = {}
+
+    def refresh_page(self, path: str) -> None:
+        broken = [link for link in self.links_by_page[path] if not self.check_link_exists(link)[0]]
+        if broken:
+            self.broken_by_source[path] = broken
+        else:
+            self.broken_by_source.pop(path, None)
+
+    def update_page(self, page: PageRecord) -> None:
+        """Add or re-read one page's internal links"""
+        self.remove_page(page.path)
+        if page.error:
+            return
+
+        links = [link for link in self.filter_internal_links(page.hrefs) if not self.is_excluded(link)]
+        self.links_by_page[page.path] = links
+        for link in set(links):
+            self.pages_by_link.setdefault(link, set()).add(page.path)
+        self.refresh_page(page.path)
+
+    def remove_page(self, path: str) -> None:
+        for link in set(self.links_by_page.pop(path, ())):
+            sources = self.pages_by_link[link]
+            sources.discard(path)
+            if not sources:
+                del self.pages_by_link[link]
+        self.broken_by_source.pop(path, None)
+
+    def update_index(self, file_index: set[str]) -> None:
+        """Swap in a new file index, re-checking pages whose links changed verdict"""
+        self.file_index = file_index
+        previous = self.verdicts
+        self.verdicts = {}
+
+        affected = set()
+        for link, sources in self.pages_by_link.items():
+            if self.check_link_exists(link)[0] != previous.get(link, (None,))[0]:
+                affected.update(sources)
+        for path in affected:
+            self.refresh_page(path)
+
+    def find_broken_links(self) -> list[dict]:
+        return [
+            {'source_file': path, 'broken_link': link}
+            for path in sorted(self.broken_by_source)
+            for link in self.broken_by_source[path]
+        ]
+
+
+class SiteWatcher:
+    """Keep the link graph and broken link checks current as dist_path changes"""
+
+    def __init__(
+        self,
+        dist_path: Path,
+        output_dir: Path,
+        excluded_paths: list[str] = None,
+        underlinked_threshold: int = 3,
+        cache: ExtractionCache = None,
+        workers: int = None,
+        extractor: str = DEFAULT_EXTRACTOR
+    ):
+        self.dist_path = dist_path
+        self.summary_path = output_dir / WATCH_SUMMARY_FILENAME
+        self.underlinked_threshold = underlinked_threshold
+        self.cache = cache
+        self.workers = workers
+        self.extractor = extractor
+
+        self.graph = IncrementalLinkGraph(dist_path, excluded_paths=excluded_paths, extractor=extractor)
+        self.checker = IncrementalLinksChecker(dist_path, excluded_paths=excluded_paths, extractor=extractor)
+
+        # Last scan of dist_path, and the content hash of every extracted page
+        self.files: dict[str, tuple[int, int]] = {}
+        self.directories: set[str] = set()
+        self.digests: dict[str, str] = {}
+
+        self.orphans: set[str] = set()
+        self.broken: set[tuple[str, str]] = set()
+
+    def page_path(self, relative: str) -> str:
+        """PageRecord.path for a relative POSIX path from scan_tree()"""
+        return str(Path(PurePosixPath(relative)))
+
+    def file_index(self) -> set[str]:
+        return tree_index(self.files, self.directories)
+
+    def start(self) -> dict:
+        """Extract every page once and build the in-memory graph"""
+        self.files, self.directories = scan_tree(self.dist_path)
+        pages = extract_site(self.dist_path, self.workers, self.cache, self.extractor)
+        if self.cache:
+            self.digests = {path: entry[2] for path, entry in self.cache.entries().items()}
+
+        self.checker.update_index(self.file_index())
+        for page in pages:
+            self.graph.update_page(page)
+            self.checker.update_page(page)
+        return self.emit({'changed': 0, 'added': len(pages), 'removed': 0}, 0.0, initial=True)
+
+    def extract(self, relative: str) -> PageRecord | None:
+        """Re-extract a changed page; None when its content is unchanged"""
+        path = self.page_path(relative)
+        digest, page = extract_changed_page(
+            self.dist_path / path, self.dist_path, self.digests.get(path), self.extractor
+        )
+        if page is None:
+            if self.cache:
+                self.cache.touch(path, *self.files[relative])
+            return None
+
+        if digest:
+            self.digests[path] = digest
+            if self.cache and not page.error:
+                self.cache.store(page, *self.files[relative], digest)
+        return page
+
+    def apply(self, files: dict[str, tuple[int, int]], directories: set[str]) -> dict | None:
+        """Patch the graph for a new scan of dist_path; returns the summary if anything changed"""
+        started = time.perf_counter()
+        previous = self.files
+        index_changed = directories != self.directories or files.keys() != previous.keys()
+        self.files = files
+        self.directories = directories
+
+        touched = [
+            relative for relative, stat in files.items()
+            if relative.endswith('.html') and previous.get(relative) != stat
+        ]
+        removed = [
+            relative for relative in previous
+            if relative.endswith('.html') and relative not in files
+        ]
+
+        if index_changed:
+            self.checker.update_index(self.file_index())
+
+        changed = 0
+        for relative in touched:
+            page = self.extract(relative)
+            if page is None:
+                continue
+            changed += 1
+            self.graph.update_page(page)
+            self.checker.update_page(page)
+
+        for relative in removed:
+            path = self.page_path(relative)
+            self.graph.remove_page(path)
+            self.checker.remove_page(path)
+            self.digests.pop(path, None)
+
+        if self.cache:
+            if removed:
+                self.cache.prune(set(self.digests))
+            self.cache.commit()
+
+        if not changed and not removed and not index_changed:
+            return None
+        added = sum(1 for relative in touched if relative not in previous)
+        return self.emit(
+            {'changed': changed - added, 'added': added, 'removed': len(removed)},
+            time.perf_counter() - started
+        )
+
+    def emit(self, changes: dict, elapsed: float, initial: bool = False) -> dict:
+        """Print what changed in the summaries and save the current summary"""
+        orphans = self.graph.find_orphans()
+        underlinked = self.graph.find_underlinked(self.underlinked_threshold)
+        broken_links = self.checker.find_broken_links()
+
+        orphan_set = set(orphans)
+        broken_set = {(link['source_file'], link['broken_link']) for link in broken_links}
+
+        if initial:
+            print(f"\n[{time.strftime('%H:%M:%S')}] Loaded {changes['added']} pages")
+        else:
+            print(f"\n[{time.strftime('%H:%M:%S')}] {changes['changed']} changed, {changes['added']} added, "
+                  f"{changes['removed']} removed pages, updated in {elapsed * 1000:.0f} ms")
+        print(f"  Orphan pages: {len(orphans)}  Under-linked: {len(underlinked)}  "
+              f"Broken internal links: {len(broken_links)}")
+        if not initial:
+            for url in sorted(orphan_set - self.orphans):
+                print(f"  + orphan  {url}")
+            for url in sorted(self.orphans - orphan_set):
+                print(f"  - orphan  {url}")
+            for source, link in sorted(broken_set - self.broken):
+                print(f"  + broken  {source} -> {link}")
+            for source, link in sorted(self.broken - broken_set):
+                print(f"  - broken  {source} -> {link}")
+        self.orphans = orphan_set
+        self.broken = broken_set
+
+        summary = {
+            "metadata": {
+                "updated_at": timestamp(),
+                "dist_path": str(self.dist_path),
+                "changes": changes,
+                "update_ms": round(elapsed * 1000, 1),
+                "total_pages": len(self.graph.forward),
+                "thresholds": {"underlinked": self.underlinked_threshold}
+            },
+            "summary": {
+                "orphan_pages": len(orphans),
+                "underlinked_pages": len(underlinked),
+                "broken_internal_links": len(broken_links)
+            },
+            "orphan_pages": orphans,
+            "underlinked_pages": underlinked,
+            "broken_internal_links": broken_links
+        }
+        save_json(summary, self.summary_path)
+        return summary
+
+    def poll(self, interval: float = POLL_INTERVAL) -> None:
+        """Wait for dist_path to change and settle, then apply the change"""
+        while True:
+            time.sleep(interval)
+            files, directories = scan_tree(self.dist_path)
+            if files != self.files or directories != self.directories:
+                break
+
+        # A rebuild writes many files: wait until two scans agree
+        while True:
+            time.sleep(interval)
+            latest = scan_tree(self.dist_path)
+            if latest == (files, directories):
+                break
+            files, directories = latest
+
+        self.apply(files, directories)
+
+    def run(self, interval: float = POLL_INTERVAL) -> None:
+        """Watch until interrupted"""
+        print(f"\nWatching {self.dist_path} for changes (Ctrl+C to stop)...")
+        print(f"Summaries: {self.summary_path}")
+        try:
+            while True:
+                self.poll(interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
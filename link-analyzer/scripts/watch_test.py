@@ -0,0 +1,124 @@
+import io
+import os
+import re
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from collections import Counter
+from contextlib import redirect_stdout
+
+from extract_cache import ExtractionCache
+from extractor import extract_site
+from internal_links import InternalLinksChecker, scan_tree
+from link_graph import LinkGraphAnalyzer
+from synthetic_site import generate_site
+from watch import SiteWatcher
+
+
+EXCLUDED = ['/tag/']
+
+
+class TestSiteWatcher(unittest.TestCase):
+    """Every incremental update must match a full rebuild"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.dist = root / "dist"
+        self.output = root / "output"
+        self.output.mkdir()
+        generate_site(self.dist, pages=150, seed=3, broken_ratio=0.02)
+        self.cache = ExtractionCache(self.output / "extract_cache.sqlite")
+
+        self.watcher = SiteWatcher(self.dist, self.output, excluded_paths=EXCLUDED, cache=self.cache, workers=1)
+        with redirect_stdout(io.StringIO()):
+            self.watcher.start()
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def rebuilt(self) -> tuple:
+        """Orphans, under-linked pages and broken links from a fresh analysis"""
+        with redirect_stdout(io.StringIO()):
+            pages = extract_site(self.dist, 1)
+            graph = LinkGraphAnalyzer(self.dist, excluded_paths=EXCLUDED)
+            graph.build_graph(pages)
+            graph.calculate_metrics()
+            broken = InternalLinksChecker(self.dist, excluded_paths=EXCLUDED).analyze(pages)['broken_links']
+        return (
+            graph.find_orphans(),
+            sorted((page['url'], page['inbound'], tuple(page['inbound_from'])) for page in graph.find_underlinked(3)),
+            Counter((link['source_file'], link['broken_link']) for link in broken)
+        )
+
+    def patched(self) -> tuple:
+        return (
+            self.watcher.graph.find_orphans(),
+            sorted((page['url'], page['inbound'], tuple(page['inbound_from']))
+                   for page in self.watcher.graph.find_underlinked(3)),
+            Counter((link['source_file'], link['broken_link']) for link in self.watcher.checker.find_broken_links())
+        )
+
+    def apply(self) -> dict | None:
+        with redirect_stdout(io.StringIO()):
+            return self.watcher.apply(*scan_tree(self.dist))
+
+    def html_files(self) -> list[Path]:
+        return sorted(self.dist.rglob('*.html'))
+
+    def test_initial_load(self):
+        orphans, underlinked, broken = self.rebuilt()
+        self.assertTrue(orphans and underlinked and broken)
+        self.assertEqual(self.patched(), (orphans, underlinked, broken))
+
+    def test_random_edits(self):
+        """Edits, new pages, deletions and new directories, checked after every step"""
+        rng = random.Random(1)
+        urls = ['/' + str(path.relative_to(self.dist).parent).replace('\\', '/').strip('.') for path in self.html_files()]
+        urls = [url.rstrip('/') + '/' for url in urls] + ['/missing/page/', '/tag/x/']
+
+        for step in range(60):
+            operation = rng.choice(['edit', 'edit', 'add', 'delete', 'directory'])
+            if operation == 'edit':
+                path = rng.choice(self.html_files())
+                content = re.sub(
+                    r'href="/[^"]*"',
+                    lambda match: match.group(0) if rng.random() < 0.7 else f'href="{rng.choice(urls)}"',
+                    path.read_text(encoding='utf-8')
+                )
+                path.write_text(content + f'<a href="{rng.choice(urls)}">x</a>', encoding='utf-8')
+            elif operation == 'add':
+                path = self.dist / f"new{step}" / "index.html"
+                path.parent.mkdir(exist_ok=True)
+                path.write_text(f'<a href="{rng.choice(urls)}">a</a><a href="/new{step - 1}/">b</a>', encoding='utf-8')
+                urls.append(f"/new{step}/")
+            elif operation == 'delete':
+                rng.choice(self.html_files()).unlink()
+            else:
+                # Makes earlier links to /new<step - 1>/ resolve without any page changing
+                (self.dist / f"new{step - 1}").mkdir(exist_ok=True)
+
+            self.apply()
+            with self.subTest(step=step, operation=operation):
+                self.assertEqual(self.patched(), self.rebuilt())
+
+    def test_unchanged_content(self):
+        """Touching every page re-hashes them but changes nothing"""
+        before = self.patched()
+        for path in self.html_files():
+            os.utime(path)
+        self.assertIsNone(self.apply())
+        self.assertEqual(self.patched(), before)
+
+    def test_summary_file(self):
+        (self.dist / "index.html").unlink()
+        summary = self.apply()
+        self.assertEqual(summary['metadata']['changes'], {'changed': 0, 'added': 0, 'removed': 1})
+        self.assertEqual(summary['summary']['orphan_pages'], len(self.rebuilt()[0]))
+        self.assertTrue((self.output / "watch_summary.json").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()